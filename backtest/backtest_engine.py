@@ -1,37 +1,82 @@
-# File: backtest/backtest_engine.py (Accurate equity curve from trades)
-import os
+# File: backtest/backtest_engine.py (Per-bar mark-to-market equity from positions and prices)
+import numpy as np
 import pandas as pd
 from strategy.ema_crossover import ema_crossover_strategy
+from strategy.intrabar import build_intrabar_index
 import warnings
 warnings.filterwarnings("ignore")
 
-def backtest(df, symbol="BTC/USDT", initial_balance=10000, short_window=5, long_window=9, leverage=1):
-    # Apply the trading strategy to generate signals and record trades
-    df = ema_crossover_strategy(df, symbol=symbol, short_window=short_window, long_window=long_window, capital=initial_balance)
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
 
-    # Load trades from CSV log generated by the strategy
-    trades_path = "logs/trades.csv"
-    if not os.path.exists(trades_path):
-        raise FileNotFoundError("Trade log not found. Ensure the strategy has generated trades.")
 
-    trades_df = pd.read_csv(trades_path)
+def periods_per_year(index):
+    # Bars per year from the median bar spacing (crypto trades around the clock)
+    if len(index) < 2 or not isinstance(index, pd.DatetimeIndex):
+        return 1.0
+    step = np.median(np.diff(index.asi8)) / 1e9
+    return SECONDS_PER_YEAR / step if step > 0 else 1.0
 
-    # Compute equity curve from actual trade results
-    equity = [initial_balance]
-    for _, row in trades_df.iterrows():
-        pnl = float(row['Exit Price']) - float(row['Entry Price'])
-        pnl = pnl * float(row['Lot Size'])
-        if row['Buy/Sell'] == 'Sell':
-            pnl = -pnl  # reverse pnl for shorts
-        equity.append(equity[-1] + pnl)
 
-    # Align equity curve with DataFrame index
-    equity_series = pd.Series(equity[1:], index=df.index[-len(equity)+1:])
-    df['equity_curve'] = equity_series
+def equity_curve(close, units, initial_balance=10000, leverage=1, exits=None):
+    # Bar t earns what was held after bar t-1's close times the move to bar t's close.
+    # exits: optional (exit_idx, signed lots, exit_price) for trades filled away from the close (intrabar SL/TP)
+    close = np.asarray(close, dtype=np.float64)
+    bar_pnl = np.zeros(len(close))
+    bar_pnl[1:] = units[:-1] * np.diff(close) * leverage
+    if exits is not None:
+        idx, lots, price = exits
+        bar_pnl[idx] += lots * (price - close[idx]) * leverage
+    return initial_balance + np.cumsum(bar_pnl)
 
-    # Compute performance metrics
-    total_return = equity[-1] - initial_balance
-    win_rate = (trades_df['Result'] == 'Win').mean()
-    max_drawdown = (df['equity_curve'] / df['equity_curve'].cummax() - 1).min()
 
-    return df, total_return, win_rate, max_drawdown
\ No newline at end of file
+def performance_metrics(equity, units, pnl, initial_balance=10000, bars_per_year=1.0):
+    # Everything in one pass over the equity array
+    if len(equity) == 0:
+        return {"total_return": 0.0, "max_drawdown": 0.0, "sharpe": np.nan, "sortino": np.nan,
+                "exposure": 0.0, "trades": 0, "win_rate": np.nan}
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    returns = np.diff(equity) / equity[:-1]
+    mean = returns.mean() if len(returns) else np.nan
+    std = returns.std() if len(returns) else np.nan
+    downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2)) if len(returns) else np.nan
+    scale = np.sqrt(bars_per_year)
+    return {
+        "total_return": float(equity[-1] - initial_balance),
+        "max_drawdown": float(drawdown.min()),
+        "sharpe": float(mean / std * scale) if std > 0 else np.nan,
+        "sortino": float(mean / downside * scale) if downside > 0 else np.nan,
+        "exposure": float(np.count_nonzero(units) / len(units)),
+        "trades": int(len(pnl)),
+        "win_rate": float((pnl > 0).mean()) if len(pnl) else np.nan,
+    }
+
+
+def backtest(df, symbol="BTC/USDT", initial_balance=10000, short_window=5, long_window=9, leverage=1,
+             stop_loss=None, take_profit=None, trades_path=None, return_trades=False, return_metrics=False,
+             sub_df=None):
+    # sub_df: optional finer candles (e.g. stored 1m) to fill SL/TP intrabar instead of on the bar close
+    intrabar = build_intrabar_index(df.index, sub_df) if sub_df is not None else None
+
+    # Apply the trading strategy to generate signals; trades come back as an in-memory ledger
+    df, ledger = ema_crossover_strategy(df, symbol=symbol, short_window=short_window, long_window=long_window, capital=initial_balance,
+                                        stoploss_threshold=stop_loss, takeprofit_threshold=take_profit,
+                                        log_trades=False, return_trades=True, intrabar=intrabar)
+    if trades_path:
+        ledger.to_csv(trades_path)
+
+    # Mark every bar to market, so the curve lines up with df and open positions count
+    equity = equity_curve(df['close'].to_numpy(dtype=np.float64), ledger.units, initial_balance, leverage,
+                          exits=(ledger.exit_idx, ledger.side * ledger.lot_size, ledger.exit_price))
+    df['equity_curve'] = equity
+
+    metrics = performance_metrics(equity, ledger.units, ledger.pnl * leverage, initial_balance, periods_per_year(df.index))
+    total_return = metrics["total_return"]
+    win_rate = metrics["win_rate"]
+    max_drawdown = metrics["max_drawdown"]
+
+    result = (df, total_return, win_rate, max_drawdown)
+    if return_trades:
+        result += (ledger,)
+    if return_metrics:
+        result += (metrics,)
+    return result
@@ -0,0 +1,146 @@
+# File: backtest/portfolio.py (Multi-symbol EMA crossover backtest sharing one capital pool)
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+from strategy.ema_cache import ema
+from strategy.signal_kernel import crossover_masks
+from backtest.backtest_engine import performance_metrics, periods_per_year
+
+TRADE_COLUMNS = ['symbol', 'side', 'entry_time', 'exit_time', 'entry_price', 'exit_price', 'lot_size', 'pnl']
+
+
+class PortfolioResult(NamedTuple):
+    equity: pd.Series        # portfolio equity after each bar's close
+    drawdown: pd.Series      # equity / running peak - 1
+    exposure: pd.DataFrame   # signed notional held per symbol after each bar's close
+    trades: pd.DataFrame     # closed trades, TRADE_COLUMNS
+    metrics: dict            # performance_metrics of the portfolio equity
+
+
+class KernelState(NamedTuple):
+    equity: np.ndarray       # float64 per bar
+    units: np.ndarray        # float64 time x symbol, signed lots held after the bar's close
+    trades: tuple            # (symbol, side, entry_bar, exit_bar, entry_price, exit_price, lot_size) arrays
+
+
+def align_frames(frames, span_short, span_long):
+    # {symbol: OHLCV frame} -> time x symbol close and EMA matrices on the union of timestamps. EMAs run over each
+    # symbol's own bars, so a gap or a late listing doesn't leak NaNs into them; off-bar cells are NaN in `close`.
+    closes, shorts, longs = {}, {}, {}
+    for symbol, df in frames.items():
+        close = df['close'][~df.index.duplicated(keep='last')].sort_index()
+        closes[symbol] = close
+        shorts[symbol] = ema(close, span_short)
+        longs[symbol] = ema(close, span_long)
+    close = pd.concat(closes, axis=1).sort_index()
+    return close, pd.concat(shorts, axis=1).reindex(close.index).ffill(), pd.concat(longs, axis=1).reindex(close.index).ffill()
+
+
+def portfolio_kernel(close, ema_short, ema_long, stoploss_threshold=0.02, takeprofit_threshold=0.04,
+                     initial_balance=10000, risk_pct=0.02, max_symbol_exposure=None, max_total_exposure=None,
+                     compound=True, use_stoploss=True, use_takeprofit=True):
+    # The signal kernel's per-symbol state machine, stepped bar by bar with every symbol handled in one array op.
+    # Lots are risk-sized off the shared equity (or the starting balance when compound=False), then clipped so no
+    # symbol exceeds max_symbol_exposure x equity in notional and the book stays under max_total_exposure x equity.
+    # With no caps and compound=False every column matches run_signal_kernel on that symbol alone.
+    close = np.asarray(close, dtype=np.float64)
+    n_bars, n_symbols = close.shape
+    valid = ~np.isnan(close)
+    mark = pd.DataFrame(close).ffill().fillna(0.0).to_numpy()   # last known price, for marking open positions
+    bullish, bearish = crossover_masks(ema_short, ema_long)
+    bullish &= valid
+    bearish &= valid
+
+    position = np.zeros(n_symbols, dtype=np.int8)
+    units = np.zeros(n_symbols)
+    entry = np.zeros(n_symbols)
+    entry_bar = np.zeros(n_symbols, dtype=np.int64)
+    sl_level = np.zeros(n_symbols)
+    tp_level = np.zeros(n_symbols)
+    equity = np.empty(n_bars)
+    held = np.zeros((n_bars, n_symbols))
+    trades = [[] for _ in range(7)]
+    realized = 0.0
+
+    for t in range(n_bars):
+        p = close[t]
+        exited = None
+        if position.any():
+            long, short = position == 1, position == -1
+            with np.errstate(invalid='ignore'):
+                exited = valid[t] & ((long & ((p < sl_level) | (p > tp_level) | bearish[t])) |
+                                     (short & ((p > sl_level) | (p < tp_level) | bullish[t])))
+            if exited.any():
+                idx = np.flatnonzero(exited)
+                realized += float(units[idx] @ (p[idx] - entry[idx]))
+                for column, values in zip(trades, (idx, position[idx], entry_bar[idx], np.full(len(idx), t),
+                                                   entry[idx], p[idx], np.abs(units[idx]))):
+                    column.append(values.copy())
+                position[idx] = 0
+                units[idx] = 0.0
+        book = realized + float(units @ (mark[t] - entry))
+        eq = initial_balance + book
+
+        # Fresh crosses open flat symbols; a symbol that just exited waits for the next cross, as in the 1-D kernel
+        entering = (bullish[t] | bearish[t]) & (position == 0)
+        if exited is not None:
+            entering &= ~exited
+        if entering.any() and eq > 0:
+            idx = np.flatnonzero(entering)
+            side = np.where(bullish[t, idx], 1, -1).astype(np.int8)
+            price = p[idx]
+            sl = np.where(side == 1, price * (1 - stoploss_threshold), price * (1 + stoploss_threshold))
+            tp = np.where(side == 1, price * (1 + takeprofit_threshold), price * (1 - takeprofit_threshold))
+            distance = np.abs(price - sl)
+            risk_amount = (eq if compound else initial_balance) * risk_pct
+            with np.errstate(divide='ignore'):
+                lots = np.where(distance != 0, risk_amount / distance, 0.0)
+            if max_symbol_exposure is not None:
+                lots = np.minimum(lots, max_symbol_exposure * eq / price)
+            if max_total_exposure is not None:
+                room = max(max_total_exposure * eq - float(np.abs(units) @ mark[t]), 0.0)
+                wanted = float(lots @ price)
+                if wanted > room:
+                    lots = lots * (room / wanted)   # every entry on the bar is scaled down by the same factor
+            position[idx] = side
+            units[idx] = side * lots
+            entry[idx] = price
+            entry_bar[idx] = t
+            # Disabled exits become levels price can never cross (sizing still uses the nominal stop)
+            sl_level[idx] = sl if use_stoploss else -side * np.inf
+            tp_level[idx] = tp if use_takeprofit else side * np.inf
+        held[t] = units
+        equity[t] = eq
+
+    dtypes = (np.int64, np.int8, np.int64, np.int64, np.float64, np.float64, np.float64)
+    closed = tuple(np.concatenate(c).astype(d) if c else np.empty(0, dtype=d) for c, d in zip(trades, dtypes))
+    return KernelState(equity, held, closed)
+
+
+def portfolio_backtest(frames, short_window=5, long_window=9, stop_loss=0.02, take_profit=0.04, initial_balance=10000,
+                       risk_pct=0.02, max_symbol_exposure=None, max_total_exposure=None, compound=True,
+                       use_stoploss=True, use_takeprofit=True):
+    close, ema_s, ema_l = align_frames(frames, short_window, long_window)
+    state = portfolio_kernel(close.to_numpy(), ema_s.to_numpy(), ema_l.to_numpy(), stop_loss, take_profit,
+                             initial_balance, risk_pct, max_symbol_exposure, max_total_exposure, compound,
+                             use_stoploss, use_takeprofit)
+    symbols = np.asarray(close.columns, dtype=object)
+    symbol, side, entry_bar, exit_bar, entry_price, exit_price, lot_size = state.trades
+    trades = pd.DataFrame({
+        'symbol': symbols[symbol], 'side': side, 'entry_time': close.index[entry_bar], 'exit_time': close.index[exit_bar],
+        'entry_price': entry_price, 'exit_price': exit_price, 'lot_size': lot_size,
+        'pnl': (exit_price - entry_price) * lot_size * side,
+    }, columns=TRADE_COLUMNS).sort_values(['exit_time', 'symbol'], kind='stable').reset_index(drop=True)
+
+    mark = close.ffill().fillna(0.0).to_numpy()
+    exposure = pd.DataFrame(state.units * mark, index=close.index, columns=close.columns)
+    equity = pd.Series(state.equity, index=close.index, name='equity')
+    drawdown = equity / equity.cummax() - 1
+    gross = exposure.abs().sum(axis=1).to_numpy()
+    metrics = performance_metrics(state.equity, gross, trades['pnl'].to_numpy(), initial_balance,
+                                  periods_per_year(close.index))
+    metrics['max_gross_exposure'] = float((gross / np.maximum(state.equity, 1e-12)).max()) if len(gross) else 0.0
+    return PortfolioResult(equity, drawdown.rename('drawdown'), exposure, trades, metrics)
@@ -1,8 +1,8 @@
 # File: backtest/run_backtest.py
 import argparse
-import os
 import pandas as pd
 from backtest.backtest_engine import backtest
+from data.ohlcv_store import load_pair
 
 
 def main():
@@ -13,29 +13,44 @@ def main():
     parser.add_argument('--ema_long', type=int, default=9, help="Long EMA window")
     parser.add_argument('--capital', type=float, default=10000, help="Initial capital")
     parser.add_argument('--leverage', type=int, default=1, help="Leverage multiplier")
+    parser.add_argument('--start', type=str, default=None, help="First candle to include (e.g., 2025-01-01)")
+    parser.add_argument('--end', type=str, default=None, help="Last candle to include")
+    parser.add_argument('--intrabar', type=str, default=None, help="Finer stored timeframe to fill SL/TP intrabar (e.g., 1m)")
     args = parser.parse_args()
 
-    filename = f"data/{args.pair}_{args.timeframe}.csv"
-    if not os.path.exists(filename):
-        print(f"❌ Data not found: {filename}")
+    try:
+        df = load_pair(args.pair, args.timeframe, start=args.start, end=args.end)
+    except FileNotFoundError:
+        print(f"❌ Data not found: {args.pair} {args.timeframe}")
         return
-
-    df = pd.read_csv(filename, index_col="timestamp", parse_dates=True)
-    df, total_return, win_rate, max_dd = backtest(
+    sub_df = None
+    if args.intrabar:
+        try:
+            # Sub-bars of the last candle run until the next bar would open
+            sub_end = df.index[-1] + (df.index[-1] - df.index[-2] if len(df) > 1 else pd.Timedelta(0))
+            sub_df = load_pair(args.pair, args.intrabar, start=df.index[0], end=sub_end)
+        except FileNotFoundError:
+            print(f"⚠️ No {args.intrabar} data for {args.pair}; SL/TP are checked on the {args.timeframe} close")
+    df, total_return, win_rate, max_dd, metrics = backtest(
         df,
         symbol=args.pair.replace("USDT", "/USDT"),
         initial_balance=args.capital,
         short_window=args.ema_short,
         long_window=args.ema_long,
-        leverage=args.leverage
+        leverage=args.leverage,
+        trades_path="logs/trades.csv",
+        return_metrics=True,
+        sub_df=sub_df,
     )
 
     print("\n✅ Backtest Complete")
-    print(f"Pair: {args.pair} | Timeframe: {args.timeframe}")
+    print(f"Pair: {args.pair} | Timeframe: {args.timeframe}" + (f" | Intrabar SL/TP: {args.intrabar}" if sub_df is not None else ""))
     print(f"EMA: {args.ema_short}/{args.ema_long} | Capital: ${args.capital} | Leverage: {args.leverage}x\n")
     print(f"📈 Total Return: ${total_return:.2f}")
     print(f"🏆 Win Rate: {win_rate:.2%}")
     print(f"📉 Max Drawdown: {max_dd:.2%}")
+    print(f"📐 Sharpe: {metrics['sharpe']:.2f} | Sortino: {metrics['sortino']:.2f}")
+    print(f"⏱️ Exposure: {metrics['exposure']:.2%} | Trades: {metrics['trades']}")
 
     df.to_csv("logs/backtest_output.csv")
     print("\n📁 Output saved to logs/backtest_output.csv")
@@ -0,0 +1,61 @@
+# File: backtest/run_portfolio.py
+# Usage: python -m backtest.run_portfolio --pairs BTCUSDT,XRPUSDT --timeframe 1h --max_symbol 0.25 --max_total 1.0
+import argparse
+import os
+import time
+from backtest.portfolio import portfolio_backtest
+from backtest.run_sweep import parse_list
+from data.ohlcv_store import load_pair
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the EMA strategy on several pairs sharing one capital pool")
+    parser.add_argument('--pairs', type=str, default="BTCUSDT,XRPUSDT", help="Comma-separated symbols (e.g., BTCUSDT,ETHUSDT)")
+    parser.add_argument('--timeframe', type=str, default="1h", help="Timeframe (e.g., 1m, 1h)")
+    parser.add_argument('--start', type=str, default=None, help="First candle to include (e.g., 2025-01-01)")
+    parser.add_argument('--end', type=str, default=None, help="Last candle to include")
+    parser.add_argument('--ema_short', type=int, default=5, help="Short EMA window")
+    parser.add_argument('--ema_long', type=int, default=9, help="Long EMA window")
+    parser.add_argument('--stop', type=float, default=0.02, help="Stop loss threshold")
+    parser.add_argument('--take', type=float, default=0.04, help="Take profit threshold")
+    parser.add_argument('--capital', type=float, default=10000, help="Shared initial capital")
+    parser.add_argument('--risk', type=float, default=0.02, help="Equity fraction risked per trade (to the stop)")
+    parser.add_argument('--max_symbol', type=float, default=None, help="Max notional per symbol as a multiple of equity")
+    parser.add_argument('--max_total', type=float, default=None, help="Max gross notional as a multiple of equity")
+    parser.add_argument('--fixed_risk', action='store_true', help="Size off the initial capital instead of current equity")
+    args = parser.parse_args()
+
+    frames = {}
+    for pair in parse_list(args.pairs, str):
+        try:
+            frames[pair] = load_pair(pair, args.timeframe, start=args.start, end=args.end)
+        except FileNotFoundError:
+            print(f"⚠️ Data not found: {pair} {args.timeframe}, skipping")
+    if not frames:
+        print("❌ No data for any pair")
+        return
+
+    start = time.perf_counter()
+    result = portfolio_backtest(frames, short_window=args.ema_short, long_window=args.ema_long, stop_loss=args.stop,
+                                take_profit=args.take, initial_balance=args.capital, risk_pct=args.risk,
+                                max_symbol_exposure=args.max_symbol, max_total_exposure=args.max_total,
+                                compound=not args.fixed_risk)
+    elapsed = time.perf_counter() - start
+
+    m = result.metrics
+    print(f"\n✅ Portfolio Backtest Complete: {len(frames)} pairs x {len(result.equity)} bars in {elapsed:.2f}s")
+    print(f"Total Return: ${m['total_return']:.2f} | Max Drawdown: {m['max_drawdown']:.2%} | Sharpe: {m['sharpe']:.2f} | "
+          f"Trades: {m['trades']} | Win Rate: {m['win_rate']:.2%} | Peak Gross Exposure: {m['max_gross_exposure']:.2f}x\n")
+    if len(result.trades):
+        by_symbol = result.trades.groupby('symbol')['pnl'].agg(['count', 'sum', lambda p: (p > 0).mean()])
+        by_symbol.columns = ['trades', 'pnl', 'win_rate']
+        print(by_symbol.sort_values('pnl', ascending=False).to_string())
+
+    os.makedirs("logs", exist_ok=True)
+    result.equity.to_frame().join(result.drawdown).to_csv("logs/portfolio_equity.csv")
+    result.trades.to_csv("logs/portfolio_trades.csv", index=False)
+    print("\n📁 Equity saved to logs/portfolio_equity.csv, trades to logs/portfolio_trades.csv\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# File: backtest/run_sweep.py
+# Usage: python -m backtest.run_sweep --pair BTCUSDT --timeframe 1m --ema_short 5,9,12 --ema_long 20,26,50 --stop 0.01,0.02 --take 0.02,0.04
+import argparse
+import os
+import time
+from backtest.sweep import build_grid, run_sweep
+from data.ohlcv_store import load_pair
+
+
+def parse_list(value, cast):
+    return [cast(v) for v in value.split(',') if v]
+
+
+def parse_bools(value):
+    return [v.strip().lower() in ('1', 'true', 'yes', 'on') for v in value.split(',') if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep EMA/SL/TP settings over historical data in parallel")
+    parser.add_argument('--pair', type=str, default="BTCUSDT", help="Symbol (e.g., BTCUSDT)")
+    parser.add_argument('--timeframe', type=str, default="1h", help="Timeframe (e.g., 1m, 1h)")
+    parser.add_argument('--ema_short', type=str, default="5,9,10,12,20", help="Comma-separated short EMA windows")
+    parser.add_argument('--ema_long', type=str, default="9,20,26,50", help="Comma-separated long EMA windows")
+    parser.add_argument('--stop', type=str, default="0.01,0.02,0.03", help="Comma-separated stop loss thresholds")
+    parser.add_argument('--take', type=str, default="0.02,0.04,0.06", help="Comma-separated take profit thresholds")
+    parser.add_argument('--use_stoploss', type=str, default="true", help="Stop loss toggles to try (e.g., true,false)")
+    parser.add_argument('--use_takeprofit', type=str, default="true", help="Take profit toggles to try (e.g., true,false)")
+    parser.add_argument('--capital', type=float, default=10000, help="Initial capital")
+    parser.add_argument('--leverage', type=int, default=1, help="Leverage multiplier")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--rank_by', type=str, default="total_return", help="Result column to rank by")
+    parser.add_argument('--top', type=int, default=20, help="Rows to print")
+    args = parser.parse_args()
+
+    try:
+        df = load_pair(args.pair, args.timeframe)
+    except FileNotFoundError:
+        print(f"❌ Data not found: {args.pair} {args.timeframe}")
+        return
+    combos = build_grid(
+        parse_list(args.ema_short, int),
+        parse_list(args.ema_long, int),
+        parse_list(args.stop, float),
+        parse_list(args.take, float),
+        parse_bools(args.use_stoploss),
+        parse_bools(args.use_takeprofit),
+    )
+
+    start = time.perf_counter()
+    results = run_sweep(df, combos, initial_balance=args.capital, leverage=args.leverage, workers=args.workers, rank_by=args.rank_by)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n✅ Sweep Complete: {len(results)} combinations over {len(df)} bars in {elapsed:.2f}s")
+    print(f"Pair: {args.pair} | Timeframe: {args.timeframe} | Ranked by: {args.rank_by}\n")
+    print(results.head(args.top).to_string(index=False))
+
+    os.makedirs("logs", exist_ok=True)
+    results.to_csv("logs/sweep_results.csv", index=False)
+    print("\n📁 Results saved to logs/sweep_results.csv\n")
+
+if __name__ == "__main__":
+    main()
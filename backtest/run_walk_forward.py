@@ -0,0 +1,81 @@
+# File: backtest/run_walk_forward.py
+# Usage: python -m backtest.run_walk_forward --pair BTCUSDT --timeframe 1m --train 30D --test 7D [--anchored] --rank_by sharpe
+import argparse
+import os
+import time
+from backtest.run_sweep import parse_bools, parse_list
+from backtest.sweep import build_grid
+from backtest.walk_forward import walk_forward
+from data.ohlcv_store import load_pair
+
+
+def parse_size(value):
+    # Plain integers are bar counts, anything else a duration such as 30D or 12h
+    return int(value) if value.isdigit() else value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward optimize EMA/SL/TP settings and stitch the out-of-sample equity")
+    parser.add_argument('--pair', type=str, default="BTCUSDT", help="Symbol (e.g., BTCUSDT)")
+    parser.add_argument('--timeframe', type=str, default="1h", help="Timeframe (e.g., 1m, 1h)")
+    parser.add_argument('--start', type=str, default=None, help="First candle to include (e.g., 2023-01-01)")
+    parser.add_argument('--end', type=str, default=None, help="Last candle to include")
+    parser.add_argument('--train', type=str, default="30D", help="Train window: duration (30D) or bar count")
+    parser.add_argument('--test', type=str, default="7D", help="Test window: duration (7D) or bar count")
+    parser.add_argument('--step', type=str, default=None, help="Window step (default: the test size)")
+    parser.add_argument('--anchored', action='store_true', help="Grow the train window from the first bar instead of rolling it")
+    parser.add_argument('--ema_short', type=str, default="5,9,12", help="Comma-separated short EMA windows")
+    parser.add_argument('--ema_long', type=str, default="20,26,50", help="Comma-separated long EMA windows")
+    parser.add_argument('--stop', type=str, default="0.01,0.02,0.03", help="Comma-separated stop loss thresholds")
+    parser.add_argument('--take', type=str, default="0.02,0.04,0.06", help="Comma-separated take profit thresholds")
+    parser.add_argument('--use_stoploss', type=str, default="true", help="Stop loss toggles to try (e.g., true,false)")
+    parser.add_argument('--use_takeprofit', type=str, default="true", help="Take profit toggles to try (e.g., true,false)")
+    parser.add_argument('--capital', type=float, default=10000, help="Initial capital")
+    parser.add_argument('--leverage', type=int, default=1, help="Leverage multiplier")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--rank_by', type=str, default="sharpe", help="Train metric that picks each window's setting")
+    parser.add_argument('--ascending', action='store_true', help="Lower rank_by is better (e.g., for max_drawdown as a loss)")
+    args = parser.parse_args()
+
+    try:
+        df = load_pair(args.pair, args.timeframe, start=args.start, end=args.end)
+    except FileNotFoundError:
+        print(f"❌ Data not found: {args.pair} {args.timeframe}")
+        return
+    combos = build_grid(
+        parse_list(args.ema_short, int),
+        parse_list(args.ema_long, int),
+        parse_list(args.stop, float),
+        parse_list(args.take, float),
+        parse_bools(args.use_stoploss),
+        parse_bools(args.use_takeprofit),
+    )
+
+    start = time.perf_counter()
+    try:
+        result = walk_forward(df, combos, train=parse_size(args.train), test=parse_size(args.test),
+                              step=parse_size(args.step) if args.step else None, anchored=args.anchored,
+                              initial_balance=args.capital, leverage=args.leverage, workers=args.workers,
+                              rank_by=args.rank_by, ascending=args.ascending)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    elapsed = time.perf_counter() - start
+
+    mode = "anchored" if args.anchored else "rolling"
+    print(f"\n✅ Walk-forward Complete: {len(result.windows)} {mode} windows x {len(combos)} combinations over {len(df)} bars in {elapsed:.2f}s")
+    print(f"Pair: {args.pair} | Timeframe: {args.timeframe} | Train: {args.train} | Test: {args.test} | Ranked by: {args.rank_by}\n")
+    print(result.windows.to_string(index=False))
+    if result.metrics:
+        m = result.metrics
+        print(f"\n📈 Out-of-sample: return ${m['total_return']:.2f} | sharpe {m['sharpe']:.2f} | max DD {m['max_drawdown']:.2%} | "
+              f"trades {m['trades']} | win rate {m['win_rate']:.2%}")
+
+    os.makedirs("logs", exist_ok=True)
+    result.windows.to_csv("logs/walk_forward_windows.csv", index=False)
+    result.equity.to_csv("logs/walk_forward_equity.csv", header=True)
+    print("\n📁 Windows saved to logs/walk_forward_windows.csv, OOS equity to logs/walk_forward_equity.csv\n")
+
+
+if __name__ == "__main__":
+    main()
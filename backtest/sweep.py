@@ -0,0 +1,103 @@
+# File: backtest/sweep.py (Parallel parameter sweep over shared-memory OHLCV arrays)
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from strategy.signal_kernel import run_signal_kernel
+from strategy.ema_cache import EMA_CACHE, fingerprint
+from backtest.backtest_engine import equity_curve, performance_metrics, periods_per_year
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+METRIC_COLUMNS = ['total_return', 'win_rate', 'max_drawdown', 'sharpe', 'sortino', 'exposure', 'trades']
+RESULT_COLUMNS = ['ema_short', 'ema_long', 'stop_loss', 'take_profit', 'use_stoploss', 'use_takeprofit'] + METRIC_COLUMNS
+MIN_PARALLEL_GROUPS = 8   # below this many EMA pairs, spawning a pool costs more than the sweep itself
+
+# Per-worker view onto the parent's shared OHLCV block (set by _attach_worker)
+_shm = None
+_ohlcv = None
+
+
+def build_grid(ema_short, ema_long, stop_loss, take_profit, use_stoploss=(True,), use_takeprofit=(True,)):
+    # Cartesian product of all settings, skipping EMA pairs where short >= long
+    return [
+        {"ema_short": s, "ema_long": l, "stop_loss": sl, "take_profit": tp,
+         "use_stoploss": use_sl, "use_takeprofit": use_tp}
+        for s, l, sl, tp, use_sl, use_tp in itertools.product(ema_short, ema_long, stop_loss, take_profit,
+                                                                use_stoploss, use_takeprofit)
+        if s < l
+    ]
+
+
+def _attach_worker(shm_name, shape):
+    global _shm, _ohlcv
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _ohlcv = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+    _ohlcv.flags.writeable = False
+
+
+def evaluate_combo(close, ema_s, ema_l, combo, initial_balance, leverage, bars_per_year):
+    # Kernel + mark-to-market for one setting; returns (metrics, equity, per-trade pnl, units held per bar)
+    res = run_signal_kernel(close, ema_s, ema_l, combo["stop_loss"], combo["take_profit"], initial_balance * 0.02,
+                            use_stoploss=combo["use_stoploss"], use_takeprofit=combo["use_takeprofit"])
+    pnl = (res.exit_price - res.entry_price) * res.lot_size * res.side * leverage
+    equity = equity_curve(close, res.units, initial_balance, leverage)
+    return performance_metrics(equity, res.units, pnl, initial_balance, bars_per_year), equity, pnl, res.units
+
+
+def _evaluate_group(ema_short, ema_long, combos, initial_balance, leverage, bars_per_year, close_key, ohlcv=None):
+    # One task per EMA pair; EMAs come from the per-process bank, so each distinct span is computed once per worker
+    ohlcv = _ohlcv if ohlcv is None else ohlcv
+    close = ohlcv[OHLCV_COLUMNS.index('close')]
+    ema_s = EMA_CACHE.get(close, ema_short, key=close_key)
+    ema_l = EMA_CACHE.get(close, ema_long, key=close_key)
+
+    rows = []
+    for c in combos:
+        metrics, _, _, _ = evaluate_combo(close, ema_s, ema_l, c, initial_balance, leverage, bars_per_year)
+        rows.append([ema_short, ema_long, c["stop_loss"], c["take_profit"], c["use_stoploss"], c["use_takeprofit"],
+                     *(metrics[m] for m in METRIC_COLUMNS)])
+    return rows
+
+
+@contextmanager
+def shared_pool(ohlcv, workers):
+    # Workers map one read-only copy of the arrays instead of each receiving a pickled DataFrame
+    shm = shared_memory.SharedMemory(create=True, size=ohlcv.nbytes)
+    try:
+        np.ndarray(ohlcv.shape, dtype=np.float64, buffer=shm.buf)[:] = ohlcv
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_worker,
+                                 initargs=(shm.name, ohlcv.shape)) as pool:
+            yield pool
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def run_sweep(df, combos, initial_balance=10000, leverage=1, workers=None, rank_by='total_return', ascending=False):
+    groups = {}
+    for c in combos:
+        groups.setdefault((c["ema_short"], c["ema_long"]), []).append(c)
+
+    ohlcv = np.ascontiguousarray(df[OHLCV_COLUMNS].to_numpy(dtype=np.float64).T)
+    close_key = fingerprint(ohlcv[OHLCV_COLUMNS.index('close')])
+    bars_per_year = periods_per_year(df.index)
+    workers = workers or os.cpu_count() or 1
+
+    rows = []
+    if workers == 1 or len(groups) < MIN_PARALLEL_GROUPS:
+        for (s, l), group in groups.items():
+            rows.extend(_evaluate_group(s, l, group, initial_balance, leverage, bars_per_year, close_key, ohlcv))
+    else:
+        with shared_pool(ohlcv, workers) as pool:
+            futures = [pool.submit(_evaluate_group, s, l, group, initial_balance, leverage, bars_per_year, close_key)
+                       for (s, l), group in groups.items()]
+            for f in futures:
+                rows.extend(f.result())
+
+    results = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    return results.sort_values(rank_by, ascending=ascending, kind='stable').reset_index(drop=True)
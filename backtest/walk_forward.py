@@ -0,0 +1,128 @@
+# File: backtest/walk_forward.py (Rolling / anchored walk-forward optimization over the sweep kernel)
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+import backtest.sweep as sweep
+from backtest.sweep import OHLCV_COLUMNS, METRIC_COLUMNS, evaluate_combo, shared_pool
+from backtest.backtest_engine import performance_metrics, periods_per_year
+from strategy.ema_cache import EMA_CACHE, fingerprint
+
+PARAM_COLUMNS = ['ema_short', 'ema_long', 'stop_loss', 'take_profit', 'use_stoploss', 'use_takeprofit']
+WINDOW_COLUMNS = ['train_start', 'train_end', 'test_start', 'test_end']
+
+
+class WalkForwardResult(NamedTuple):
+    windows: pd.DataFrame   # one row per window: bounds, winning setting, its train score and out-of-sample metrics
+    equity: pd.Series       # out-of-sample equity stitched across the test windows
+    metrics: dict           # performance_metrics of the stitched equity
+
+
+def make_windows(index, train, test, step=None, anchored=False):
+    # (train_start, train_end, test_start, test_end) bar positions, ends exclusive. Sizes are bar counts (int) or
+    # durations ('30D', '12h'); rolling windows slide the train start, anchored ones keep it at the first bar.
+    n = len(index)
+    step = test if step is None else step
+    counts = [isinstance(size, (int, np.integer)) for size in (train, test, step)]
+    if any(counts) and not all(counts):
+        raise ValueError(f"train, test and step must all be bar counts or all durations, got {train!r}, {test!r}, {step!r}")
+    if counts[0]:
+        origin = 0
+        position = lambda t: min(int(t), n)
+    else:
+        train, test, step = pd.Timedelta(train), pd.Timedelta(test), pd.Timedelta(step)
+        origin = index[0]
+        position = lambda t: int(index.searchsorted(t, side='left'))
+    if step < test:
+        raise ValueError("step must be at least the test size, or out-of-sample windows would overlap")
+
+    windows = []
+    test_start = origin + train
+    while position(test_start) < n:
+        bounds = (position(origin if anchored else test_start - train), position(test_start),
+                  position(test_start), position(test_start + test))
+        if bounds[1] - bounds[0] >= 2 and bounds[3] - bounds[2] >= 2:
+            windows.append(bounds)
+        test_start = test_start + step
+    return windows
+
+
+def _is_better(score, best, ascending):
+    return best is None or (score < best if ascending else score > best)
+
+
+def _run_window(window, groups, initial_balance, leverage, bars_per_year, close_key, rank_by, ascending, ohlcv=None):
+    # Optimize on the train slice, then replay the winner on the test slice. EMAs are computed once per span over the
+    # whole history (they are causal, so no look-ahead) and sliced, so overlapping windows share them per worker.
+    ohlcv = sweep._ohlcv if ohlcv is None else ohlcv
+    close = ohlcv[OHLCV_COLUMNS.index('close')]
+    train_start, train_end, test_start, test_end = window
+
+    best, best_score, best_emas = None, None, None
+    for (s, l), combos in groups.items():
+        ema_s = EMA_CACHE.get(close, s, key=close_key)
+        ema_l = EMA_CACHE.get(close, l, key=close_key)
+        train = (close[train_start:train_end], ema_s[train_start:train_end], ema_l[train_start:train_end])
+        for combo in combos:
+            metrics, _, _, _ = evaluate_combo(*train, combo, initial_balance, leverage, bars_per_year)
+            score = metrics[rank_by]
+            if score == score and _is_better(score, best_score, ascending):
+                best, best_score, best_emas = combo, score, (ema_s, ema_l)
+    if best is None:
+        return window, None, None, None
+
+    ema_s, ema_l = best_emas
+    metrics, equity, pnl, units = evaluate_combo(close[test_start:test_end], ema_s[test_start:test_end],
+                                                 ema_l[test_start:test_end], best, initial_balance, leverage,
+                                                 bars_per_year)
+    # Positions still open at the end of a test window are marked to its last close and not carried over
+    return window, (best, best_score, metrics), np.diff(equity, prepend=initial_balance), (pnl, units)
+
+
+def walk_forward(df, combos, train='30D', test='7D', step=None, anchored=False, initial_balance=10000, leverage=1,
+                 workers=None, rank_by='total_return', ascending=False):
+    windows = make_windows(df.index, train, test, step, anchored)
+    if not windows:
+        raise ValueError(f"{len(df)} bars are not enough for a {train} train / {test} test window")
+    groups = {}
+    for c in combos:
+        groups.setdefault((c["ema_short"], c["ema_long"]), []).append(c)
+
+    ohlcv = np.ascontiguousarray(df[OHLCV_COLUMNS].to_numpy(dtype=np.float64).T)
+    close_key = fingerprint(ohlcv[OHLCV_COLUMNS.index('close')])
+    bars_per_year = periods_per_year(df.index)
+    workers = workers or os.cpu_count() or 1
+    args = (groups, initial_balance, leverage, bars_per_year, close_key, rank_by, ascending)
+
+    if workers == 1 or len(windows) == 1:
+        results = [_run_window(w, *args, ohlcv=ohlcv) for w in windows]
+    else:
+        with shared_pool(ohlcv, workers) as pool:
+            # Longest train windows first, so anchored runs don't end on one straggler
+            order = sorted(range(len(windows)), key=lambda i: windows[i][1] - windows[i][0], reverse=True)
+            futures = {i: pool.submit(_run_window, windows[i], *args) for i in order}
+            results = [futures[i].result() for i in range(len(windows))]
+
+    rows, bar_pnl, trade_pnl, units, index = [], [], [], [], []
+    for (train_start, train_end, test_start, test_end), chosen, pnl_path, trades in results:
+        row = [df.index[train_start], df.index[train_end - 1], df.index[test_start], df.index[test_end - 1]]
+        if chosen is None:
+            rows.append(row + [None] * (len(PARAM_COLUMNS) + 1 + len(METRIC_COLUMNS)))
+            continue
+        best, score, metrics = chosen
+        rows.append(row + [best[c] for c in PARAM_COLUMNS] + [score] + [metrics[m] for m in METRIC_COLUMNS])
+        bar_pnl.append(pnl_path)
+        trade_pnl.append(trades[0])
+        units.append(trades[1])
+        index.append(df.index[test_start:test_end])
+
+    table = pd.DataFrame(rows, columns=WINDOW_COLUMNS + PARAM_COLUMNS + [f"train_{rank_by}"] + METRIC_COLUMNS)
+    if not bar_pnl:
+        return WalkForwardResult(table, pd.Series(dtype=np.float64, name='equity'), {})
+    # Each test window trades with the same fixed risk as the sweep, so the stitched curve is the running sum
+    equity = initial_balance + np.cumsum(np.concatenate(bar_pnl))
+    metrics = performance_metrics(equity, np.concatenate(units), np.concatenate(trade_pnl), initial_balance,
+                                  bars_per_year)
+    return WalkForwardResult(table, pd.Series(equity, index=index[0].append(index[1:]), name='equity'), metrics)
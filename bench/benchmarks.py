@@ -0,0 +1,213 @@
+# File: bench/benchmarks.py (Offline timing + peak-memory benchmarks for the strategy, indicators, backtest and regime code)
+# Usage: python -m bench.benchmarks run [--sizes 1k,100k,1M,10M] [--stages rsi,backtest]
+#        python -m bench.benchmarks compare [BASE] [HEAD]     (commits, or 'prev' / 'last'; default prev vs last)
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from data.synthetic import parse_size
+import warnings
+warnings.filterwarnings("ignore")
+
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history.jsonl')
+DEFAULT_SIZES = '1k,100k,1M,10M'
+REGRESSION_THRESHOLD = 0.10   # slower (or hungrier) by more than this is flagged by `compare`
+NOISE_FLOOR_MS = 2.0          # ...unless the change is smaller than this; sub-ms stages jitter well past 10%
+NOISE_FLOOR_MB = 1.0
+
+
+def format_size(bars):
+    for unit, scale in (('M', 1_000_000), ('k', 1_000)):
+        if bars >= scale and bars % scale == 0:
+            return f"{bars // scale}{unit}"
+    return str(bars)
+
+
+def synthetic_frame(bars, seed=0, timeframe='1m', price=50_000.0):
+    # Same random-walk model as data.fake_exchange.synthetic_candles, built column-wise so 10M bars stay cheap
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.001, bars)))
+    open_ = np.concatenate(([price], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0005, bars)) * close
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.gamma(2.0, 1.0, bars),
+    }, index=pd.date_range('2020-01-01', periods=bars, freq=pd.Timedelta(timeframe), name='timestamp'))
+
+
+STAGES = ('rsi', 'macd', 'vwap', 'indicators', 'strategy', 'backtest', 'regime')
+
+
+def _stages():
+    # name -> fn(df); imported lazily so `compare` works without touching the strategy code
+    from backtest.backtest_engine import backtest
+    from strategy.ema_crossover import ema_crossover_strategy
+    from strategy.indicators import compute_indicators, compute_macd, compute_rsi, compute_vwap
+    from strategy.regime import classify_regimes, regime_segments
+
+    return {
+        'rsi': lambda df: compute_rsi(df['close']),
+        'macd': lambda df: compute_macd(df['close']),
+        'vwap': lambda df: compute_vwap(df),
+        'indicators': lambda df: compute_indicators(df),
+        'strategy': lambda df: ema_crossover_strategy(df.copy(), log_trades=False),
+        'backtest': lambda df: backtest(df.copy()),
+        'regime': lambda df: regime_segments(classify_regimes(df)['Regime']),
+    }
+
+
+def measure(fn, df, repeat):
+    # Best-of-N wall time with tracing off, then one traced run for the peak of Python + NumPy allocations
+    from strategy.ema_cache import EMA_CACHE
+    times = []
+    for _ in range(repeat):
+        EMA_CACHE.clear()   # time the work itself, not memoized EMAs from the previous run
+        gc.collect()
+        start = time.perf_counter()
+        fn(df)
+        times.append(time.perf_counter() - start)
+    EMA_CACHE.clear()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn(df)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak / 2**20
+
+
+def git_commit():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root,
+                                    capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+    return commit, dirty
+
+
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run(sizes, stages=None, repeat=3, seed=0, path=HISTORY_PATH, label=None):
+    available = _stages()
+    stages = stages or list(STAGES)
+    commit, dirty = git_commit()
+    record = {
+        'commit': commit, 'dirty': dirty, 'label': label,
+        'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+        'machine': f"{platform.machine()} / {os.cpu_count()} cpu", 'results': [],
+    }
+    for bars in sizes:
+        df = synthetic_frame(bars, seed)
+        runs = repeat if bars < 5_000_000 else 1   # the 10M tier is long enough that noise is small
+        for stage in stages:
+            seconds, peak_mb = measure(available[stage], df, runs)
+            record['results'].append({'stage': stage, 'bars': bars, 'seconds': seconds, 'peak_mb': peak_mb})
+            print(f"⏱️ {stage:<11} {format_size(bars):>5} bars | {seconds * 1000:10.1f} ms | "
+                  f"{bars / seconds / 1e6:7.2f} M bars/s | peak {peak_mb:8.1f} MB", flush=True)
+        del df
+        gc.collect()
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+    print(f"\n📁 Appended {len(record['results'])} results for {commit}{' (dirty)' if dirty else ''} to {path}")
+    return record
+
+
+def pick(history, ref):
+    # 'last' / 'prev' are the two newest runs; anything else is the newest run whose commit or label starts with it
+    if ref == 'last':
+        return history[-1] if history else None
+    if ref == 'prev':
+        return history[-2] if len(history) > 1 else None
+    for record in reversed(history):
+        if record['commit'].startswith(ref) or record.get('label') == ref:
+            return record
+    return None
+
+
+def compare(base_ref='prev', head_ref='last', path=HISTORY_PATH, threshold=REGRESSION_THRESHOLD):
+    history = load_history(path)
+    base, head = pick(history, base_ref), pick(history, head_ref)
+    if base is None or head is None:
+        missing = base_ref if base is None else head_ref
+        raise ValueError(f"No benchmark run for '{missing}' in {path}")
+
+    def keyed(record):
+        return {(r['stage'], r['bars']): r for r in record['results']}
+
+    before, after = keyed(base), keyed(head)
+    rows = []
+    for key in sorted(set(before) & set(after), key=lambda k: (k[1], k[0])):
+        b, a = before[key], after[key]
+        time_ratio = a['seconds'] / b['seconds'] if b['seconds'] else np.nan
+        mem_ratio = a['peak_mb'] / b['peak_mb'] if b['peak_mb'] else np.nan
+        time_delta, mem_delta = (a['seconds'] - b['seconds']) * 1000, a['peak_mb'] - b['peak_mb']
+        slower = time_ratio > 1 + threshold and time_delta > NOISE_FLOOR_MS
+        larger = mem_ratio > 1 + threshold and mem_delta > NOISE_FLOOR_MB
+        faster = time_ratio < 1 - threshold and -time_delta > NOISE_FLOOR_MS
+        flag = '🔴' if slower or larger else '🟢' if faster else '⚪'
+        rows.append([flag, key[0], format_size(key[1]), b['seconds'] * 1000, a['seconds'] * 1000, time_ratio,
+                     b['peak_mb'], a['peak_mb'], mem_ratio])
+    table = pd.DataFrame(rows, columns=['', 'stage', 'bars', 'base_ms', 'head_ms', 'time_x', 'base_mb', 'head_mb',
+                                        'mem_x'])
+    print(f"📊 {base['commit']}{'*' if base['dirty'] else ''} ({base['time']}) → "
+          f"{head['commit']}{'*' if head['dirty'] else ''} ({head['time']}) | 🔴 = >{threshold:.0%} slower or larger\n")
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    return table
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the strategy, indicators, backtest and regime code offline.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    run_parser = sub.add_parser('run', help='Time every stage on synthetic data and append the results to the history')
+    run_parser.add_argument('--sizes', type=str, default=DEFAULT_SIZES, help='Comma-separated bar counts (1k, 100k, 1M, 10M)')
+    run_parser.add_argument('--stages', type=str, default=None, help='Comma-separated stages (default: all)')
+    run_parser.add_argument('--repeat', type=int, default=3, help='Best of this many timed runs (1 for 10M+ bars)')
+    run_parser.add_argument('--seed', type=int, default=0, help='Synthetic data seed')
+    run_parser.add_argument('--label', type=str, default=None, help='Optional name for this run (usable in compare)')
+    run_parser.add_argument('--history', type=str, default=HISTORY_PATH, help='JSON-lines history file')
+    cmp_parser = sub.add_parser('compare', help='Compare two runs from the history')
+    cmp_parser.add_argument('base', nargs='?', default='prev', help="Commit, label, 'prev' or 'last' (default: prev)")
+    cmp_parser.add_argument('head', nargs='?', default='last', help="Commit, label, 'prev' or 'last' (default: last)")
+    cmp_parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help='Regression threshold (0.1 = 10%%)')
+    cmp_parser.add_argument('--history', type=str, default=HISTORY_PATH, help='JSON-lines history file')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        stages = args.stages.split(',') if args.stages else None
+        unknown = [s for s in stages or [] if s not in STAGES]
+        if unknown:
+            print(f"❌ Unknown stages {unknown}, expected any of {list(STAGES)}")
+            sys.exit(2)
+        run([parse_size(s) for s in args.sizes.split(',') if s], stages, args.repeat, args.seed, args.history, args.label)
+    else:
+        history = load_history(args.history)
+        missing = [ref for ref in (args.base, args.head) if pick(history, ref) is None]
+        if missing:
+            print(f"❌ No benchmark run for {missing} in {args.history}")
+            sys.exit(2)
+        table = compare(args.base, args.head, args.history, args.threshold)
+        sys.exit(1 if (table[''] == '🔴').any() else 0)
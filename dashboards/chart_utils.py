@@ -0,0 +1,132 @@
+# File: dashboards/chart_utils.py (Server-side downsampling for dashboard time-series charts)
+# Usage: python -m dashboards.chart_utils --bars 100000
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pandas as pd
+
+MAX_POINTS = 2000  # ~2 points per horizontal pixel of a wide chart; more is invisible but still shipped
+
+
+def _x_values(index):
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    return np.arange(len(index), dtype=np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: per bucket, keep the point spanning the largest triangle with the previously
+    # kept point and the next bucket's average. First and last points are always kept.
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    y = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[nlo:nhi].mean() if nhi > nlo else x[-1]
+        avg_y = y[nlo:nhi].mean() if nhi > nlo else y[-1]
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y, n_out):
+    # Keeps each bucket's min and max (good for bars and spiky series)
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    buckets = max(n_out // 2, 1)
+    bucket = np.repeat(np.arange(buckets), np.diff(np.linspace(0, n, buckets + 1).astype(np.int64)))
+    grouped = pd.Series(np.where(np.isnan(y), -np.inf, y)).groupby(bucket)
+    keep = np.concatenate((grouped.idxmax().to_numpy(), grouped.idxmin().to_numpy(), [0, n - 1]))
+    return np.unique(keep)
+
+
+def _with_kept(positions, keep, n):
+    if keep is None or len(keep) == 0:
+        return positions
+    keep = np.asarray(keep, dtype=np.int64)
+    return np.union1d(positions, keep[(keep >= 0) & (keep < n)])
+
+
+def marker_positions(index, marker_index):
+    # Integer positions of marker bars (entries/exits) within `index`; log indexes may repeat a timestamp
+    if marker_index is None or len(marker_index) == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(index.isin(marker_index))
+
+
+def line_points(series, max_points=MAX_POINTS, keep=None, method='lttb'):
+    # Downsampled copy of a line series; max_points=None means full resolution. `keep` are positions that must stay.
+    n = len(series)
+    if max_points is None or n <= max_points:
+        return series
+    y = series.to_numpy(dtype=np.float64)
+    if method == 'minmax':
+        positions = minmax_indices(y, max_points)
+    else:
+        positions = lttb_indices(_x_values(series.index), y, max_points)
+    return series.iloc[_with_kept(positions, keep, n)]
+
+
+def ohlc_points(df, max_points=MAX_POINTS, keep=None):
+    # Candles merged into buckets (first open, max high, min low, last close, summed volume); marker bars keep
+    # their own candle so entries/exits still line up with a real bar
+    n = len(df)
+    if max_points is None or n <= max_points:
+        return df
+    edges = np.linspace(0, n, max_points + 1).astype(np.int64)[:-1]
+    if keep is not None and len(keep):
+        keep = np.asarray(keep, dtype=np.int64)
+        keep = keep[(keep >= 0) & (keep < n)]
+        edges = np.union1d(edges, np.concatenate((keep, keep + 1)))
+        edges = edges[edges < n]
+    out = pd.DataFrame(index=df.index[edges])
+    out['open'] = df['open'].to_numpy()[edges]
+    out['high'] = np.maximum.reduceat(df['high'].to_numpy(dtype=np.float64), edges)
+    out['low'] = np.minimum.reduceat(df['low'].to_numpy(dtype=np.float64), edges)
+    out['close'] = df['close'].to_numpy()[np.append(edges[1:], n) - 1]
+    if 'volume' in df.columns:
+        out['volume'] = np.add.reduceat(df['volume'].to_numpy(dtype=np.float64), edges)
+    return out
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    from data.fake_exchange import synthetic_candles
+
+    parser = argparse.ArgumentParser(description='Time chart downsampling and check marker bars survive it.')
+    parser.add_argument('--bars', type=int, default=100_000, help='Candles to downsample')
+    parser.add_argument('--points', type=int, default=MAX_POINTS, help='Target points per series')
+    args = parser.parse_args()
+
+    rows = synthetic_candles('2025-01-01', args.bars, '1m', seed=7)
+    df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df.set_index('timestamp', inplace=True)
+    markers = df.index[np.random.default_rng(0).choice(args.bars, 200, replace=False)]
+    keep = marker_positions(df.index, markers)
+
+    start = time.perf_counter()
+    line = line_points(df['close'], args.points, keep)
+    lttb_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    bars = line_points(df['volume'], args.points, method='minmax')
+    minmax_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    candles = ohlc_points(df, args.points, keep)
+    ohlc_ms = (time.perf_counter() - start) * 1000
+
+    print(f"⏱️ {args.bars} bars → LTTB {len(line)} pts in {lttb_ms:.1f} ms | min-max {len(bars)} pts in {minmax_ms:.1f} ms | "
+          f"OHLC {len(candles)} candles in {ohlc_ms:.1f} ms")
+    print(f"✅ markers kept: line {markers.isin(line.index).all()}, candles {markers.isin(candles.index).all()} | "
+          f"OHLC range intact: {candles['high'].max() == df['high'].max() and candles['low'].min() == df['low'].min()} | "
+          f"volume total intact: {np.isclose(candles['volume'].sum(), df['volume'].sum())}")
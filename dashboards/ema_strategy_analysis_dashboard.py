@@ -5,9 +5,11 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from strategy import ema_crossover
 from backtest.backtest_engine import backtest
-from data.fetch_data import save_to_csv
+from backtest.sweep import run_sweep
+from data.fetch_data import save_to_store
+from data.ohlcv_store import load_pair, partition_dir
+from dashboards.chart_utils import MAX_POINTS, line_points, marker_positions, ohlc_points
 from datetime import datetime
 
 
@@ -41,30 +43,35 @@ with st.sidebar:
     stop_loss = st.slider("Stop Loss %", 0.0, 0.1, 0.02, key="stop_loss_slider")
     take_profit = st.slider("Take Profit %", 0.0, 0.2, 0.04, key="take_profit_slider")
     chart_type = st.radio("Price Chart Type", ["Line", "Candlestick"], index=0)
+    full_res = st.checkbox("Full-resolution charts", value=False, help=f"Off: each series is downsampled to ~{MAX_POINTS} points (trade bars always kept)")
+    max_points = None if full_res else MAX_POINTS
 
     run_btn = st.button("\U0001F680 Run Backtest")
     compare_btn = st.button("\U0001F4C8 Compare All Presets")
 
 if run_btn or compare_btn:
     try:
-        filename = f"{pair}_{candle_size}.csv"
-        filepath = f"data/{filename}"
-        save_to_csv(pair=pair, timeframe=candle_size, limit=int(limit))
+        # Fetched candles accumulate in the store; the run uses the latest `limit` of them
+        save_to_store(pair=pair, timeframe=candle_size, limit=int(limit))
         results = []
 
         if compare_btn:
             st.subheader(f"\U0001F4CA EMA Preset Comparison for {pair} on {candle_size} candles")
             st.caption("Compares total return, win rate, drawdown, and trade frequency for multiple EMA crossover configurations. Helps identify which preset is most effective for the selected pair and timeframe.")
 
+            # One CSV read, one sweep over all presets (no module globals touched)
+            df = load_pair(pair, candle_size).tail(int(limit))
+            combos = [
+                {"ema_short": short, "ema_long": long, "stop_loss": stop_loss, "take_profit": take_profit,
+                 "use_stoploss": True, "use_takeprofit": True}
+                for short, long in ema_presets.values()
+            ]
+            # A handful of presets on one pair: in-process is far cheaper than starting a worker pool per click
+            sweep = run_sweep(df, combos, initial_balance=initial_balance, leverage=leverage, workers=1,
+                              rank_by='ema_short', ascending=True)
             for name, (short, long) in ema_presets.items():
-                ema_crossover.EMA_SHORT = short
-                ema_crossover.EMA_LONG = long
-                ema_crossover.STOPLOSS_THRESHOLD = stop_loss
-                ema_crossover.TAKEPROFIT_THRESHOLD = take_profit
-
-                df = pd.read_csv(filepath, index_col="timestamp", parse_dates=True)
-                df, total_return, win_rate, max_dd = backtest(df, symbol=pair.replace("USDT", "/USDT"), short_window=short, long_window=long, initial_balance=initial_balance, leverage=leverage)
-                trade_count = df['position'].diff().abs().sum() / 2
+                row = sweep[(sweep['ema_short'] == short) & (sweep['ema_long'] == long)].iloc[0]
+                total_return, win_rate, max_dd, trade_count = row['total_return'], row['win_rate'], row['max_drawdown'], row['trades']
                 avg_profit = total_return / trade_count if trade_count else 0
 
                 results.append([name, round(total_return, 2), round(win_rate * 100, 2), round(max_dd * 100, 2), round(trade_count), round(avg_profit, 2)])
@@ -88,36 +95,42 @@ if run_btn or compare_btn:
             st.subheader(f"\U0001F4C9 Backtest Result for {pair} on {candle_size}")
             st.caption("Price chart with EMA crossovers and VWAP. Entry/exit markers are plotted. RSI and MACD show overbought/oversold zones.")
 
-            ema_crossover.EMA_SHORT = ema_short
-            ema_crossover.EMA_LONG = ema_long
-            ema_crossover.STOPLOSS_THRESHOLD = stop_loss
-            ema_crossover.TAKEPROFIT_THRESHOLD = take_profit
-
-            df = pd.read_csv(filepath, index_col="timestamp", parse_dates=True)
+            df = load_pair(pair, candle_size).tail(int(limit))
             df['VWAP'] = (df['close'] * df['volume']).cumsum() / df['volume'].cumsum()
-            df, total_return, win_rate, max_dd = backtest(df, symbol=pair.replace("USDT", "/USDT"), short_window=ema_short, long_window=ema_long, initial_balance=initial_balance, leverage=leverage)
-            trades_df = pd.read_csv("logs/trades.csv")
+            df, total_return, win_rate, max_dd, ledger, metrics = backtest(df, symbol=pair.replace("USDT", "/USDT"), short_window=ema_short, long_window=ema_long, initial_balance=initial_balance, leverage=leverage, stop_loss=stop_loss, take_profit=take_profit, return_trades=True, return_metrics=True)
+            trades_df = ledger.to_frame()
 
             col1, col2, col3 = st.columns(3)
             col1.metric("Total Return", f"${total_return:.2f}")
             col2.metric("Win Rate", f"{win_rate:.2%}")
             col3.metric("Max Drawdown", f"{max_dd:.2%}")
+            col4, col5, col6 = st.columns(3)
+            col4.metric("Sharpe / Sortino", f"{metrics['sharpe']:.2f} / {metrics['sortino']:.2f}")
+            col5.metric("Exposure", f"{metrics['exposure']:.2%}")
+            col6.metric("Trades", metrics['trades'])
 
             st.subheader("\U0001F4C8 Price Chart")
             st.caption("Shows price with EMA overlays and VWAP. Entry (green ▲) and exit (red ▼) markers indicate trades.")
 
+            entries = df[df['signal'] == 1]
+            exits = df[df['signal'] == -1]
+            # Series are downsampled server-side unless full resolution is asked for; trade bars always survive
+            keep = marker_positions(df.index, entries.index.union(exits.index))
+
             fig_price = go.Figure()
             if chart_type == "Candlestick":
-                fig_price.add_trace(go.Candlestick(x=df.index, open=df['open'], high=df['high'], low=df['low'], close=df['close'], name="Candlestick"))
+                candles = ohlc_points(df, max_points, keep)
+                fig_price.add_trace(go.Candlestick(x=candles.index, open=candles['open'], high=candles['high'], low=candles['low'], close=candles['close'], name="Candlestick"))
             else:
-                fig_price.add_trace(go.Scatter(x=df.index, y=df['close'], name='Close', line=dict(color='gray')))
+                close = line_points(df['close'], max_points, keep)
+                fig_price.add_trace(go.Scatter(x=close.index, y=close, name='Close', line=dict(color='gray')))
 
-            fig_price.add_trace(go.Scatter(x=df.index, y=df['EMA_SHORT'], name=f'EMA {ema_short}', line=dict(color='red')))
-            fig_price.add_trace(go.Scatter(x=df.index, y=df['EMA_LONG'], name=f'EMA {ema_long}', line=dict(color='blue')))
-            fig_price.add_trace(go.Scatter(x=df.index, y=df['VWAP'], name='VWAP', line=dict(color='orange', dash='dash')))
+            for col, name, line in [('EMA_SHORT', f'EMA {ema_short}', dict(color='red')),
+                                    ('EMA_LONG', f'EMA {ema_long}', dict(color='blue')),
+                                    ('VWAP', 'VWAP', dict(color='orange', dash='dash'))]:
+                series = line_points(df[col], max_points, keep)
+                fig_price.add_trace(go.Scatter(x=series.index, y=series, name=name, line=line))
 
-            entries = df[df['signal'] == 1]
-            exits = df[df['signal'] == -1]
             fig_price.add_trace(go.Scatter(x=entries.index, y=entries['close'], mode='markers', marker_symbol='triangle-up', marker_color='green', marker_size=10, name='Entry'))
             fig_price.add_trace(go.Scatter(x=exits.index, y=exits['close'], mode='markers', marker_symbol='triangle-down', marker_color='red', marker_size=10, name='Exit'))
 
@@ -127,7 +140,8 @@ if run_btn or compare_btn:
             st.subheader("\U0001F7E3 RSI")
             st.caption("RSI (Relative Strength Index) helps identify overbought (>70) and oversold (<30) conditions.")
             fig_rsi = go.Figure()
-            fig_rsi.add_trace(go.Scatter(x=df.index, y=df['RSI'], mode='lines', name='RSI', line=dict(color='purple')))
+            rsi = line_points(df['RSI'], max_points, keep)
+            fig_rsi.add_trace(go.Scatter(x=rsi.index, y=rsi, mode='lines', name='RSI', line=dict(color='purple')))
             fig_rsi.add_hline(y=70, line_dash='dash', line_color='red')
             fig_rsi.add_hline(y=30, line_dash='dash', line_color='green')
             fig_rsi.update_layout(height=300, hovermode='x unified', xaxis_title="Time", yaxis_title="RSI")
@@ -136,8 +150,10 @@ if run_btn or compare_btn:
             st.subheader("\U0001F535 MACD")
             st.caption("MACD shows trend momentum via short/long EMA crossovers. Cross above signal = bullish.")
             fig_macd = go.Figure()
-            fig_macd.add_trace(go.Scatter(x=df.index, y=df['MACD'], name='MACD', line=dict(color='blue')))
-            fig_macd.add_trace(go.Scatter(x=df.index, y=df['MACD_signal'], name='Signal Line', line=dict(color='orange')))
+            macd = line_points(df['MACD'], max_points, keep)
+            macd_signal = line_points(df['MACD_signal'], max_points, keep)
+            fig_macd.add_trace(go.Scatter(x=macd.index, y=macd, name='MACD', line=dict(color='blue')))
+            fig_macd.add_trace(go.Scatter(x=macd_signal.index, y=macd_signal, name='Signal Line', line=dict(color='orange')))
             fig_macd.add_hline(y=0, line_dash='dash', line_color='gray')
             fig_macd.update_layout(height=300, hovermode='x unified', xaxis_title="Time", yaxis_title="MACD")
             st.plotly_chart(fig_macd, use_container_width=True)
@@ -146,7 +162,8 @@ if run_btn or compare_btn:
                 st.subheader("\U0001F4CA Volume")
                 st.caption("Shows trading volume per candle. Helps identify strong price moves with volume confirmation.")
                 fig_vol = go.Figure()
-                fig_vol.add_trace(go.Bar(x=df.index, y=df['volume'], name='Volume', marker_color='lightblue'))
+                volume = line_points(df['volume'], max_points, keep, method='minmax')
+                fig_vol.add_trace(go.Bar(x=volume.index, y=volume, name='Volume', marker_color='lightblue'))
                 fig_vol.update_layout(height=250, xaxis_title="Time", yaxis_title="Volume", hovermode='x unified')
                 st.plotly_chart(fig_vol, use_container_width=True)
 
@@ -154,6 +171,6 @@ if run_btn or compare_btn:
             st.dataframe(trades_df, use_container_width=True)
 
     except FileNotFoundError:
-        st.error(f"Data file not found or failed to fetch: {filepath}")
+        st.error(f"No candles for {pair} {candle_size} in {partition_dir(pair, candle_size)} or failed to fetch")
     except Exception as e:
         st.exception(e)
\ No newline at end of file
@@ -6,45 +6,40 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from strategy.ema_crossover import ema_crossover_strategy
+from live.log_reader import LOGS_DIR, read_log
+from dashboards.chart_utils import MAX_POINTS, line_points, marker_positions
 
 st.set_page_config(layout="wide")
 st.title("📋 Bot Signal Log Viewer")
 
-# Load log file
-LOG_PATH = "../logs/test_bot_log.csv"
+# Load log file (anchored at the repo, not the working directory)
+LOG_PATH = os.path.join(LOGS_DIR, "test_bot_log.csv")
 
 try:
-    log_df = pd.read_csv(LOG_PATH, parse_dates=['timestamp'])
-    log_df.set_index("timestamp", inplace=True)
+    if not os.path.exists(LOG_PATH):
+        raise FileNotFoundError(LOG_PATH)
 
     st.sidebar.header("EMA Settings")
     ema_short = st.sidebar.slider("EMA Short", 3, 50, 5)
     ema_long = st.sidebar.slider("EMA Long", 5, 100, 9)
     use_rsi = st.sidebar.checkbox("Show RSI", value=True)
     use_macd = st.sidebar.checkbox("Show MACD", value=True)
+    full_res = st.sidebar.checkbox("Full-resolution charts", value=False, help=f"Off: each series is downsampled to ~{MAX_POINTS} points (signal rows always kept)")
+    max_points = None if full_res else MAX_POINTS
 
-    # Dummy OHLC reconstruction from price column
-    df = pd.DataFrame()
+    # Cached per file and EMA pair: a rerun only parses appended rows and advances the indicators over them
+    log_df = read_log(LOG_PATH, ema_windows=(ema_short, ema_long))
+
+    # Indicators over the logged price; signals are the ones the bot actually logged
+    df = pd.DataFrame(index=log_df.index)
     df["close"] = log_df["price"]
-    df["open"] = df["close"]
-    df["high"] = df["close"]
-    df["low"] = df["close"]
-    df["volume"] = 1
-    df.index = log_df.index
-
-    # Compute indicators from strategy
-    indicators_df = ema_crossover_strategy(df.copy(), symbol="BTC/USDT", short_window=ema_short, long_window=ema_long, capital=10000, log_trades=False)
-
-    # Pull just EMA, RSI, MACD over — but do NOT use strategy signals
-    df["EMA_SHORT"] = indicators_df["EMA_SHORT"]
-    df["EMA_LONG"] = indicators_df["EMA_LONG"]
-    df["RSI"] = indicators_df.get("RSI")
-    df["MACD"] = indicators_df.get("MACD")
-    df["MACD_signal"] = indicators_df.get("MACD_signal")
-
-    # Insert actual signals from log
+    df["EMA_SHORT"] = log_df[f"EMA_{ema_short}"]
+    df["EMA_LONG"] = log_df[f"EMA_{ema_long}"]
+    df["RSI"] = log_df["RSI"]
+    df["MACD"] = log_df["MACD"]
+    df["MACD_signal"] = log_df["MACD_signal"]
     df["signal"] = log_df["signal"]
+    log_df = log_df.drop(columns=[f"EMA_{ema_short}", f"EMA_{ema_long}", "RSI", "MACD", "MACD_signal"], errors='ignore')
 
     # === 🧮 Performance Summary ===
     st.subheader("📊 Performance Summary")
@@ -66,13 +61,15 @@ try:
 
     # === 📈 Price Chart ===
     st.subheader("📈 Price Chart with Signals")
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df.index, y=df['close'], name="Close", line=dict(color="gray")))
-    fig.add_trace(go.Scatter(x=df.index, y=df['EMA_SHORT'], name=f"EMA {ema_short}", line=dict(color="red")))
-    fig.add_trace(go.Scatter(x=df.index, y=df['EMA_LONG'], name=f"EMA {ema_long}", line=dict(color="blue")))
-
     buys = df[df['signal'] == '🟢 BUY']
     sells = df[df['signal'] == '🔴 SELL']
+    keep = marker_positions(df.index, buys.index.union(sells.index))
+
+    fig = go.Figure()
+    for col, name, color in [('close', "Close", "gray"), ('EMA_SHORT', f"EMA {ema_short}", "red"), ('EMA_LONG', f"EMA {ema_long}", "blue")]:
+        series = line_points(df[col], max_points, keep)
+        fig.add_trace(go.Scatter(x=series.index, y=series, name=name, line=dict(color=color)))
+
     fig.add_trace(go.Scatter(x=buys.index, y=buys['close'], mode='markers', marker_symbol='triangle-up',
                              marker_color='green', marker_size=10, name='BUY'))
     fig.add_trace(go.Scatter(x=sells.index, y=sells['close'], mode='markers', marker_symbol='triangle-down',
@@ -85,7 +82,8 @@ try:
     if use_rsi and 'RSI' in df.columns:
         st.subheader("📉 RSI")
         fig_rsi = go.Figure()
-        fig_rsi.add_trace(go.Scatter(x=df.index, y=df['RSI'], name='RSI', line=dict(color='purple')))
+        rsi = line_points(df['RSI'], max_points, keep)
+        fig_rsi.add_trace(go.Scatter(x=rsi.index, y=rsi, name='RSI', line=dict(color='purple')))
         fig_rsi.add_hline(y=70, line_dash='dash', line_color='red')
         fig_rsi.add_hline(y=30, line_dash='dash', line_color='green')
         fig_rsi.update_layout(height=250)
@@ -94,8 +92,10 @@ try:
     if use_macd and 'MACD' in df.columns:
         st.subheader("📉 MACD")
         fig_macd = go.Figure()
-        fig_macd.add_trace(go.Scatter(x=df.index, y=df['MACD'], name='MACD', line=dict(color='blue')))
-        fig_macd.add_trace(go.Scatter(x=df.index, y=df['MACD_signal'], name='Signal Line', line=dict(color='orange')))
+        macd = line_points(df['MACD'], max_points, keep)
+        macd_signal = line_points(df['MACD_signal'], max_points, keep)
+        fig_macd.add_trace(go.Scatter(x=macd.index, y=macd, name='MACD', line=dict(color='blue')))
+        fig_macd.add_trace(go.Scatter(x=macd_signal.index, y=macd_signal, name='Signal Line', line=dict(color='orange')))
         fig_macd.add_hline(y=0, line_dash='dash', line_color='gray')
         fig_macd.update_layout(height=250)
         st.plotly_chart(fig_macd, use_container_width=True)
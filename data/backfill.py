@@ -0,0 +1,129 @@
+# File: data/backfill.py (Paginated, resumable, concurrent OHLCV backfill into the store)
+# Usage: python -m data.backfill --pairs BTCUSDT,ETHUSDT --timeframes 1m,1h --since 2024-01-01 [--fake]
+
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import json
+import time
+import pandas as pd
+from data.fake_exchange import FakeExchange, synthetic_candles, timeframe_ms
+from data.ohlcv_store import STORE_DIR, normalize_pair, write_ohlcv
+
+CHECKPOINT_FILE = os.path.join(STORE_DIR, 'backfill_checkpoint.json')
+PAGE_LIMIT = 1000     # Bybit spot caps kline pages at 1000 candles
+FLUSH_ROWS = 50_000   # candles buffered per job before merging into the store
+
+
+def load_checkpoint(path=CHECKPOINT_FILE):
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def save_checkpoint(checkpoint, path=CHECKPOINT_FILE):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _rows_to_frame(rows):
+    df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df.set_index('timestamp', inplace=True)
+    return df
+
+
+async def backfill_one(exchange, symbol, timeframe, since_ms, until_ms, checkpoint, checkpoint_path, root,
+                       semaphore, page_limit=PAGE_LIMIT, flush_rows=FLUSH_ROWS):
+    # Page forward with a `since` cursor; the checkpoint only advances after rows are safely in the store
+    key = f"{normalize_pair(symbol)}/{timeframe}"
+    cursor = max(since_ms, checkpoint.get(key, since_ms))
+    step = timeframe_ms(timeframe)
+    buffer = []
+    pages = 0
+    stored = 0
+
+    async def flush():
+        nonlocal buffer, stored
+        if buffer:
+            # Parquet merge runs off the event loop so other jobs keep paging meanwhile
+            stored += await asyncio.to_thread(write_ohlcv, _rows_to_frame(buffer), symbol, timeframe, root)
+            checkpoint[key] = cursor
+            save_checkpoint(checkpoint, checkpoint_path)
+            buffer = []
+
+    while until_ms is None or cursor <= until_ms:
+        async with semaphore:
+            page = await exchange.fetch_ohlcv(symbol, timeframe, since=cursor, limit=page_limit)
+        pages += 1
+        if until_ms is not None:
+            page = [r for r in page if r[0] <= until_ms]
+        if not page or page[-1][0] < cursor:
+            break
+        buffer.extend(page)
+        if len(page) < page_limit:
+            # Caught up: the newest candle may still be forming, so the next run starts by refetching it
+            cursor = int(page[-1][0])
+            break
+        cursor = int(page[-1][0]) + step
+        if len(buffer) >= flush_rows:
+            await flush()
+    await flush()
+    return {"job": key, "pages": pages, "stored": stored, "cursor": cursor}
+
+
+async def backfill(jobs, since, until=None, exchange=None, concurrency=4, page_limit=PAGE_LIMIT,
+                   flush_rows=FLUSH_ROWS, root=STORE_DIR, checkpoint_path=CHECKPOINT_FILE):
+    # jobs: iterable of (symbol, timeframe); one shared client, so ccxt's throttler spaces every request
+    own_exchange = exchange is None
+    if own_exchange:
+        import ccxt.async_support as ccxt_async
+        exchange = ccxt_async.bybit({'enableRateLimit': True, 'options': {'defaultType': 'spot'}})
+    since_ms = int(pd.Timestamp(since).value // 1_000_000)
+    until_ms = int(pd.Timestamp(until).value // 1_000_000) if until is not None else None
+    checkpoint = load_checkpoint(checkpoint_path)
+    semaphore = asyncio.Semaphore(concurrency)
+    try:
+        return await asyncio.gather(*[
+            backfill_one(exchange, symbol, timeframe, since_ms, until_ms, checkpoint, checkpoint_path, root,
+                         semaphore, page_limit, flush_rows)
+            for symbol, timeframe in jobs
+        ])
+    finally:
+        if own_exchange:
+            await exchange.close()
+
+
+def fake_exchange_for(jobs, since, periods=5000):
+    # Canned history for offline runs: `periods` candles per job starting at `since`
+    exchange = FakeExchange()
+    for seed, (symbol, timeframe) in enumerate(jobs):
+        exchange.add_candles(symbol, timeframe, synthetic_candles(since, periods, timeframe, seed=seed))
+    return exchange
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfill Bybit OHLCV history into the local store.')
+    parser.add_argument('--pairs', type=str, default='BTCUSDT', help='Comma-separated pairs, e.g. BTCUSDT,ETHUSDT')
+    parser.add_argument('--timeframes', type=str, default='1h', help='Comma-separated timeframes, e.g. 1m,1h')
+    parser.add_argument('--since', type=str, required=True, help='First candle to fetch, e.g. 2024-01-01')
+    parser.add_argument('--until', type=str, default=None, help='Last candle to fetch (default: now)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Requests in flight at once')
+    parser.add_argument('--fake', action='store_true', help='Use a local fake exchange with canned candles')
+    args = parser.parse_args()
+
+    jobs = [(pair.replace('USDT', '/USDT'), tf) for pair in args.pairs.split(',') if pair
+            for tf in args.timeframes.split(',') if tf]
+    exchange = fake_exchange_for(jobs, args.since) if args.fake else None
+
+    start = time.perf_counter()
+    results = asyncio.run(backfill(jobs, args.since, args.until, exchange=exchange, concurrency=args.concurrency))
+    for r in results:
+        print(f"✅ {r['job']}: {r['stored']} new candles over {r['pages']} pages (resume at {pd.to_datetime(r['cursor'], unit='ms')})")
+    print(f"⏱️ Backfill finished in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,120 @@
+# File: data/exchange_client.py (Process-wide ccxt client registry with on-disk market metadata cache)
+# Usage: python -m data.exchange_client --symbol BTCUSDT --timeframe 1m --repeat 20 [--refresh]
+
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import json
+import threading
+import time
+from functools import lru_cache
+import ccxt
+from requests.adapters import HTTPAdapter
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+MARKETS_TTL = 6 * 3600   # seconds before cached market metadata is refetched
+POOL_SIZE = 16           # keep-alive connections per host in each client's session
+QUOTES = ('USDT', 'USDC', 'BTC', 'ETH', 'EUR', 'DAI')
+
+_clients = {}
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1024)
+def normalize_symbol(symbol):
+    # 'BTCUSDT', 'btc-usdt', 'BTC_USDT' and 'BTC/USDT' all become the unified ccxt 'BTC/USDT'
+    s = symbol.strip().upper().replace('-', '/').replace('_', '/')
+    if '/' in s:
+        return s
+    for quote in QUOTES:
+        if s.endswith(quote) and len(s) > len(quote):
+            return f"{s[:-len(quote)]}/{quote}"
+    return s
+
+
+def markets_cache_path(name='bybit', default_type='spot', sandbox=False, cache_dir=CACHE_DIR):
+    suffix = '_sandbox' if sandbox else ''
+    return os.path.join(cache_dir, f"markets_{name}_{default_type}{suffix}.json")
+
+
+def load_markets_cached(exchange, path, ttl=MARKETS_TTL, refresh=False):
+    # Serve markets from disk while fresh; only hit the API when the file is missing, stale or unreadable
+    if exchange.markets and not refresh:
+        return exchange.markets
+    if not refresh and os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl:
+        try:
+            with open(path, 'r') as f:
+                cached = json.load(f)
+            exchange.set_markets(cached['markets'], cached.get('currencies'))
+            return exchange.markets
+        except (ValueError, KeyError):
+            pass
+    exchange.load_markets(reload=True)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'markets': exchange.markets, 'currencies': exchange.currencies}, f, default=str)
+    os.replace(tmp_path, path)
+    return exchange.markets
+
+
+def get_exchange(name='bybit', default_type='spot', sandbox=False, api_key=None, secret=None,
+                 ttl=MARKETS_TTL, cache_dir=CACHE_DIR):
+    # One client per configuration for the whole process, so sessions and markets are reused across calls
+    key = (name, default_type, sandbox, api_key)
+    with _lock:
+        exchange = _clients.get(key)
+        if exchange is None:
+            config = {'enableRateLimit': True, 'options': {'defaultType': default_type}}
+            if api_key:
+                config.update({'apiKey': api_key, 'secret': secret})
+            exchange = getattr(ccxt, name)(config)
+            if sandbox:
+                exchange.set_sandbox_mode(True)
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            exchange.session.mount('https://', adapter)
+            exchange.session.mount('http://', adapter)
+            _clients[key] = exchange
+    try:
+        load_markets_cached(exchange, markets_cache_path(name, default_type, sandbox, cache_dir), ttl)
+    except ccxt.BaseError as e:
+        # ccxt loads markets lazily on the first request anyway; don't fail client creation over it
+        print(f"⚠️ Could not load {name} markets: {e}")
+    return exchange
+
+
+def clear_exchanges():
+    with _lock:
+        for exchange in _clients.values():
+            exchange.session.close()
+        _clients.clear()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time repeated small OHLCV fetches with a fresh vs a shared client.')
+    parser.add_argument('--symbol', type=str, default='BTCUSDT', help='e.g. BTCUSDT or BTC/USDT')
+    parser.add_argument('--timeframe', type=str, default='1m', help='e.g. 1m, 5m, 1h')
+    parser.add_argument('--limit', type=int, default=100, help='Candles per request')
+    parser.add_argument('--repeat', type=int, default=10, help='Requests per variant')
+    parser.add_argument('--refresh', action='store_true', help='Ignore the cached market metadata')
+    args = parser.parse_args()
+
+    symbol = normalize_symbol(args.symbol)
+    if args.refresh:
+        path = markets_cache_path()
+        if os.path.exists(path):
+            os.remove(path)
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        ccxt.bybit({'options': {'defaultType': 'spot'}}).fetch_ohlcv(symbol, args.timeframe, limit=args.limit)
+    fresh = (time.perf_counter() - start) / args.repeat
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        get_exchange().fetch_ohlcv(symbol, args.timeframe, limit=args.limit)
+    shared = (time.perf_counter() - start) / args.repeat
+
+    print(f"⏱️ {symbol} {args.timeframe} x{args.limit}: fresh client {fresh * 1000:.1f} ms/request, "
+          f"shared client {shared * 1000:.1f} ms/request ({fresh / shared:.1f}x)")
@@ -0,0 +1,89 @@
+# File: data/fake_exchange.py (Local stand-in for ccxt's async bybit client)
+# Serves canned OHLCV pages with ccxt's fetch_ohlcv(symbol, timeframe, since, limit) semantics, no network needed.
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import asyncio
+import time
+import numpy as np
+import pandas as pd
+
+TIMEFRAME_MS = {
+    '1m': 60_000, '3m': 180_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '2h': 7_200_000, '4h': 14_400_000, '6h': 21_600_000, '12h': 43_200_000,
+    '1d': 86_400_000, '1w': 604_800_000,
+}
+
+
+def timeframe_ms(timeframe):
+    return TIMEFRAME_MS[timeframe]
+
+
+def synthetic_candles(start, periods, timeframe='1m', price=50_000.0, seed=0):
+    # Deterministic random-walk candles as ccxt rows: [ms, open, high, low, close, volume]
+    rng = np.random.default_rng(seed)
+    step = timeframe_ms(timeframe)
+    ts = pd.Timestamp(start).value // 1_000_000 + np.arange(periods, dtype=np.int64) * step
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.001, periods)))
+    open_ = np.concatenate(([price], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0005, periods)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.gamma(2.0, 1.0, periods)
+    return [[int(t), o, h, l, c, v] for t, o, h, l, c, v in zip(ts.tolist(), open_.tolist(), high.tolist(), low.tolist(), close.tolist(), volume.tolist())]
+
+
+class FakeExchange:
+    # Async, like ccxt.async_support.bybit; candles maps (symbol, timeframe) -> list of ccxt OHLCV rows
+    def __init__(self, candles=None, rate_limit=0, max_limit=1000, latency=0.0):
+        self.candles = {}
+        self._times = {}
+        for key, rows in (candles or {}).items():
+            self.add_candles(*key, rows)
+        self.rateLimit = rate_limit  # ms between requests, as in ccxt
+        self.max_limit = max_limit
+        self.latency = latency
+        self.calls = []
+        self.markets = None
+        self._throttle = asyncio.Lock()
+        self._last_request = 0.0
+
+    def add_candles(self, symbol, timeframe, rows):
+        key = (symbol, timeframe)
+        self.candles[key] = sorted(self.candles.get(key, []) + list(rows), key=lambda r: r[0])
+        self._times[key] = np.array([r[0] for r in self.candles[key]], dtype=np.int64)
+
+    def milliseconds(self):
+        return int(time.time() * 1000)
+
+    def parse_timeframe(self, timeframe):
+        return timeframe_ms(timeframe) // 1000
+
+    async def _wait_turn(self):
+        # Requests are spaced rateLimit ms apart, like ccxt's built-in throttler with enableRateLimit
+        async with self._throttle:
+            wait = self._last_request + self.rateLimit / 1000 - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_request = time.monotonic()
+
+    async def load_markets(self, reload=False):
+        if self.markets is None or reload:
+            self.markets = {symbol: {"symbol": symbol, "id": symbol.replace('/', ''), "spot": True}
+                            for symbol, _ in self.candles}
+        return self.markets
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        await self._wait_turn()
+        self.calls.append((symbol, timeframe, since, limit))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        rows = self.candles.get((symbol, timeframe), [])
+        limit = min(limit or self.max_limit, self.max_limit)
+        if since is None:
+            return [list(r) for r in rows[-limit:]]
+        start = int(np.searchsorted(self._times[(symbol, timeframe)], since, side='left')) if rows else 0
+        return [list(r) for r in rows[start:start + limit]]
+
+    async def close(self):
+        pass
@@ -1,42 +1,71 @@
 # File: data/fetch_bybit_data.py
-# Usage: python data/fetch_bybit_data.py --pair BTCUSDT --timeframe 1h --limit 1000
+# Usage: python -m data.fetch_data --pair BTCUSDT --timeframe 1h --limit 1000 [--csv]
 
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import warnings
 warnings.filterwarnings("ignore")
-import ccxt
 import pandas as pd
 import argparse
-import os
+from data.exchange_client import get_exchange, normalize_symbol
+
+PAGE_LIMIT = 1000
 
 
-def fetch_bybit_data(symbol='BTC/USDT', timeframe='1h', limit=1000):
-    exchange = ccxt.bybit({
-        'options': {
-            'defaultType': 'spot'  # Ensure it's pulling spot market data
-        }
-    })
+def fetch_bybit_data(symbol='BTC/USDT', timeframe='1h', limit=1000, exchange=None):
+    # Callers without their own client share the process-wide spot client (pooled session, cached markets)
+    if exchange is None:
+        exchange = get_exchange('bybit', default_type='spot')
+    symbol = normalize_symbol(symbol)
     # 🔓 No sandbox mode – using live data
-    data = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+    if limit <= PAGE_LIMIT:
+        data = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+    else:
+        # Bybit caps a kline request at 1000 candles, so deeper history is paged forward with a `since` cursor
+        step = exchange.parse_timeframe(timeframe) * 1000
+        since = exchange.milliseconds() - limit * step
+        data = []
+        while len(data) < limit:
+            page = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=PAGE_LIMIT)
+            if not page:
+                break
+            data.extend(r for r in page if not data or r[0] > data[-1][0])
+            if len(page) < PAGE_LIMIT:
+                break
+            since = page[-1][0] + step
+        data = data[-limit:]
     df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
     df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
     df.set_index('timestamp', inplace=True)
     return df
 
 def save_to_csv(pair='BTCUSDT', timeframe='1h', limit=1000, save_dir='data'):
-    symbol_ccxt = pair.replace('USDT', '/USDT')
-    df = fetch_bybit_data(symbol_ccxt, timeframe, limit)
+    df = fetch_bybit_data(normalize_symbol(pair), timeframe, limit)
     os.makedirs(save_dir, exist_ok=True)
     filepath = os.path.join(save_dir, f'{pair}_{timeframe}.csv')
     df.to_csv(filepath)
     print(f"✅ Saved: {filepath}")
 
+def save_to_store(pair='BTCUSDT', timeframe='1h', limit=1000):
+    # Merge the fetched candles into the partitioned store instead of replacing a flat file
+    from data.ohlcv_store import write_ohlcv
+    df = fetch_bybit_data(normalize_symbol(pair), timeframe, limit)
+    added = write_ohlcv(df, pair, timeframe)
+    print(f"✅ Stored: {pair} {timeframe} (+{added} new candles)")
+    return df
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Fetch Bybit OHLCV data and save as CSV.')
     parser.add_argument('--pair', type=str, default='BTCUSDT', help='e.g. BTCUSDT, ETHUSDT')
     parser.add_argument('--timeframe', type=str, default='1h', help='e.g. 1m, 5m, 1h, 1d')
     parser.add_argument('--limit', type=int, default=1000, help='Number of candles to fetch')
+    parser.add_argument('--csv', action='store_true', help='Write a flat CSV instead of the partitioned store')
     args = parser.parse_args()
 
-    save_to_csv(pair=args.pair, timeframe=args.timeframe, limit=args.limit)
+    if args.csv:
+        save_to_csv(pair=args.pair, timeframe=args.timeframe, limit=args.limit)
+    else:
+        save_to_store(pair=args.pair, timeframe=args.timeframe, limit=args.limit)
 
 
@@ -0,0 +1,137 @@
+# File: data/ohlcv_store.py (Partitioned Parquet OHLCV store)
+# Layout: data/store/{PAIR}/{TIMEFRAME}/{YYYY-MM}.parquet, rows sorted and unique on timestamp
+# Usage: python -m data.ohlcv_store --import_csv data/BTCUSDT_1h.csv --pair BTCUSDT --timeframe 1h
+
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'store')
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+SCHEMA = pa.schema([('timestamp', pa.timestamp('ns'))] + [(c, pa.float64()) for c in OHLCV_COLUMNS])
+
+
+def normalize_pair(pair):
+    return pair.replace('/', '').upper()
+
+
+def partition_dir(pair, timeframe, root=STORE_DIR):
+    return os.path.join(root, normalize_pair(pair), timeframe)
+
+
+def list_months(pair, timeframe, root=STORE_DIR):
+    path = partition_dir(pair, timeframe, root)
+    if not os.path.isdir(path):
+        return []
+    return sorted(f[:-len('.parquet')] for f in os.listdir(path) if f.endswith('.parquet'))
+
+
+def _to_table(df):
+    frame = df[OHLCV_COLUMNS].astype('float64')
+    frame.insert(0, 'timestamp', pd.DatetimeIndex(df.index).as_unit('ns'))
+    return pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False)
+
+
+def write_ohlcv(df, pair, timeframe, root=STORE_DIR):
+    # Merge candles into their month partitions; only touched months are rewritten, newer rows win on duplicates
+    if df is None or df.empty:
+        return 0
+    directory = partition_dir(pair, timeframe, root)
+    os.makedirs(directory, exist_ok=True)
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+
+    # Rows are sorted, so each month is one contiguous slice
+    keys = df.index.year * 100 + df.index.month
+    months, starts = np.unique(keys, return_index=True)
+    bounds = list(starts) + [len(df)]
+
+    added = 0
+    for m, key in enumerate(months):
+        month = f"{key // 100:04d}-{key % 100:02d}"
+        chunk = df.iloc[bounds[m]:bounds[m + 1]]
+        path = os.path.join(directory, f"{month}.parquet")
+        if os.path.exists(path):
+            existing = _read_files([path])
+            before = len(existing)
+            chunk = pd.concat([existing, chunk[OHLCV_COLUMNS]])
+            chunk = chunk[~chunk.index.duplicated(keep='last')].sort_index()
+            added += len(chunk) - before
+        else:
+            added += len(chunk)
+        # Write-then-rename so readers never see a half-written partition
+        tmp_path = path + '.tmp'
+        pq.write_table(_to_table(chunk), tmp_path, row_group_size=65536)
+        os.replace(tmp_path, path)
+    return added
+
+
+def _read_files(paths, start=None, end=None, columns=None):
+    dataset = ds.dataset(paths, schema=SCHEMA, format='parquet')
+    condition = None
+    if start is not None:
+        condition = ds.field('timestamp') >= pa.scalar(pd.Timestamp(start).as_unit('ns'), type=pa.timestamp('ns'))
+    if end is not None:
+        upper = ds.field('timestamp') <= pa.scalar(pd.Timestamp(end).as_unit('ns'), type=pa.timestamp('ns'))
+        condition = upper if condition is None else condition & upper
+    # The filter is pushed down to Parquet row-group statistics
+    table = dataset.to_table(columns=['timestamp'] + (columns or OHLCV_COLUMNS), filter=condition)
+    df = table.to_pandas()
+    df.set_index('timestamp', inplace=True)
+    return df
+
+
+def load_ohlcv(pair, timeframe, start=None, end=None, root=STORE_DIR, columns=None):
+    # Same shape the strategy expects: DatetimeIndex named 'timestamp' plus open/high/low/close/volume
+    months = list_months(pair, timeframe, root)
+    if start is not None:
+        months = [m for m in months if m >= pd.Timestamp(start).strftime('%Y-%m')]
+    if end is not None:
+        months = [m for m in months if m <= pd.Timestamp(end).strftime('%Y-%m')]
+    if not months:
+        return pd.DataFrame(columns=columns or OHLCV_COLUMNS, index=pd.DatetimeIndex([], name='timestamp'), dtype='float64')
+    directory = partition_dir(pair, timeframe, root)
+    return _read_files([os.path.join(directory, f"{m}.parquet") for m in months], start, end, columns)
+
+
+def load_pair(pair, timeframe, start=None, end=None, data_dir='data', root=STORE_DIR):
+    # Prefer the store, fall back to the legacy flat CSV for pairs that were never ingested
+    df = load_ohlcv(pair, timeframe, start, end, root)
+    if not df.empty:
+        return df
+    filename = os.path.join(data_dir, f"{normalize_pair(pair)}_{timeframe}.csv")
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f"No stored or CSV data for {pair} {timeframe}")
+    df = pd.read_csv(filename, index_col="timestamp", parse_dates=True)
+    if start is not None:
+        df = df[df.index >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df.index <= pd.Timestamp(end)]
+    return df
+
+
+def import_csv(path, pair, timeframe, root=STORE_DIR):
+    df = pd.read_csv(path, index_col="timestamp", parse_dates=True)
+    return write_ohlcv(df, pair, timeframe, root)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Inspect or import into the partitioned OHLCV store.')
+    parser.add_argument('--pair', type=str, default='BTCUSDT', help='e.g. BTCUSDT, ETHUSDT')
+    parser.add_argument('--timeframe', type=str, default='1h', help='e.g. 1m, 5m, 1h, 1d')
+    parser.add_argument('--import_csv', type=str, default=None, help='CSV file to merge into the store')
+    args = parser.parse_args()
+
+    if args.import_csv:
+        added = import_csv(args.import_csv, args.pair, args.timeframe)
+        print(f"✅ Imported {added} new candles from {args.import_csv}")
+
+    df = load_ohlcv(args.pair, args.timeframe)
+    months = list_months(args.pair, args.timeframe)
+    print(f"📦 {args.pair} {args.timeframe}: {len(df)} candles in {len(months)} partitions"
+          + (f" ({df.index[0]} → {df.index[-1]})" if len(df) else ""))
@@ -0,0 +1,252 @@
+# File: live/alerts.py (Non-blocking Telegram alert dispatcher)
+# Usage: python -m live.alerts --stub [--fail 3] [--burst 50]
+
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import atexit
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+
+TELEGRAM_API = "https://api.telegram.org"
+SPOOL_PATH = "logs/telegram_spool.jsonl"
+MAX_MESSAGE_CHARS = 4096   # Telegram's sendMessage limit
+MIN_INTERVAL = 1.0         # seconds between messages to one chat
+COALESCE_WINDOW = 0.5      # alerts arriving this close together go out as one message
+SENT, REJECTED, UNREACHABLE = 'sent', 'rejected', 'unreachable'   # _post outcomes; only UNREACHABLE is retried later
+
+
+class TelegramDispatcher:
+    # send() only enqueues; a background thread coalesces, rate-limits, retries and spills to disk
+    def __init__(self, token, chat_id, base_url=TELEGRAM_API, min_interval=MIN_INTERVAL,
+                 coalesce_window=COALESCE_WINDOW, max_retries=4, backoff=1.0, timeout=5.0, spool_path=SPOOL_PATH):
+        self.url = f"{base_url}/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.min_interval = min_interval
+        self.coalesce_window = coalesce_window
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.spool_path = spool_path
+
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+        self.queue = queue.Queue()
+        self.sent = 0
+        self.failed = 0
+        self.rejected = 0
+        self.spilled = 0
+        self._last_sent = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="telegram-dispatcher", daemon=True)
+        self._thread.start()
+        self._replay_spool()
+
+    def send(self, message):
+        self.queue.put_nowait(str(message))
+
+    def _replay_spool(self):
+        # Alerts spilled while Telegram was unreachable go out again (coalesced) once it answers
+        if not self.spool_path or not os.path.exists(self.spool_path):
+            return
+        tmp_path = self.spool_path + ".replay"
+        os.replace(self.spool_path, tmp_path)
+        with open(tmp_path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self.send(f"[delayed from {entry['time']}]\n{entry['text']}")
+        os.remove(tmp_path)
+
+    def _spill(self, text):
+        os.makedirs(os.path.dirname(self.spool_path) or ".", exist_ok=True)
+        with open(self.spool_path, "a") as f:
+            f.write(json.dumps({"time": datetime.now().isoformat(timespec="seconds"), "text": text}) + "\n")
+        self.spilled += 1
+
+    def _batches(self, messages):
+        # Pack messages into as few Telegram-sized bodies as possible
+        batch = ""
+        for m in messages:
+            m = m[:MAX_MESSAGE_CHARS]
+            if batch and len(batch) + 2 + len(m) > MAX_MESSAGE_CHARS:
+                yield batch
+                batch = ""
+            batch = f"{batch}\n\n{m}" if batch else m
+        if batch:
+            yield batch
+
+    def _post(self, text):
+        # REJECTED is a permanent 4xx (bad chat_id, message too long): resending can never succeed, so it is dropped;
+        # UNREACHABLE (network errors, 5xx, retries used up on 429) is worth spooling for the next run
+        for attempt in range(self.max_retries + 1):
+            wait = self._last_sent + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            delay = self.backoff * 2 ** attempt
+            try:
+                r = self.session.post(self.url, data={"chat_id": self.chat_id, "text": text}, timeout=self.timeout)
+                self._last_sent = time.monotonic()
+                if r.status_code == 200:
+                    self.sent += 1
+                    return SENT
+                if r.status_code == 429:
+                    # Telegram says how long to back off for
+                    try:
+                        delay = float(r.json().get("parameters", {}).get("retry_after", delay))
+                    except ValueError:
+                        pass
+                elif 400 <= r.status_code < 500:
+                    print(f"❌ Telegram rejected alert ({r.status_code}), dropping it: {r.text[:200]}")
+                    self.rejected += 1
+                    return REJECTED
+            except requests.RequestException as e:
+                print(f"❌ Telegram error (attempt {attempt + 1}): {e}")
+            if attempt < self.max_retries:
+                self._stop.wait(delay)
+        self.failed += 1
+        return UNREACHABLE
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self.queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            messages = [first]
+            deadline = time.monotonic() + self.coalesce_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    messages.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            for text in self._batches(messages):
+                if self._post(text) == UNREACHABLE:
+                    self._spill(text)
+            for _ in messages:
+                self.queue.task_done()
+
+    def flush(self, timeout=10.0):
+        # Wait (bounded) for queued alerts to go out; used at shutdown and in tests, never in the trading loop
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return self.queue.unfinished_tasks == 0
+
+    def close(self, timeout=10.0):
+        self.flush(timeout)
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        # Whatever is still queued is kept for the next run rather than dropped
+        while True:
+            try:
+                self._spill(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        self.session.close()
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    # Built lazily so the bots' load_dotenv() has run; None when Telegram isn't configured
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            token = os.getenv("TELEGRAM_TOKEN")
+            chat_id = os.getenv("TELEGRAM_CHAT_ID")
+            if not token or not chat_id:
+                return None
+            _dispatcher = TelegramDispatcher(token, chat_id)
+            atexit.register(_dispatcher.close, 5.0)
+        return _dispatcher
+
+
+def send_telegram_alert(message):
+    dispatcher = get_dispatcher()
+    if dispatcher is None:
+        print("⚠️ Telegram not configured.")
+        return
+    dispatcher.send(message)
+
+
+def start_stub_server(fail_first=0, rate_limit_every=0):
+    # Local stand-in for api.telegram.org: records every sendMessage, can fail or 429 on demand
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs
+
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+            Handler.requests += 1
+            if Handler.requests <= fail_first:
+                status, reply = 502, {"ok": False}
+            elif rate_limit_every and Handler.requests % rate_limit_every == 0:
+                status, reply = 429, {"ok": False, "parameters": {"retry_after": 0.2}}
+            else:
+                received.append(body.get("text", [""])[0])
+                status, reply = 200, {"ok": True}
+            payload = json.dumps(reply).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    Handler.requests = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, received
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exercise the Telegram dispatcher against a local HTTP stub.")
+    parser.add_argument("--stub", action="store_true", help="Send to a local stub instead of api.telegram.org")
+    parser.add_argument("--burst", type=int, default=50, help="Alerts to fire at once (one per symbol)")
+    parser.add_argument("--fail", type=int, default=2, help="Stub answers the first N requests with 502")
+    args = parser.parse_args()
+
+    if args.stub:
+        server, received = start_stub_server(fail_first=args.fail, rate_limit_every=5)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        dispatcher = TelegramDispatcher("TEST", "42", base_url=base_url, min_interval=0.05, backoff=0.05,
+                                        spool_path=os.path.join("logs", "telegram_stub_spool.jsonl"))
+    else:
+        from dotenv import load_dotenv
+        load_dotenv(override=True)
+        dispatcher = get_dispatcher()
+        if dispatcher is None:
+            sys.exit("⚠️ Telegram not configured (TELEGRAM_TOKEN / TELEGRAM_CHAT_ID).")
+
+    start = time.perf_counter()
+    for i in range(args.burst):
+        dispatcher.send(f"🟢 BUY | SYM{i}/USDT at ${100 + i:.2f}")
+    enqueue_ms = (time.perf_counter() - start) * 1000
+    print(f"⏱️ {args.burst} alerts enqueued in {enqueue_ms:.2f} ms ({enqueue_ms / args.burst * 1000:.1f} µs each)")
+
+    dispatcher.flush(30)
+    print(f"✅ Delivered {dispatcher.sent} message(s) for {args.burst} alerts | failed {dispatcher.failed} | "
+          f"rejected {dispatcher.rejected} | spilled {dispatcher.spilled}")
+    if args.stub:
+        print(f"📨 Stub received {len(received)} message(s); alerts inside: {sum(t.count('SYM') for t in received)}")
+    dispatcher.close()
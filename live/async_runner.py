@@ -0,0 +1,169 @@
+# File: live/async_runner.py (Multi-symbol, multi-timeframe asyncio signal runner)
+# Usage: python -m live.async_runner --symbols BTC/USDT,ETH/USDT,SOL/USDT --timeframes 1m,5m,1h [--fake]
+
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import time
+import warnings
+warnings.filterwarnings("ignore")
+import pandas as pd
+from data.fake_exchange import FakeExchange, synthetic_candles, timeframe_ms
+from strategy.ema_crossover import ema_crossover_strategy
+from strategy.indicator_state import IndicatorState
+
+SIGNAL_LABELS = {1: "🟢 BUY", -1: "🔴 SELL", 0: "⚪ HOLD"}
+
+
+class SymbolState:
+    # Everything one (symbol, timeframe) pair remembers between cycles; nothing is shared across pairs
+    def __init__(self, symbol, timeframe, short_window=5, long_window=9):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.indicators = IndicatorState(short_window, long_window)
+        self.last_candle = None   # open time (ms) of the newest closed candle already evaluated
+        self.last_signal = 0
+        self.evaluations = 0
+        self.errors = 0
+
+    @property
+    def key(self):
+        return f"{self.symbol} {self.timeframe}"
+
+
+class AsyncRunner:
+    def __init__(self, watchlist, exchange=None, limit=100, concurrency=10, short_window=5, long_window=9,
+                 capital=100, on_signal=None):
+        if exchange is None:
+            import ccxt.async_support as ccxt_async
+            exchange = ccxt_async.bybit({'enableRateLimit': True, 'options': {'defaultType': 'spot'}})
+        self.exchange = exchange
+        self.limit = limit
+        self.short_window = short_window
+        self.long_window = long_window
+        self.capital = capital
+        self.on_signal = on_signal
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.states = {f"{s} {tf}": SymbolState(s, tf, short_window, long_window) for s, tf in watchlist}
+        self.cycles = 0
+
+    def _due(self, state, now_ms):
+        # A pair only needs work once a candle newer than the last evaluated one has closed
+        step = timeframe_ms(state.timeframe)
+        last_closed = (now_ms // step - 1) * step
+        return state.last_candle is None or last_closed > state.last_candle
+
+    async def _fetch(self, state):
+        async with self.semaphore:
+            rows = await self.exchange.fetch_ohlcv(state.symbol, state.timeframe, limit=self.limit)
+        df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.set_index('timestamp', inplace=True)
+        return df
+
+    def _evaluate(self, state, df, now_ms):
+        # Drop the still-forming candle so a signal never repaints within its bar
+        step = timeframe_ms(state.timeframe)
+        if len(df) and df.index[-1].value // 1_000_000 + step > now_ms:
+            df = df.iloc[:-1]
+        if df.empty:
+            return None
+        candle_ms = df.index[-1].value // 1_000_000
+        if state.last_candle is not None and candle_ms <= state.last_candle:
+            return None
+
+        df = ema_crossover_strategy(df, symbol=state.symbol, short_window=self.short_window,
+                                    long_window=self.long_window, capital=self.capital, log_trades=False)
+        snapshot = state.indicators.update_from_frame(df)
+        signal = int(df['signal'].iloc[-1])
+        state.last_candle = candle_ms
+        state.last_signal = signal
+        state.evaluations += 1
+        return {
+            "symbol": state.symbol,
+            "timeframe": state.timeframe,
+            "timestamp": df.index[-1],
+            "price": float(df['close'].iloc[-1]),
+            "signal": signal,
+            "RSI": snapshot["RSI"] if snapshot else None,
+        }
+
+    async def _run_one(self, state, now_ms):
+        try:
+            df = await self._fetch(state)
+        except Exception as e:
+            state.errors += 1
+            print(f"❌ {state.key}: {e}")
+            return None
+        return self._evaluate(state, df, now_ms)
+
+    async def run_cycle(self):
+        start = time.perf_counter()
+        now_ms = self.exchange.milliseconds()
+        due = [state for state in self.states.values() if self._due(state, now_ms)]
+        results = [r for r in await asyncio.gather(*[self._run_one(state, now_ms) for state in due]) if r]
+        self.cycles += 1
+        elapsed = time.perf_counter() - start
+
+        for r in results:
+            if r["signal"] != 0:
+                print(f"{SIGNAL_LABELS[r['signal']]} {r['symbol']} {r['timeframe']} at ${r['price']:.2f} ({r['timestamp']})")
+                if self.on_signal:
+                    self.on_signal(r)
+        print(f"⏱️ Cycle {self.cycles}: {len(due)}/{len(self.states)} pairs due, {len(results)} evaluated in {elapsed * 1000:.1f} ms")
+        return results, elapsed
+
+    async def run_forever(self, interval=60):
+        # Cycles start on interval boundaries, shortly after candles close
+        try:
+            while True:
+                await self.run_cycle()
+                delay = interval - (time.time() % interval) + 1
+                await asyncio.sleep(delay)
+        finally:
+            await self.close()
+
+    async def close(self):
+        await self.exchange.close()
+
+
+def fake_watchlist_exchange(watchlist, periods=300, latency=0.05):
+    # Local mock exchange: recent synthetic history for every pair, with simulated network latency
+    exchange = FakeExchange(latency=latency)
+    now = pd.Timestamp.now(tz='UTC').tz_localize(None)
+    for seed, (symbol, timeframe) in enumerate(watchlist):
+        step = pd.Timedelta(milliseconds=timeframe_ms(timeframe))
+        start = now.floor(step) - step * periods
+        exchange.add_candles(symbol, timeframe, synthetic_candles(start, periods, timeframe, seed=seed))
+    return exchange
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch many symbols/timeframes for EMA crossover signals at once.")
+    parser.add_argument("--symbols", default="BTC/USDT,ETH/USDT", help="Comma-separated pairs")
+    parser.add_argument("--timeframes", default="1m", help="Comma-separated timeframes, e.g. 1m,5m,1h")
+    parser.add_argument("--limit", type=int, default=100, help="Candles fetched per pair")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once")
+    parser.add_argument("--capital", type=float, default=100, help="Capital used for sizing")
+    parser.add_argument("--cycles", type=int, default=0, help="Stop after N cycles (0 = run forever)")
+    parser.add_argument("--fake", action="store_true", help="Use a local mock exchange")
+    args = parser.parse_args()
+
+    watchlist = [(s, tf) for s in args.symbols.split(',') if s for tf in args.timeframes.split(',') if tf]
+
+    async def main():
+        exchange = fake_watchlist_exchange(watchlist) if args.fake else None
+        runner = AsyncRunner(watchlist, exchange=exchange, limit=args.limit, concurrency=args.concurrency,
+                             capital=args.capital)
+        if args.cycles:
+            try:
+                for _ in range(args.cycles):
+                    await runner.run_cycle()
+            finally:
+                await runner.close()
+        else:
+            await runner.run_forever()
+
+    asyncio.run(main())
@@ -1,53 +1,45 @@
 # File: live/bybit_bot.py
 
 import os
-import ccxt
-import pandas as pd
-import requests
-from datetime import datetime
 from dotenv import load_dotenv
-from strategy.ema_crossover import ema_crossover_strategy
+from strategy.indicator_state import catchup_limit, cross_signal, load_indicator_state, save_indicator_state, state_path
+from live.alerts import send_telegram_alert
+from live.log_writer import get_log_writer
 from data.fetch_data import fetch_bybit_data  # ✅ Updated
+from data.exchange_client import get_exchange
 import argparse
 
 load_dotenv(override=True)
 
 api_key = os.getenv('BYBIT_API_KEY')
 api_secret = os.getenv('BYBIT_API_SECRET')
-chat_id = os.getenv('TELEGRAM_CHAT_ID')
-bot_token = os.getenv('TELEGRAM_TOKEN')
 
-exchange = ccxt.bybit({
-    'apiKey': api_key,
-    'secret': api_secret,
-    'enableRateLimit': True,
-})
-exchange.set_sandbox_mode(True)
+exchange = get_exchange('bybit', default_type='spot', sandbox=True, api_key=api_key, secret=api_secret)
 
 LOG_PATH = 'logs/live_trades.csv'
-os.makedirs('logs', exist_ok=True)
+INDICATOR_STATE_FILE = 'logs/live_indicator_state_{pair}_{timeframe}.json'  # one per symbol and timeframe
+LOG_WRITER = get_log_writer(os.path.dirname(LOG_PATH), os.path.basename(LOG_PATH),
+                            columns=['timestamp', 'symbol', 'action', 'price', 'amount', 'mode'])
 
-def send_telegram_alert(message):
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-    data = {"chat_id": chat_id, "text": message}
-    try:
-        requests.post(url, data=data)
-    except Exception as e:
-        print("Telegram error:", str(e))
 
 def log_trade(time, symbol, action, price, amount, mode):
-    df = pd.DataFrame([[time, symbol, action, price, amount, mode]],
-                      columns=['timestamp', 'symbol', 'action', 'price', 'amount', 'mode'])
-    if os.path.exists(LOG_PATH):
-        df.to_csv(LOG_PATH, mode='a', header=False, index=False)
-    else:
-        df.to_csv(LOG_PATH, mode='w', header=True, index=False)
-
-def run_live_bot(symbol='BTC/USDT', timeframe='1m', capital=100, stop_loss_pct=0.02, take_profit_pct=0.04, mode='paper'):
-    df = fetch_bybit_data(symbol, timeframe, limit=100)  # ✅ From live Bybit spot
-    df = ema_crossover_strategy(df, symbol=symbol, short_window=5, long_window=9, capital=capital)
-
-    latest_signal = df['signal'].iloc[-1]
+    LOG_WRITER.write({'timestamp': time, 'symbol': symbol, 'action': action, 'price': price,
+                      'amount': amount, 'mode': mode})
+
+def run_live_bot(symbol='BTC/USDT', timeframe='1m', capital=100, stop_loss_pct=0.02, take_profit_pct=0.04, mode='paper',
+                 indicators=None):
+    # EMA 5/9 state carried across runs: only the candles since the last closed one are fetched and folded in,
+    # and the signal is a fresh cross in the newest closed candle
+    own_indicators = indicators is None
+    if own_indicators:
+        indicator_file = state_path(INDICATOR_STATE_FILE, symbol, timeframe)
+        indicators = load_indicator_state(indicator_file, symbol, timeframe, short_window=5, long_window=9)
+    df = fetch_bybit_data(symbol, timeframe, limit=catchup_limit(indicators.last_timestamp, timeframe))  # ✅ From live Bybit spot
+    snapshot = indicators.update_from_frame(df.iloc[:-1], timeframe)
+    if own_indicators:
+        save_indicator_state(indicators, indicator_file)
+
+    latest_signal = cross_signal(snapshot)
     price = df['close'].iloc[-1]
     timestamp = df.index[-1]
 
@@ -1,13 +1,11 @@
 #!/usr/bin/env PYTHONWARNINGS="ignore::urllib3.exceptions.NotOpenSSLWarning" python
 
 import os
-import pandas as pd
-from datetime import datetime
 from dotenv import load_dotenv
-from strategy.ema_crossover import ema_crossover_strategy
+from strategy.indicator_state import catchup_limit, cross_signal, load_indicator_state, save_indicator_state, state_path
+from live.log_writer import get_log_writer
 from data.fetch_data import fetch_bybit_data
 import argparse
-import requests
 
 load_dotenv(override=True)
 
@@ -18,43 +16,30 @@ RISK_PCT = 0.02
 LOG_DIR = "logs/test_bot_log"
 os.makedirs(LOG_DIR, exist_ok=True)
 
-# Daily log file path
-today_str = datetime.now().strftime("%Y-%m-%d")
-LOG_PATH = os.path.join(LOG_DIR, f"{today_str}.csv")
-
-# Telegram Setup
-chat_id = os.getenv("TELEGRAM_CHAT_ID")
-bot_token = os.getenv("TELEGRAM_TOKEN")
-
-
-def send_telegram_alert(message):
-    if not chat_id or not bot_token:
-        print("⚠️ Telegram not configured.")
-        return
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-    payload = {"chat_id": chat_id, "text": message}
-    try:
-        requests.post(url, data=payload)
-    except Exception as e:
-        print("❌ Telegram error:", str(e))
+# Daily log files (UTC day), rotated by the writer itself so long-running processes roll over at midnight
+LOG_WRITER = get_log_writer(LOG_DIR)
+INDICATOR_STATE_FILE = os.path.join(LOG_DIR, "indicator_state_{pair}_{timeframe}.json")  # one per symbol and timeframe
 
 
 def log_to_csv(data: dict):
-    df = pd.DataFrame([data])
-    if os.path.exists(LOG_PATH):
-        df.to_csv(LOG_PATH, mode='a', header=False, index=False)
-    else:
-        df.to_csv(LOG_PATH, mode='w', header=True, index=False)
+    LOG_WRITER.write(data)
 
 
-def test_bot(symbol='BTC/USDT', timeframe='1m', capital=100, stop_loss_pct=0.02):
+def test_bot(symbol='BTC/USDT', timeframe='1m', capital=100, stop_loss_pct=0.02, exchange=None, indicators=None):
     print(f"\n🔄 Running test bot for {symbol} on timeframe {timeframe}...")
 
-    df = fetch_bybit_data(symbol, timeframe, limit=500)
-    
-    df = ema_crossover_strategy(df, symbol=symbol, capital=capital)
-
-    latest_signal = df['signal'].iloc[-1]
+    # Fetch only the candles since the last closed one folded into the indicator state, and signal on a fresh
+    # EMA cross in the newest closed candle; a long-running caller passes its in-memory state and owns saving it
+    own_indicators = indicators is None
+    if own_indicators:
+        indicator_file = state_path(INDICATOR_STATE_FILE, symbol, timeframe)
+        indicators = load_indicator_state(indicator_file, symbol, timeframe)
+    df = fetch_bybit_data(symbol, timeframe, limit=catchup_limit(indicators.last_timestamp, timeframe), exchange=exchange)
+    snapshot = indicators.update_from_frame(df.iloc[:-1], timeframe)
+    if own_indicators:
+        save_indicator_state(indicators, indicator_file)
+
+    latest_signal = cross_signal(snapshot)
     price = df['close'].iloc[-1]
     timestamp = df.index[-1]
 
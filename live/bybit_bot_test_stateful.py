@@ -3,71 +3,84 @@
 # File: live/bybit_bot_test_stateful.py
 
 import os
-import json
-import pandas as pd
-from datetime import datetime
 from dotenv import load_dotenv
-from strategy.ema_crossover import ema_crossover_strategy
+from strategy.indicator_state import catchup_limit, cross_signal, load_indicator_state, save_indicator_state, state_path
+from strategy.regime import load_regime_state, regime_allows, save_regime_state
+from live.alerts import send_telegram_alert
+from live.log_writer import get_log_writer
+from live.state_store import StateStore
 from data.fetch_data import fetch_bybit_data
 import argparse
-import requests
 
 load_dotenv(override=True)
 
 RISK_PCT = 0.02
 LOG_DIR = "logs/test_bot_log_stateful"
-STATE_FILE = os.path.join(LOG_DIR, "bot_state.json")
+STATE_FILE = os.path.join(LOG_DIR, "bot_state.json")  # legacy single-position file, migrated on first run
+STATE_DB = os.path.join(LOG_DIR, "bot_state.db")
+STRATEGY = "ema_crossover"
+REGIME_FILTER = None  # e.g. {"Trending"} to only open positions in trending markets
+INDICATOR_STATE_FILE = os.path.join(LOG_DIR, "indicator_state_{pair}_{timeframe}.json")  # one per symbol and timeframe
+REGIME_STATE_FILE = os.path.join(LOG_DIR, "regime_state_{pair}_{timeframe}.json")
 
 os.makedirs(LOG_DIR, exist_ok=True)
-today_str = datetime.now().strftime("%Y-%m-%d")
-LOG_PATH = os.path.join(LOG_DIR, f"{today_str}.csv")
+LOG_WRITER = get_log_writer(LOG_DIR)  # one CSV per UTC day
 
-chat_id = os.getenv("TELEGRAM_CHAT_ID")
-bot_token = os.getenv("TELEGRAM_TOKEN")
+def log_to_csv(data: dict):
+    LOG_WRITER.write(data)
 
-def send_telegram_alert(message):
-    if not chat_id or not bot_token:
-        print("⚠️ Telegram not configured.")
-        return
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-    payload = {"chat_id": chat_id, "text": message}
-    try:
-        requests.post(url, data=payload)
-    except Exception as e:
-        print("❌ Telegram error:", str(e))
+_state_store = None
 
-def log_to_csv(data: dict):
-    df = pd.DataFrame([data])
-    if os.path.exists(LOG_PATH):
-        df.to_csv(LOG_PATH, mode='a', header=False, index=False)
-    else:
-        df.to_csv(LOG_PATH, mode='w', header=True, index=False)
+def get_state_store(symbol='BTC/USDT'):
+    global _state_store
+    if _state_store is None:
+        _state_store = StateStore(STATE_DB)
+        # The old JSON held the position of whatever symbol the bot was run with, so file it under that symbol
+        _state_store.migrate_json(STATE_FILE, symbol=symbol, strategy=STRATEGY)
+    return _state_store
 
-def load_state():
-    if os.path.exists(STATE_FILE):
-        with open(STATE_FILE, 'r') as f:
-            return json.load(f)
-    return {"position": 0, "entry_price": 0.0, "timestamp": None}
+def load_state(symbol='BTC/USDT', strategy=STRATEGY):
+    return get_state_store(symbol).get(symbol, strategy)
 
-def save_state(state):
-    with open(STATE_FILE, 'w') as f:
-        json.dump(state, f)
+def save_state(state, symbol='BTC/USDT', strategy=STRATEGY):
+    get_state_store(symbol).put(symbol, state, strategy)
 
-def test_bot(symbol='BTC/USDT', timeframe='1m', capital=100, stop_loss_pct=0.02):
+def test_bot(symbol='BTC/USDT', timeframe='1m', capital=100, stop_loss_pct=0.02, exchange=None, indicators=None,
+             regime_state=None):
     print(f"\n🔄 Running test bot for {symbol} on timeframe {timeframe}...")
 
-    df = fetch_bybit_data(symbol, timeframe, limit=100)
+    # A long-running caller passes its in-memory states and owns persisting them
+    own_indicators, own_regime = indicators is None, regime_state is None
+    if own_indicators:
+        indicator_file = state_path(INDICATOR_STATE_FILE, symbol, timeframe)
+        indicators = load_indicator_state(indicator_file, symbol, timeframe)
+    if own_regime:
+        regime_file = state_path(REGIME_STATE_FILE, symbol, timeframe)
+        regime_state = load_regime_state(regime_file, symbol, timeframe)
+
+    # Only the candles since the last one folded in (plus that one, to check continuity); a cold start or a
+    # long outage fetches the warm-up window and re-seeds
+    limit = max(catchup_limit(indicators.last_timestamp, timeframe), catchup_limit(regime_state.last_timestamp, timeframe))
+    df = fetch_bybit_data(symbol, timeframe, limit=limit, exchange=exchange)
     if df is None or df.empty:
         print("⚠️ No data fetched.")
         return
 
-    df = ema_crossover_strategy(df, symbol=symbol, capital=capital)
-    if 'signal' not in df.columns:
-        print("⚠️ Strategy did not return 'signal' column.")
-        return
-
-    state = load_state()
-    latest_signal = df['signal'].iloc[-1]
+    # Fold only newly closed candles (the last one is still forming); the signal is a fresh EMA cross on the newest
+    snapshot = indicators.update_from_frame(df.iloc[:-1], timeframe)
+    # Regime of the last closed candle over the whole history folded so far (no look-ahead, no window effects)
+    regime = regime_state.update_from_frame(df.iloc[:-1], timeframe)
+    if own_indicators:
+        save_indicator_state(indicators, indicator_file)
+    if own_regime:
+        save_regime_state(regime_state, regime_file)
+    if snapshot:
+        print(f"📐 EMA {snapshot['EMA_SHORT']:.2f}/{snapshot['EMA_LONG']:.2f} | RSI {snapshot['RSI']:.1f} | "
+              f"MACD {snapshot['MACD']:.2f}/{snapshot['MACD_signal']:.2f} | VWAP {snapshot['VWAP']:.2f}")
+    print(f"🧭 Regime: {regime}")
+
+    state = load_state(symbol)
+    latest_signal = cross_signal(snapshot)
     price = df['close'].iloc[-1]
     timestamp = df.index[-1]
     base = symbol.split('/')[0]
@@ -83,7 +96,10 @@ def test_bot(symbol='BTC/USDT', timeframe='1m', capital=100, stop_loss_pct=0.02)
 
     #latest_signal = 1
 
-    if state['position'] == 0 and latest_signal != 0:
+    if state['position'] == 0 and latest_signal != 0 and not regime_allows(regime, REGIME_FILTER):
+        print(f"🚧 Skipping entry: {regime} regime not in {sorted(REGIME_FILTER)}")
+
+    elif state['position'] == 0 and latest_signal != 0:
         state['position'] = int(latest_signal)
         state['entry_price'] = float(price)
         state['timestamp'] = str(timestamp)
@@ -131,7 +147,7 @@ def test_bot(symbol='BTC/USDT', timeframe='1m', capital=100, stop_loss_pct=0.02)
         print("💤 HOLD — No action taken.")
 
     print("before save "+str(state))
-    save_state(state)
+    save_state(state, symbol)
 
     # Log every run
     log_data = {
@@ -0,0 +1,109 @@
+# File: live/daemon.py (Long-running in-process bot runner)
+# Usage: python -m live.daemon --bot stateful --symbol BTC/USDT --timeframe 1m --capital 500 --stop 0.02
+
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import time
+from collections import deque
+import warnings
+warnings.filterwarnings("ignore")
+
+BOTS = ("test", "stateful")
+
+
+class BotDaemon:
+    # Pays the import/client/markets/.env cost once, then runs each strategy cycle in-process
+    def __init__(self, bot="stateful", symbol="BTC/USDT", timeframe="1m", capital=500, stop_loss_pct=0.02, exchange=None):
+        if bot not in BOTS:
+            raise ValueError(f"Unknown bot '{bot}', expected one of {BOTS}")
+        if bot == "stateful":
+            from live import bybit_bot_test_stateful as module
+        else:
+            from live import bybit_bot_test as module
+        self.module = module
+        self.bot = bot
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.capital = capital
+        self.stop_loss_pct = stop_loss_pct
+
+        if exchange is None:
+            from data.exchange_client import get_exchange
+            exchange = get_exchange('bybit', default_type='spot')
+        else:
+            exchange.load_markets()
+        self.exchange = exchange
+
+        # Same per-(symbol, timeframe) files the bots use on their own, so daemon and cron runs share state
+        from strategy.indicator_state import state_path
+        self.indicator_file = state_path(module.INDICATOR_STATE_FILE, symbol, timeframe)
+        self.indicators = module.load_indicator_state(self.indicator_file, symbol, timeframe)
+        self.regime_state = None
+        if bot == "stateful":
+            self.regime_file = state_path(module.REGIME_STATE_FILE, symbol, timeframe)
+            self.regime_state = module.load_regime_state(self.regime_file, symbol, timeframe)
+
+        self.cycles = 0
+        self.cycle_times = deque(maxlen=1440)  # one day of 1m cycles
+
+    def run_cycle(self):
+        start = time.perf_counter()
+        try:
+            if self.bot == "stateful":
+                self.module.test_bot(self.symbol, self.timeframe, self.capital, self.stop_loss_pct,
+                                     exchange=self.exchange, indicators=self.indicators,
+                                     regime_state=self.regime_state)
+            else:
+                self.module.test_bot(self.symbol, self.timeframe, self.capital, self.stop_loss_pct,
+                                     exchange=self.exchange, indicators=self.indicators)
+            # Persist after every good cycle so a crash or SIGKILL resumes from here, not from the daemon's start
+            self.save_state()
+        except Exception as e:
+            # One failed cycle (network blip, bad candle) must not take the daemon down
+            print(f"❌ Cycle failed: {e}")
+        elapsed = time.perf_counter() - start
+        self.cycles += 1
+        self.cycle_times.append(elapsed)
+        avg = sum(self.cycle_times) / len(self.cycle_times)
+        print(f"⏱️ Cycle {self.cycles} took {elapsed * 1000:.1f} ms (avg {avg * 1000:.1f} ms over {len(self.cycle_times)})")
+        return elapsed
+
+    def save_state(self):
+        # Both are write-then-rename, so a kill mid-save leaves the previous files intact
+        self.module.save_indicator_state(self.indicators, self.indicator_file)
+        if self.regime_state is not None:
+            self.module.save_regime_state(self.regime_state, self.regime_file)
+
+    def shutdown(self):
+        self.save_state()
+        print(f"🛑 Daemon stopped after {self.cycles} cycles.")
+
+
+def run_daemon(daemon, interval_minutes=1):
+    from apscheduler.schedulers.blocking import BlockingScheduler
+
+    scheduler = BlockingScheduler()
+    scheduler.add_job(daemon.run_cycle, 'interval', minutes=interval_minutes, max_instances=1, coalesce=True)
+    print(f"📅 Daemon started. Running {daemon.bot} bot every {interval_minutes} minute(s) for {daemon.symbol} @ {daemon.timeframe}")
+    daemon.run_cycle()  # ✅ run once right now
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        daemon.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run an EMA test bot as a persistent in-process daemon.")
+    parser.add_argument("--bot", default="stateful", choices=BOTS, help="Which test bot to run")
+    parser.add_argument("--symbol", default="BTC/USDT", help="Trading pair (default: BTC/USDT)")
+    parser.add_argument("--timeframe", default="1m", help="Candlestick timeframe (default: 1m)")
+    parser.add_argument("--capital", type=float, default=500, help="Capital used for paper mode")
+    parser.add_argument("--stop", type=float, default=0.02, help="Stop loss percentage")
+    parser.add_argument("--interval", type=int, default=1, help="Minutes between cycles")
+    args = parser.parse_args()
+
+    run_daemon(BotDaemon(args.bot, args.symbol, args.timeframe, args.capital, args.stop), args.interval)
@@ -0,0 +1,262 @@
+# File: live/kline_stream.py (Candle-close triggered evaluation from a streaming kline feed)
+# Usage: python -m live.kline_stream --symbols BTC/USDT,ETH/USDT --timeframes 1m [--replay]
+
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import asyncio
+import time
+from collections import deque
+from typing import NamedTuple
+import warnings
+warnings.filterwarnings("ignore")
+import numpy as np
+import pandas as pd
+from data.fake_exchange import FakeExchange, synthetic_candles, timeframe_ms
+from strategy.ema_crossover import ema_crossover_strategy
+
+SIGNAL_LABELS = {1: "🟢 BUY", -1: "🔴 SELL", 0: "⚪ HOLD"}
+
+
+class KlineEvent(NamedTuple):
+    symbol: str
+    timeframe: str
+    timestamp: int      # candle open time, ms
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    closed: bool        # True once the candle is final
+    received: float     # time.perf_counter() when the event arrived
+
+
+def _event(symbol, timeframe, row, closed):
+    return KlineEvent(symbol, timeframe, int(row[0]), *map(float, row[1:6]), closed, time.perf_counter())
+
+
+class ReplayKlineSource:
+    # Local stand-in for a websocket: replays canned candles as intrabar updates followed by a close event
+    def __init__(self, candles, updates_per_candle=2, delay=0.0, drop_after=None):
+        self.candles = candles  # {(symbol, timeframe): [ccxt OHLCV rows]}
+        self.updates_per_candle = updates_per_candle
+        self.delay = delay
+        self.drop_after = drop_after  # raise ConnectionError after this many events, like a dropped socket
+
+    async def events(self):
+        merged = sorted(((row[0], symbol, timeframe, row) for (symbol, timeframe), rows in self.candles.items()
+                         for row in rows), key=lambda x: (x[0], x[1], x[2]))
+        sent = 0
+        for _, symbol, timeframe, row in merged:
+            for u in range(self.updates_per_candle):
+                closed = u == self.updates_per_candle - 1
+                if self.drop_after is not None and sent >= self.drop_after:
+                    raise ConnectionError("replay stream dropped")
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                yield _event(symbol, timeframe, row, closed)
+                sent += 1
+
+    async def close(self):
+        pass
+
+
+class CcxtKlineSource:
+    # Bybit kline websocket through ccxt.pro; a candle counts as closed once a newer one starts streaming
+    def __init__(self, watchlist, exchange=None):
+        if exchange is None:
+            import ccxt.pro as ccxtpro
+            exchange = ccxtpro.bybit({'enableRateLimit': True, 'options': {'defaultType': 'spot'}})
+        self.exchange = exchange
+        self.watchlist = watchlist
+
+    async def events(self):
+        queue = asyncio.Queue()
+
+        async def watch(symbol, timeframe):
+            current = None
+            while True:
+                for row in await self.exchange.watch_ohlcv(symbol, timeframe):
+                    if current is not None and row[0] > current[0]:
+                        await queue.put(_event(symbol, timeframe, current, True))
+                    current = row
+                    await queue.put(_event(symbol, timeframe, row, False))
+
+        tasks = [asyncio.create_task(watch(s, tf)) for s, tf in self.watchlist]
+        try:
+            while True:
+                getter = asyncio.create_task(queue.get())
+                done, _ = await asyncio.wait(tasks + [getter], return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    for t in done:
+                        t.result()  # a watcher died: surface its error so the engine falls back to REST
+                yield getter.result()
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    async def close(self):
+        await self.exchange.close()
+
+
+class RestPollingSource:
+    # Fallback: poll the last few candles of every pair and report the ones that have closed
+    def __init__(self, watchlist, exchange, limit=3):
+        self.watchlist = watchlist
+        self.exchange = exchange
+        self.limit = limit
+
+    async def poll(self, last_closed=None):
+        # With last_closed ({(symbol, timeframe): open ms}) it pages from there, so a stream outage leaves no gap
+        now_ms = self.exchange.milliseconds()
+        last_closed = last_closed or {}
+        pages = await asyncio.gather(*[
+            self.exchange.fetch_ohlcv(s, tf, since=last_closed[(s, tf)] + timeframe_ms(tf), limit=1000)
+            if last_closed.get((s, tf)) is not None else self.exchange.fetch_ohlcv(s, tf, limit=self.limit)
+            for s, tf in self.watchlist
+        ], return_exceptions=True)
+        events = []
+        for (symbol, timeframe), rows in zip(self.watchlist, pages):
+            if isinstance(rows, Exception):
+                print(f"❌ REST poll {symbol} {timeframe}: {rows}")
+                continue
+            step = timeframe_ms(timeframe)
+            events.extend(_event(symbol, timeframe, r, True) for r in rows if r[0] + step <= now_ms)
+        return events
+
+
+class CandleCloseEngine:
+    # Evaluates each pair exactly once per closed bar, whichever source (stream or REST) reports it first
+    def __init__(self, watchlist, history=100, short_window=5, long_window=9, capital=100, on_signal=None):
+        self.watchlist = list(watchlist)
+        self.history = history
+        self.short_window = short_window
+        self.long_window = long_window
+        self.capital = capital
+        self.on_signal = on_signal
+        self.buffers = {key: deque(maxlen=history) for key in self.watchlist}
+        self.last_closed = {key: None for key in self.watchlist}
+        self.evaluations = 0
+        self.processing_ms = deque(maxlen=10_000)   # close event received -> signal computed
+        self.close_lag_ms = deque(maxlen=10_000)    # candle close time -> signal computed (wall clock)
+
+    async def seed(self, exchange):
+        # Warm every buffer with recent closed history so the first streamed close already has EMAs to work with
+        now_ms = exchange.milliseconds()
+        pages = await asyncio.gather(*[exchange.fetch_ohlcv(s, tf, limit=self.history) for s, tf in self.watchlist])
+        for key, rows in zip(self.watchlist, pages):
+            step = timeframe_ms(key[1])
+            for r in rows:
+                if r[0] + step <= now_ms:
+                    self.buffers[key].append(list(r[:6]))
+                    self.last_closed[key] = r[0]
+
+    def handle(self, event):
+        key = (event.symbol, event.timeframe)
+        if not event.closed or key not in self.buffers:
+            return None
+        last = self.last_closed[key]
+        if last is not None and event.timestamp <= last:
+            return None  # already evaluated (replayed, or seen by the other source)
+        self.buffers[key].append([event.timestamp, event.open, event.high, event.low, event.close, event.volume])
+        self.last_closed[key] = event.timestamp
+
+        df = pd.DataFrame(list(self.buffers[key]), columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.set_index('timestamp', inplace=True)
+        df = ema_crossover_strategy(df, symbol=event.symbol, short_window=self.short_window,
+                                    long_window=self.long_window, capital=self.capital, log_trades=False)
+        signal = int(df['signal'].iloc[-1])
+        self.evaluations += 1
+
+        done = time.perf_counter()
+        self.processing_ms.append((done - event.received) * 1000)
+        self.close_lag_ms.append(time.time() * 1000 - (event.timestamp + timeframe_ms(event.timeframe)))
+        result = {"symbol": event.symbol, "timeframe": event.timeframe, "timestamp": df.index[-1],
+                  "price": event.close, "signal": signal}
+        if signal != 0:
+            print(f"{SIGNAL_LABELS[signal]} {event.symbol} {event.timeframe} at ${event.close:.2f} ({df.index[-1]})")
+            if self.on_signal:
+                self.on_signal(result)
+        return result
+
+    async def _poll_for(self, fallback, seconds):
+        # REST fallback until it is time to retry the stream, polling just after each candle boundary
+        deadline = time.monotonic() + seconds
+        step = min(timeframe_ms(tf) for _, tf in self.watchlist) / 1000
+        while True:
+            for event in await fallback.poll(self.last_closed):
+                self.handle(event)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, step - (time.time() % step) + 0.5))
+
+    async def run(self, stream_factory, fallback=None, retry_after=30, max_reconnects=None):
+        reconnects = 0
+        while True:
+            source = stream_factory()
+            try:
+                async for event in source.events():
+                    self.handle(event)
+                return  # stream ended on its own (replay finished)
+            except Exception as e:
+                print(f"⚠️ Kline stream dropped ({e}); falling back to REST polling for {retry_after}s")
+                if fallback is None:
+                    raise
+                await self._poll_for(fallback, retry_after)
+            finally:
+                await source.close()
+            reconnects += 1
+            if max_reconnects is not None and reconnects > max_reconnects:
+                return
+
+    def latency_report(self):
+        if not self.processing_ms:
+            return "No closed candles evaluated yet."
+        p = np.percentile(list(self.processing_ms), [50, 95, 99])
+        lag = np.percentile(list(self.close_lag_ms), [50, 95])
+        return (f"⏱️ {self.evaluations} closes evaluated | close event→signal p50 {p[0]:.2f} ms, p95 {p[1]:.2f} ms, "
+                f"p99 {p[2]:.2f} ms | candle close→signal p50 {lag[0]:.0f} ms, p95 {lag[1]:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate EMA signals once per closed candle from a kline stream.")
+    parser.add_argument("--symbols", default="BTC/USDT", help="Comma-separated pairs")
+    parser.add_argument("--timeframes", default="1m", help="Comma-separated timeframes")
+    parser.add_argument("--history", type=int, default=100, help="Closed candles kept per pair")
+    parser.add_argument("--retry", type=int, default=30, help="Seconds of REST polling before retrying the stream")
+    parser.add_argument("--replay", action="store_true", help="Replay synthetic candles locally (drops once mid-way)")
+    args = parser.parse_args()
+
+    watchlist = [(s, tf) for s in args.symbols.split(',') if s for tf in args.timeframes.split(',') if tf]
+
+    async def main():
+        engine = CandleCloseEngine(watchlist, history=args.history)
+        if args.replay:
+            periods = 500
+            candles = {}
+            for seed, (s, tf) in enumerate(watchlist):
+                step = pd.Timedelta(milliseconds=timeframe_ms(tf))
+                start = pd.Timestamp.now(tz='UTC').tz_localize(None).floor(step) - step * periods
+                candles[(s, tf)] = synthetic_candles(start, periods, tf, seed=seed)
+            history = {k: v[:args.history] for k, v in candles.items()}
+            live = {k: v[args.history:] for k, v in candles.items()}
+            await engine.seed(FakeExchange(history))
+            attempts = iter([len(watchlist) * 2 * 300, None])  # drop after 300 live candles per pair
+            fallback = RestPollingSource(watchlist, FakeExchange(candles))
+            await engine.run(lambda: ReplayKlineSource(live, drop_after=next(attempts, None)), fallback,
+                             retry_after=0, max_reconnects=1)
+        else:
+            import ccxt.async_support as ccxt_async
+            rest = ccxt_async.bybit({'enableRateLimit': True, 'options': {'defaultType': 'spot'}})
+            try:
+                await engine.seed(rest)
+                await engine.run(lambda: CcxtKlineSource(watchlist), RestPollingSource(watchlist, rest), args.retry)
+            finally:
+                await rest.close()
+        print(engine.latency_report())
+
+    asyncio.run(main())
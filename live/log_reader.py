@@ -0,0 +1,222 @@
+# File: live/log_reader.py (Cached, tail-following reader for the bots' CSV logs)
+# Usage: python -m live.log_reader --rows 40000 --append 60
+
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import io
+import threading
+import time
+import numpy as np
+import pandas as pd
+from strategy.indicator_state import EMAState, MACDState, RSIState
+from strategy.indicators import compute_indicators
+
+LOGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
+
+
+class LogTail:
+    # Parsed view of a growing CSV; refresh() only parses the complete lines appended since the last call
+    def __init__(self, path, index_col='timestamp'):
+        self.path = path
+        self.index_col = index_col
+        self.generation = -1
+        self.reset()
+
+    def reset(self):
+        self.generation += 1   # lets dependants notice the frame was rebuilt from scratch
+        self.frame = pd.DataFrame()
+        self.offset = 0
+        self.header = b''
+        self.inode = None
+        self.signature = None
+
+    def refresh(self):
+        # Returns (whole frame, rows added by this call); a truncated or replaced file is re-read from scratch
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self.reset()
+            return self.frame, self.frame.iloc[:0]
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            self.reset()
+            self.inode = st.st_ino
+        signature = (st.st_mtime_ns, st.st_size)
+        if signature == self.signature:
+            return self.frame, self.frame.iloc[:0]
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(st.st_size - self.offset)
+        end = data.rfind(b'\n') + 1   # a half-written last line waits for the next refresh
+        if end == 0:
+            return self.frame, self.frame.iloc[:0]
+        chunk = data[:end]
+        if not self.header:
+            newline = chunk.index(b'\n') + 1
+            self.header, chunk = chunk[:newline], chunk[newline:]
+        self.offset += end
+        self.signature = signature if end == len(data) else None
+        if not chunk:
+            return self.frame, self.frame.iloc[:0]
+
+        new = pd.read_csv(io.BytesIO(self.header + chunk))
+        if self.index_col in new.columns:
+            new[self.index_col] = pd.to_datetime(new[self.index_col], format='ISO8601')
+            new.set_index(self.index_col, inplace=True)
+        self.frame = new if self.frame.empty else pd.concat([self.frame, new])
+        return self.frame, new
+
+
+class IncrementalIndicators:
+    # EMA/RSI/MACD columns over one price column, advanced only over new rows (same values as the batch functions)
+    def __init__(self, price_col='price', ema_windows=(5, 9), rsi_period=14, macd=(12, 26, 9)):
+        self.price_col = price_col
+        self.ema_windows = tuple(dict.fromkeys(ema_windows))  # equal slider values must not give two EMA_n columns
+        self.rsi_period = rsi_period
+        self.macd = tuple(macd)
+        self.reset()
+
+    def reset(self):
+        self.emas = [EMAState(w) for w in self.ema_windows]
+        self.rsi = RSIState(self.rsi_period)
+        self.macd_state = MACDState(*self.macd)
+        self.frame = pd.DataFrame()
+
+    @property
+    def columns(self):
+        return [f"EMA_{w}" for w in self.ema_windows] + ['RSI', 'MACD', 'MACD_signal']
+
+    def _seed(self, prices):
+        # First (large) read: vectorized batch values, then the states are set to where the batch ended
+        fast_span, slow_span = self.macd[:2]
+        out = compute_indicators({'close': prices}, ['ema', 'rsi', 'macd'],
+                                 ema_windows=self.ema_windows + (fast_span, slow_span), rsi_period=self.rsi_period,
+                                 macd=self.macd)
+        for state, w in zip(self.emas, self.ema_windows):
+            state.value = float(out[f"EMA_{w}"][-1])
+        self.macd_state.ema_fast.value = float(out[f"EMA_{fast_span}"][-1])
+        self.macd_state.ema_slow.value = float(out[f"EMA_{slow_span}"][-1])
+        self.macd_state.ema_signal.value = float(out['MACD_signal'][-1])
+        self.macd_state.macd, self.macd_state.signal = float(out['MACD'][-1]), float(out['MACD_signal'][-1])
+        delta = np.diff(prices, prepend=prices[0])
+        self.rsi.gains.extend(np.maximum(delta[-self.rsi_period:], 0.0).tolist())
+        self.rsi.losses.extend(np.maximum(-delta[-self.rsi_period:], 0.0).tolist())
+        self.rsi.prev_close = float(prices[-1])
+        self.rsi.count = len(prices)
+        self.rsi.value = float(out['RSI'][-1])
+        return np.column_stack([out[f"EMA_{w}"] for w in self.ema_windows] + [out['RSI'], out['MACD'], out['MACD_signal']])
+
+    def update(self, new):
+        prices = new[self.price_col].to_numpy(dtype=np.float64)
+        if self.frame.empty and len(prices) > self.rsi_period:
+            cols = pd.DataFrame(self._seed(prices), index=new.index, columns=self.columns)
+            self.frame = cols
+            return self.frame
+        out = np.empty((len(prices), len(self.ema_windows) + 3))
+        for i, p in enumerate(prices):
+            for j, state in enumerate(self.emas):
+                out[i, j] = state.update(p)
+            out[i, -3] = self.rsi.update(p)
+            out[i, -2:] = self.macd_state.update(p)
+        cols = pd.DataFrame(out, index=new.index, columns=self.columns)
+        self.frame = cols if self.frame.empty else pd.concat([self.frame, cols])
+        return self.frame
+
+
+class EnrichedLog:
+    # A LogTail plus indicator columns; the pair stays in sync across appends, truncation and rotation
+    def __init__(self, path, **indicator_kwargs):
+        self.tail = LogTail(path)
+        self.indicators = IncrementalIndicators(**indicator_kwargs)
+        self._lock = threading.Lock()
+        self._generation = self.tail.generation
+
+    def read(self):
+        with self._lock:
+            frame, new = self.tail.refresh()
+            if self.tail.generation != self._generation:
+                self.indicators.reset()
+                self._generation = self.tail.generation
+            if len(new):
+                self.indicators.update(new)
+            out = frame.copy()
+            for col in self.indicators.columns:
+                out[col] = self.indicators.frame[col].to_numpy() if len(frame) else []
+            return out
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def read_log(path, price_col='price', ema_windows=(5, 9), rsi_period=14, macd=(12, 26, 9)):
+    # Process-wide cache, so Streamlit reruns only pay for rows appended since the previous rerun
+    key = (os.path.abspath(path), price_col, tuple(ema_windows), rsi_period, tuple(macd))
+    with _logs_lock:
+        log = _logs.get(key)
+        if log is None:
+            log = EnrichedLog(path, price_col=price_col, ema_windows=ema_windows, rsi_period=rsi_period, macd=macd)
+            _logs[key] = log
+    return log.read()
+
+
+def list_log_dates(path):
+    if not os.path.isdir(path):
+        return []
+    return sorted(f[:-len('.csv')] for f in os.listdir(path) if f.endswith('.csv'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check the tail reader against full re-reads and time both.')
+    parser.add_argument('--rows', type=int, default=40_000, help='Rows in the starting log (~4 weeks of 1m bars)')
+    parser.add_argument('--append', type=int, default=60, help='Rows appended between reads')
+    parser.add_argument('--path', default='logs/log_reader_bench.csv', help='Scratch log path')
+    args = parser.parse_args()
+
+    from strategy.ema_cache import ema
+    from strategy.indicators import compute_macd, compute_rsi
+
+    rng = np.random.default_rng(0)
+    n = args.rows + args.append
+    log = pd.DataFrame({
+        'timestamp': pd.date_range('2025-04-01 07:22', periods=n, freq='1min'),
+        'symbol': 'BTC/USDT',
+        'price': np.round(84_000 * np.exp(np.cumsum(rng.normal(0, 5e-4, n))), 1),
+        'signal': rng.choice(['⚪ HOLD', '🟢 BUY', '🔴 SELL'], n, p=[0.9, 0.05, 0.05]),
+    })
+    os.makedirs(os.path.dirname(args.path) or '.', exist_ok=True)
+    log.iloc[:args.rows].to_csv(args.path, index=False)
+
+    def full_read():
+        df = pd.read_csv(args.path, parse_dates=['timestamp']).set_index('timestamp')
+        df['EMA_5'] = ema(df['price'], 5)
+        df['EMA_9'] = ema(df['price'], 9)
+        df['RSI'] = compute_rsi(df['price'])
+        df['MACD'], df['MACD_signal'] = compute_macd(df['price'])
+        return df
+
+    start = time.perf_counter()
+    read_log(args.path)
+    first = time.perf_counter() - start
+
+    with open(args.path, 'a') as f:
+        log.iloc[args.rows:].to_csv(f, header=False, index=False)
+    start = time.perf_counter()
+    tailed = read_log(args.path)
+    tail_read = time.perf_counter() - start
+
+    start = time.perf_counter()
+    unchanged = read_log(args.path)
+    cached = time.perf_counter() - start
+
+    start = time.perf_counter()
+    full = full_read()
+    full_time = time.perf_counter() - start
+
+    same = np.allclose(tailed[full.columns[-5:]].to_numpy(), full[full.columns[-5:]].to_numpy(), equal_nan=True) \
+        and tailed.index.equals(full.index) and len(unchanged) == len(full)
+    print(f"⏱️ {len(full)} rows | first read {first * 1000:.1f} ms | +{args.append} rows {tail_read * 1000:.2f} ms | "
+          f"unchanged {cached * 1000:.2f} ms | full re-read + indicators {full_time * 1000:.1f} ms | matches batch: {same}")
+    os.remove(args.path)
@@ -0,0 +1,190 @@
+# File: live/state_store.py (SQLite/WAL position state for the stateful bot)
+# Usage: python -m live.state_store --positions 5000 [--db logs/state_bench.db]
+
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_STRATEGY = "ema_crossover"
+EMPTY_STATE = {"position": 0, "entry_price": 0.0, "timestamp": None}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    symbol      TEXT NOT NULL,
+    strategy    TEXT NOT NULL,
+    position    INTEGER NOT NULL DEFAULT 0,
+    entry_price REAL NOT NULL DEFAULT 0.0,
+    timestamp   TEXT,
+    updated_at  REAL NOT NULL,
+    PRIMARY KEY (symbol, strategy)
+) WITHOUT ROWID
+"""
+
+UPSERT = """
+INSERT INTO positions (symbol, strategy, position, entry_price, timestamp, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (symbol, strategy) DO UPDATE SET
+    position = excluded.position, entry_price = excluded.entry_price,
+    timestamp = excluded.timestamp, updated_at = excluded.updated_at
+"""
+
+
+def _row(symbol, strategy, state, now):
+    ts = state.get("timestamp")
+    return (symbol, strategy, int(state.get("position", 0)), float(state.get("entry_price", 0.0)),
+            None if ts is None else str(ts), now)
+
+
+class StateStore:
+    # One row per (symbol, strategy); WAL lets dashboards read while the bot writes
+    def __init__(self, path, readonly=False):
+        self.path = path
+        if readonly:
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints, never corrupt on crash
+            self.conn.execute(SCHEMA)
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def transaction(self):
+        # Everything inside commits together or not at all
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def get(self, symbol, strategy=DEFAULT_STRATEGY):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT position, entry_price, timestamp FROM positions WHERE symbol = ? AND strategy = ?",
+                (symbol, strategy)).fetchone()
+        if row is None:
+            return dict(EMPTY_STATE)
+        return {"position": row[0], "entry_price": row[1], "timestamp": row[2]}
+
+    def put(self, symbol, state, strategy=DEFAULT_STRATEGY):
+        with self._lock:
+            self.conn.execute(UPSERT, _row(symbol, strategy, state, time.time()))
+
+    def put_many(self, states, strategy=DEFAULT_STRATEGY):
+        # states: {symbol: state}; one transaction, so a crash leaves either all or none of them
+        now = time.time()
+        with self.transaction():
+            self.conn.executemany(UPSERT, [_row(s, strategy, st, now) for s, st in states.items()])
+
+    def get_many(self, symbols=None, strategy=DEFAULT_STRATEGY):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT symbol, position, entry_price, timestamp FROM positions WHERE strategy = ?",
+                (strategy,)).fetchall()
+        states = {r[0]: {"position": r[1], "entry_price": r[2], "timestamp": r[3]} for r in rows}
+        if symbols is None:
+            return states
+        return {s: states.get(s, dict(EMPTY_STATE)) for s in symbols}
+
+    def positions_frame(self, open_only=False):
+        # For dashboards: every tracked position as a DataFrame
+        import pandas as pd
+        query = "SELECT symbol, strategy, position, entry_price, timestamp, updated_at FROM positions"
+        if open_only:
+            query += " WHERE position != 0"
+        with self._lock:
+            df = pd.read_sql_query(query, self.conn)
+        df["updated_at"] = pd.to_datetime(df["updated_at"], unit="s")
+        return df
+
+    def migrate_json(self, json_path, symbol, strategy=DEFAULT_STRATEGY):
+        # One-off import of the old single-position bot_state.json; the file is kept as *.migrated
+        if not os.path.exists(json_path):
+            return False
+        try:
+            with open(json_path, "r") as f:
+                state = json.load(f)
+        except ValueError:
+            print(f"⚠️ {json_path} is unreadable; starting flat for {symbol}")
+            state = dict(EMPTY_STATE)
+        # A legacy file that names its symbol wins over the caller's guess
+        symbol = state.get("symbol") or symbol
+        with self.transaction():
+            exists = self.conn.execute("SELECT 1 FROM positions WHERE symbol = ? AND strategy = ?",
+                                       (symbol, strategy)).fetchone()
+            if not exists:
+                self.conn.execute(UPSERT, _row(symbol, strategy, state, time.time()))
+        os.replace(json_path, json_path + ".migrated")
+        print(f"📦 Migrated {json_path} into {self.path} as {symbol} / {strategy}")
+        return True
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the SQLite state store against rewriting one JSON file.")
+    parser.add_argument("--positions", type=int, default=5000, help="Symbols tracked")
+    parser.add_argument("--db", default="logs/state_bench.db", help="Scratch database path")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.db) or ".", exist_ok=True)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.db + suffix):
+            os.remove(args.db + suffix)
+    json_path = os.path.splitext(args.db)[0] + ".json"
+    symbols = [f"SYM{i}/USDT" for i in range(args.positions)]
+    states = {s: {"position": 1, "entry_price": 100.0 + i, "timestamp": "2025-04-17 07:22:00"}
+              for i, s in enumerate(symbols)}
+
+    # Old approach: the whole state rewritten on every update
+    start = time.perf_counter()
+    blob = {}
+    for s in symbols[:500]:
+        blob[s] = states[s]
+        with open(json_path, "w") as f:
+            json.dump(blob, f)
+    json_each = (time.perf_counter() - start) / 500
+    os.remove(json_path)
+
+    store = StateStore(args.db)
+    start = time.perf_counter()
+    for s in symbols:
+        store.put(s, states[s])
+    put_each = (time.perf_counter() - start) / len(symbols)
+
+    start = time.perf_counter()
+    store.put_many(states)
+    batch_each = (time.perf_counter() - start) / len(symbols)
+
+    start = time.perf_counter()
+    for s in symbols:
+        store.get(s)
+    get_each = (time.perf_counter() - start) / len(symbols)
+
+    # A dashboard-style reader on its own connection, reading while a write transaction is open
+    reader = StateStore(args.db, readonly=True)
+    with store.transaction():
+        store.conn.execute(UPSERT, _row(symbols[0], DEFAULT_STRATEGY, EMPTY_STATE, time.time()))
+        start = time.perf_counter()
+        seen = reader.get(symbols[0])["position"]
+        read_ms = (time.perf_counter() - start) * 1000
+    after = reader.get(symbols[0])["position"]
+
+    print(f"⏱️ {len(symbols)} positions | put {put_each * 1e6:.1f} µs | put_many {batch_each * 1e6:.2f} µs/row | "
+          f"get {get_each * 1e6:.1f} µs | JSON rewrite (≤500 rows) {json_each * 1e6:.1f} µs/update")
+    print(f"👀 Reader during open write saw position={seen} in {read_ms:.2f} ms (not blocked); after commit: {after}")
+    reader.close()
+    store.close()
@@ -1,30 +1,18 @@
 # File: schedule/run_scheduler.py
-from apscheduler.schedulers.blocking import BlockingScheduler
-import subprocess
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import warnings
 warnings.filterwarnings("ignore")
-
-scheduler = BlockingScheduler()
+from live.daemon import BotDaemon, run_daemon
 
 # 🔧 Customize your parameters here
 SYMBOL = "BTC/USDT"
 TIMEFRAME = "1m"
-CAPITAL = "500"
-STOP_LOSS = "0.02"
-
-@scheduler.scheduled_job('interval', minutes=1)
-def run_test_bot():
-    print("\n⏳ Scheduler triggered...")
-
-    subprocess.run([
-        "python", "-m", "live.bybit_bot_test",
-        "--symbol", SYMBOL,
-        "--timeframe", TIMEFRAME,
-        "--capital", CAPITAL,
-        "--stop", STOP_LOSS
-    ], check=True)
+CAPITAL = 500
+STOP_LOSS = 0.02
 
 if __name__ == "__main__":
-    print(f"📅 Scheduler started. Running every 1 minute for {SYMBOL} @ {TIMEFRAME}")
-    run_test_bot()  # ✅ run once right now
-    scheduler.start()
\ No newline at end of file
+    # Runs live.bybit_bot_test in-process every minute with a warm exchange client instead of a subprocess per run
+    daemon = BotDaemon("test", SYMBOL, TIMEFRAME, CAPITAL, STOP_LOSS)
+    run_daemon(daemon, interval_minutes=1)
\ No newline at end of file
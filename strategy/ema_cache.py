@@ -0,0 +1,67 @@
+# File: strategy/ema_cache.py (Memoized EMA bank keyed by dataset fingerprint and span)
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+EMA_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def fingerprint(values):
+    # Content hash of the series, so equal data from different reads/copies shares cache entries
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    return f"{len(values)}:{hashlib.blake2b(memoryview(values), digest_size=16).hexdigest()}"
+
+
+class EMACache:
+    def __init__(self, max_bytes=EMA_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, values, span, key=None, tag='ema'):
+        key = key or fingerprint(values)
+        entry_key = (key, tag, span)
+        with self._lock:
+            cached = self._entries.get(entry_key)
+            if cached is not None:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        result = pd.Series(np.asarray(values, dtype=np.float64), copy=False).ewm(span=span, adjust=False).mean().to_numpy()
+        result.flags.writeable = False  # shared between callers, so nobody may mutate it in place
+        with self._lock:
+            if entry_key not in self._entries and result.nbytes <= self.max_bytes:
+                self._entries[entry_key] = result
+                self.nbytes += result.nbytes
+                # Least recently used entries go first once over the memory cap
+                while self.nbytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.nbytes -= evicted.nbytes
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+EMA_CACHE = EMACache()
+
+
+def ema(series, span, key=None, tag='ema'):
+    # Same values as series.ewm(span=span, adjust=False).mean(), served from the shared bank (copied so frames stay writable)
+    values = EMA_CACHE.get(series.to_numpy(dtype=np.float64), span, key=key, tag=tag)
+    return pd.Series(values.copy(), index=series.index, name=series.name)
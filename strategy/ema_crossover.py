@@ -4,6 +4,10 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import pandas as pd
 import numpy as np
+from strategy.signal_kernel import run_signal_kernel, position_from_signal
+from strategy.ema_cache import ema, fingerprint
+from strategy.indicators import add_indicators
+from strategy.trade_ledger import TradeLedger
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -20,142 +24,54 @@ USE_TAKEPROFIT = True
 STOPLOSS_THRESHOLD = 0.02
 TAKEPROFIT_THRESHOLD = 0.04
 
-def ema_crossover_strategy(df, symbol="BTC/USDT", short_window=EMA_SHORT, long_window=EMA_LONG, capital=10000, log_trades=True):
-    # Calculate EMAs
-    df['EMA_SHORT'] = df['close'].ewm(span=short_window, adjust=False).mean()
-    df['EMA_LONG'] = df['close'].ewm(span=long_window, adjust=False).mean()
+def ema_crossover_strategy(df, symbol="BTC/USDT", short_window=EMA_SHORT, long_window=EMA_LONG, capital=10000, log_trades=True,
+                           stoploss_threshold=None, takeprofit_threshold=None, return_trades=False, intrabar=None):
+    # Explicit thresholds win over the module-level defaults
+    if stoploss_threshold is None:
+        stoploss_threshold = STOPLOSS_THRESHOLD
+    if takeprofit_threshold is None:
+        takeprofit_threshold = TAKEPROFIT_THRESHOLD
 
-    # Optional indicators
-    if USE_RSI:
-        df['RSI'] = compute_rsi(df['close'])
-    if USE_MACD:
-        df['MACD'], df['MACD_signal'] = compute_macd(df['close'])
-    if USE_VWAP:
-        df['VWAP'] = compute_vwap(df)
+    # Calculate EMAs (memoized per close series and span, see strategy/ema_cache.py)
+    close_key = fingerprint(df['close'].to_numpy(dtype=np.float64))
+    df['EMA_SHORT'] = ema(df['close'], short_window, key=close_key)
+    df['EMA_LONG'] = ema(df['close'], long_window, key=close_key)
 
-    # Initialize signal and position tracking
-    df['signal'] = 0
-    df['trade_id'] = 0
-    position = 0
-    entry_price = 0
-    trade_id = 0
-    open_trade_index = None
-    trades = []
+    # Optional indicators, in one pass (see strategy/indicators.py)
+    wanted = [name for name, use in (('rsi', USE_RSI), ('macd', USE_MACD), ('vwap', USE_VWAP)) if use]
+    if wanted:
+        add_indicators(df, wanted, key=close_key)
 
     risk_pct = 0.02
     risk_amount = capital * risk_pct
 
-    for i in range(1, len(df)):
-        price = df['close'].iloc[i]
-        time = df.index[i]
-
-        # Detect crossovers (only trigger on crossover change, not every bar)
-        bullish_cross = (df['EMA_SHORT'].iloc[i] > df['EMA_LONG'].iloc[i]) and (df['EMA_SHORT'].iloc[i - 1] <= df['EMA_LONG'].iloc[i - 1])
-        bearish_cross = (df['EMA_SHORT'].iloc[i] < df['EMA_LONG'].iloc[i]) and (df['EMA_SHORT'].iloc[i - 1] >= df['EMA_LONG'].iloc[i - 1])
-
-        if position == 0:
-            # Entry conditions on fresh cross
-            if bullish_cross or bearish_cross:
-                position = 1 if bullish_cross else -1
-                entry_price = price
-                stop_loss_price = entry_price * (1 - STOPLOSS_THRESHOLD) if position == 1 else entry_price * (1 + STOPLOSS_THRESHOLD)
-                take_profit_price = entry_price * (1 + TAKEPROFIT_THRESHOLD) if position == 1 else entry_price * (1 - TAKEPROFIT_THRESHOLD)
-                stop_distance = abs(entry_price - stop_loss_price)
-                lot_size = risk_amount / stop_distance if stop_distance != 0 else 0
-                reward_amount = lot_size * abs(take_profit_price - entry_price)
-
-                df.at[time, 'signal'] = position
-                df.at[time, 'trade_id'] = trade_id
-                open_trade_index = time
-
-        elif position == 1:
-            stop_hit = price < stop_loss_price
-            tp_hit = price > take_profit_price
-
-            # Exit long if SL, TP, or reverse crossover
-            if stop_hit or tp_hit or bearish_cross:
-                pnl = (price - entry_price) * lot_size
-                pips = (price - entry_price) * 100
-                trades.append([
-                    open_trade_index.strftime('%Y-%m-%d'),
-                    symbol.replace('/', ''),
-                    'Buy',
-                    round(entry_price, 2),
-                    round(stop_loss_price, 2),
-                    round(take_profit_price, 2),
-                    round(price, 2),
-                    round(pips, 1),
-                    round(risk_amount, 2),
-                    round(reward_amount, 2),
-                    f"1:{round(reward_amount/risk_amount, 1)}",
-                    round(lot_size, 6),
-                    'Win' if pnl > 0 else 'Loss'
-                ])
-                df.at[time, 'signal'] = -1
-                df.at[time, 'trade_id'] = trade_id
-                position = 0
-                trade_id += 1
-
-        elif position == -1:
-            stop_hit = price > stop_loss_price
-            tp_hit = price < take_profit_price
-
-            # Exit short if SL, TP, or reverse crossover
-            if stop_hit or tp_hit or bullish_cross:
-                pnl = (entry_price - price) * lot_size
-                pips = (entry_price - price) * 100
-                trades.append([
-                    open_trade_index.strftime('%Y-%m-%d'),
-                    symbol.replace('/', ''),
-                    'Sell',
-                    round(entry_price, 2),
-                    round(stop_loss_price, 2),
-                    round(take_profit_price, 2),
-                    round(price, 2),
-                    round(pips, 1),
-                    round(risk_amount, 2),
-                    round(reward_amount, 2),
-                    f"1:{round(reward_amount/risk_amount, 1)}",
-                    round(lot_size, 6),
-                    'Win' if pnl > 0 else 'Loss'
-                ])
-                df.at[time, 'signal'] = 1
-                df.at[time, 'trade_id'] = trade_id
-                position = 0
-                trade_id += 1
+    # Signal/SL/TP state machine runs on plain arrays (see strategy/signal_kernel.py)
+    result = run_signal_kernel(
+        df['close'].to_numpy(dtype=np.float64),
+        df['EMA_SHORT'].to_numpy(dtype=np.float64),
+        df['EMA_LONG'].to_numpy(dtype=np.float64),
+        stoploss_threshold,
+        takeprofit_threshold,
+        risk_amount,
+        use_stoploss=USE_STOPLOSS,
+        use_takeprofit=USE_TAKEPROFIT,
+        intrabar=intrabar,
+    )
+    df['signal'] = result.signal
+    df['trade_id'] = result.trade_id
 
     # Fill position column based on past signal
-    df['position'] = df['signal'].replace(to_replace=0, method='ffill').fillna(0)
+    df['position'] = position_from_signal(result.signal)
 
-    # Log trades to CSV
-    trades_df = pd.DataFrame(trades, columns=[
-        'Date', 'Pair', 'Buy/Sell', 'Entry Price', 'Stop Loss', 'Take Profit',
-        'Exit Price', 'Pips Gained/Lost', 'Risk (USD)', 'Reward (USD)', 'R:R Ratio', 'Lot Size', 'Result'
-    ])
+    # Closed trades stay in memory; the CSV log is only an optional sink
+    ledger = TradeLedger.from_kernel(result, df.index, symbol, risk_amount)
     if log_trades:
-        os.makedirs("logs", exist_ok=True)
-        trades_df.to_csv('logs/trades.csv', index=False)
+        ledger.to_csv('logs/trades.csv')
 
+    if return_trades:
+        return df, ledger
     return df
 
-def compute_rsi(series, period=14):
-    delta = series.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
-
-def compute_macd(series, fast=12, slow=26, signal=9):
-    ema_fast = series.ewm(span=fast, adjust=False).mean()
-    ema_slow = series.ewm(span=slow, adjust=False).mean()
-    macd = ema_fast - ema_slow
-    macd_signal = macd.ewm(span=signal, adjust=False).mean()
-    return macd, macd_signal
-
-def compute_vwap(df):
-    return (df['close'] * df['volume']).cumsum() / df['volume'].cumsum()
-
 
 if __name__ == "__main__":
     import os
@@ -0,0 +1,310 @@
+# File: strategy/indicator_state.py (Resumable O(1)-per-bar indicator state for the live bots)
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+from collections import deque
+import pandas as pd
+
+NAN = float('nan')
+WARMUP_CANDLES = 100   # candles fetched to seed a fresh (or re-seeded) state
+
+
+class EMAState:
+    # Matches series.ewm(span=span, adjust=False).mean()
+    def __init__(self, span, value=None):
+        self.span = span
+        self.alpha = 2 / (span + 1)
+        self.value = value
+
+    def update(self, x):
+        if self.value is None:
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+    def to_dict(self):
+        return {"span": self.span, "value": self.value}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["span"], d["value"])
+
+
+class RSIState:
+    # Rolling mode matches compute_rsi(series, period); wilder mode matches compute_rsi(series, period, wilder=True)
+    def __init__(self, period=14, wilder=False, prev_close=None, gains=None, losses=None,
+                 avg_gain=None, avg_loss=None, count=0):
+        self.period = period
+        self.wilder = wilder
+        self.prev_close = prev_close
+        self.gains = deque(gains or [], maxlen=period)
+        self.losses = deque(losses or [], maxlen=period)
+        self.avg_gain = avg_gain
+        self.avg_loss = avg_loss
+        self.count = count
+        self.value = NAN
+
+    def update(self, close):
+        # The batch version treats the first (NaN) diff as a zero move, so the first bar counts too
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        self.count += 1
+
+        if self.wilder:
+            a = 1 / self.period
+            if self.avg_gain is None:
+                self.avg_gain, self.avg_loss = gain, loss
+            else:
+                self.avg_gain = a * gain + (1 - a) * self.avg_gain
+                self.avg_loss = a * loss + (1 - a) * self.avg_loss
+            avg_gain, avg_loss = self.avg_gain, self.avg_loss
+        else:
+            self.gains.append(gain)
+            self.losses.append(loss)
+            avg_gain = sum(self.gains) / self.period
+            avg_loss = sum(self.losses) / self.period
+
+        if self.count < self.period:
+            self.value = NAN
+        elif avg_loss == 0:
+            self.value = NAN if avg_gain == 0 else 100.0
+        else:
+            self.value = 100 - (100 / (1 + avg_gain / avg_loss))
+        return self.value
+
+    def to_dict(self):
+        return {"period": self.period, "wilder": self.wilder, "prev_close": self.prev_close,
+                "gains": list(self.gains), "losses": list(self.losses),
+                "avg_gain": self.avg_gain, "avg_loss": self.avg_loss, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**d)
+
+
+class MACDState:
+    # Matches compute_macd(series, fast, slow, signal)
+    def __init__(self, fast=12, slow=26, signal=9, ema_fast=None, ema_slow=None, ema_signal=None):
+        self.ema_fast = EMAState.from_dict(ema_fast) if ema_fast else EMAState(fast)
+        self.ema_slow = EMAState.from_dict(ema_slow) if ema_slow else EMAState(slow)
+        self.ema_signal = EMAState.from_dict(ema_signal) if ema_signal else EMAState(signal)
+        self.macd = NAN if self.ema_fast.value is None else self.ema_fast.value - self.ema_slow.value
+        self.signal = NAN if self.ema_signal.value is None else self.ema_signal.value
+
+    def update(self, close):
+        self.macd = self.ema_fast.update(close) - self.ema_slow.update(close)
+        self.signal = self.ema_signal.update(self.macd)
+        return self.macd, self.signal
+
+    def to_dict(self):
+        return {"fast": self.ema_fast.span, "slow": self.ema_slow.span, "signal": self.ema_signal.span,
+                "ema_fast": self.ema_fast.to_dict(), "ema_slow": self.ema_slow.to_dict(),
+                "ema_signal": self.ema_signal.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**d)
+
+
+class VWAPState:
+    # Matches compute_vwap(df): cumulative price*volume over cumulative volume
+    def __init__(self, pv=0.0, volume=0.0):
+        self.pv = pv
+        self.volume = volume
+
+    def update(self, close, volume):
+        self.pv += close * volume
+        self.volume += volume
+        return self.pv / self.volume if self.volume else NAN
+
+    def to_dict(self):
+        return {"pv": self.pv, "volume": self.volume}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**d)
+
+
+class IndicatorState:
+    # Everything ema_crossover_strategy derives from candles, updated one closed candle at a time
+    def __init__(self, short_window=5, long_window=9, rsi_period=14, wilder=False, last_timestamp=None,
+                 ema_short=None, ema_long=None, rsi=None, macd=None, vwap=None, prev_spread=None, symbol=None,
+                 timeframe=None):
+        self.symbol = symbol          # the market whose candles this state has folded (checked on load)
+        self.timeframe = timeframe
+        self.ema_short = EMAState.from_dict(ema_short) if ema_short else EMAState(short_window)
+        self.ema_long = EMAState.from_dict(ema_long) if ema_long else EMAState(long_window)
+        self.rsi = RSIState.from_dict(rsi) if rsi else RSIState(rsi_period, wilder)
+        self.macd = MACDState.from_dict(macd) if macd else MACDState()
+        self.vwap = VWAPState.from_dict(vwap) if vwap else VWAPState()
+        self.last_timestamp = last_timestamp
+        self.prev_spread = prev_spread  # EMA_SHORT - EMA_LONG on the previous bar, for cross detection
+
+    def update(self, timestamp, close, volume):
+        close = float(close)
+        ema_short = self.ema_short.update(close)
+        ema_long = self.ema_long.update(close)
+        spread = ema_short - ema_long
+        bullish_cross = self.prev_spread is not None and spread > 0 and self.prev_spread <= 0
+        bearish_cross = self.prev_spread is not None and spread < 0 and self.prev_spread >= 0
+        self.prev_spread = spread
+        macd, macd_signal = self.macd.update(close)
+        self.last_timestamp = str(timestamp)
+        return {
+            "timestamp": self.last_timestamp,
+            "close": close,
+            "EMA_SHORT": ema_short,
+            "EMA_LONG": ema_long,
+            "RSI": self.rsi.update(close),
+            "MACD": macd,
+            "MACD_signal": macd_signal,
+            "VWAP": self.vwap.update(close, float(volume)),
+            "bullish_cross": bullish_cross,
+            "bearish_cross": bearish_cross,
+        }
+
+    def reset(self):
+        # Forget every bar seen so far, keeping the configuration
+        self.__init__(self.ema_short.span, self.ema_long.span, self.rsi.period, self.rsi.wilder,
+                      symbol=self.symbol, timeframe=self.timeframe)
+
+    def update_from_frame(self, df, timeframe=None):
+        # Feed only candles newer than the last one already folded into the state. With a timeframe, a hole
+        # between the state and the first new candle (downtime longer than the fetch window) can't be bridged,
+        # so the state is re-seeded from the frame instead of jumping across the missing bars.
+        df, gap = new_candles(df, self.last_timestamp, timeframe or self.timeframe)
+        if gap:
+            print(f"⚠️ Candles missing after {self.last_timestamp}, re-seeding indicators from {df.index[0]}")
+            self.reset()
+        latest = None
+        for timestamp, close, volume in zip(df.index, df['close'].tolist(), df['volume'].tolist()):
+            latest = self.update(timestamp, close, volume)
+        return latest
+
+    def to_dict(self):
+        return {"symbol": self.symbol, "timeframe": self.timeframe,
+                "last_timestamp": self.last_timestamp, "prev_spread": self.prev_spread,
+                "ema_short": self.ema_short.to_dict(), "ema_long": self.ema_long.to_dict(),
+                "rsi": self.rsi.to_dict(), "macd": self.macd.to_dict(), "vwap": self.vwap.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**d)
+
+
+def new_candles(df, last_timestamp, timeframe=None):
+    # (candles after last_timestamp, whether bars are missing between the two); the caller's frame should
+    # overlap the last folded candle, so anything starting later than one bar after it is a gap
+    if last_timestamp is None:
+        return df, False
+    last = pd.Timestamp(last_timestamp)
+    df = df[df.index > last]
+    gap = timeframe is not None and len(df) > 0 and df.index[0] > last + pd.Timedelta(timeframe)
+    return df, gap
+
+
+def catchup_limit(last_timestamp, timeframe, warmup=WARMUP_CANDLES, now=None):
+    # Candles to fetch so the window reaches back to the last folded candle (plus one for clock skew); a cold
+    # start, or an outage longer than the warm-up window, fetches the warm-up window and re-seeds
+    if last_timestamp is None:
+        return warmup
+    now = pd.Timestamp.now(tz='UTC').tz_localize(None) if now is None else pd.Timestamp(now)
+    behind = int((now - pd.Timestamp(last_timestamp)) // pd.Timedelta(timeframe)) + 2
+    return min(max(behind, 2), warmup)
+
+
+def cross_signal(snapshot):
+    # 1 / -1 on a fresh EMA cross in the newest folded candle, 0 otherwise (or when nothing new was folded)
+    if not snapshot:
+        return 0
+    return 1 if snapshot["bullish_cross"] else -1 if snapshot["bearish_cross"] else 0
+
+
+def state_path(template, symbol, timeframe):
+    # One state file per market: 'indicator_state_{pair}_{timeframe}.json' -> 'indicator_state_BTCUSDT_1m.json'
+    return template.format(pair=_pair(symbol), timeframe=timeframe)
+
+
+def _pair(symbol):
+    return symbol.replace('/', '').upper()
+
+
+def check_state_key(state, path, symbol=None, timeframe=None):
+    # Candles of one market folded into another's state give silently wrong indicators, so refuse to load it
+    if (symbol is not None and state.symbol is not None and _pair(state.symbol) != _pair(symbol)) or \
+            (timeframe is not None and state.timeframe is not None and state.timeframe != timeframe):
+        raise ValueError(f"{path} holds state for {state.symbol} {state.timeframe}, not {symbol} {timeframe}")
+    state.symbol = state.symbol or symbol
+    state.timeframe = state.timeframe or timeframe
+    return state
+
+
+def load_indicator_state(path, symbol=None, timeframe=None, **defaults):
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return check_state_key(IndicatorState.from_dict(json.load(f)), path, symbol, timeframe)
+    return IndicatorState(symbol=symbol, timeframe=timeframe, **defaults)
+
+
+def save_indicator_state(state, path):
+    # Write-then-rename so a crash mid-write never leaves a truncated file behind
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state.to_dict(), f)
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    # Check the incremental state against the batch indicators, resuming halfway through via JSON
+    import glob
+    import numpy as np
+    from strategy.indicators import compute_rsi, compute_macd, compute_vwap
+
+    for path in sorted(glob.glob("data/*.csv")):
+        df = pd.read_csv(path, index_col="timestamp", parse_dates=True)
+        for wilder in (False, True):
+            half = len(df) // 2
+            state = IndicatorState(5, 9, wilder=wilder)
+            rows = [state.update(t, c, v) for t, c, v in zip(df.index[:half], df['close'][:half], df['volume'][:half])]
+            state = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+            rows += [state.update(t, c, v) for t, c, v in zip(df.index[half:], df['close'][half:], df['volume'][half:])]
+            got = pd.DataFrame(rows, index=df.index)
+
+            macd, macd_signal = compute_macd(df['close'])
+            expected = {
+                "EMA_SHORT": df['close'].ewm(span=5, adjust=False).mean(),
+                "EMA_LONG": df['close'].ewm(span=9, adjust=False).mean(),
+                "RSI": compute_rsi(df['close'], wilder=wilder),
+                "MACD": macd,
+                "MACD_signal": macd_signal,
+                "VWAP": compute_vwap(df),
+            }
+            for col, series in expected.items():
+                assert np.allclose(got[col], series, rtol=1e-9, atol=1e-9, equal_nan=True), (path, col, wilder)
+        print(f"✅ {path}: incremental indicators match batch values ({len(df)} bars)")
+
+    # A resume whose first new candle is not the next bar re-seeds rather than bridging the hole
+    df = pd.read_csv("data/BTCUSDT_1h.csv", index_col="timestamp", parse_dates=True)
+    state = IndicatorState(5, 9)
+    state.update_from_frame(df.iloc[:300], '1h')
+    state.update_from_frame(df.iloc[400:], '1h')
+    expected = df['close'].iloc[400:].ewm(span=9, adjust=False).mean().iloc[-1]
+    assert abs(state.ema_long.value - expected) < 1e-9 and state.last_timestamp == str(df.index[-1])
+    print("✅ gap after the saved state re-seeds from the new candles")
+
+    # A state saved for one market refuses to load for another
+    import tempfile
+    saved = os.path.join(tempfile.mkdtemp(), state_path("indicator_state_{pair}_{timeframe}.json", "BTC/USDT", "1h"))
+    save_indicator_state(IndicatorState(symbol="BTC/USDT", timeframe="1h"), saved)
+    assert load_indicator_state(saved, "BTCUSDT", "1h").symbol == "BTC/USDT"
+    for symbol, timeframe in (("ETH/USDT", "1h"), ("BTC/USDT", "1m")):
+        try:
+            load_indicator_state(saved, symbol, timeframe)
+            raise AssertionError("mismatched state loaded")
+        except ValueError:
+            pass
+    print(f"✅ {os.path.basename(saved)} only loads for BTC/USDT 1h")
@@ -0,0 +1,226 @@
+# File: strategy/indicators.py (Fused indicator library shared by the strategy, regime classifier, log reader and dashboards)
+# Usage: python -m strategy.indicators --bars 100000 1000000 [--float32]
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pandas as pd
+from strategy.ema_cache import ema, fingerprint
+
+INDICATORS = ('ema', 'rsi', 'macd', 'vwap', 'atr', 'hl_range', 'adx', 'di', 'bb_width')
+CHUNK_ROWS = 1 << 16   # rows per prefix-sum block in rolling sums
+
+
+def _rolling(values, window, how='mean'):
+    # pandas rolling(window) semantics: NaN until `window` values are in, and NaN while any of them is NaN.
+    # Sums are O(n) prefix-sum differences, accumulated in float64 and restarted every block to bound rounding.
+    n = len(values)
+    out = np.full(n, np.nan, dtype=values.dtype)
+    if window > n:
+        return out
+    if how == 'std':
+        return pd.Series(values, copy=False).rolling(window).std().to_numpy(dtype=values.dtype)
+    nan = np.isnan(values)
+    clean = np.where(nan, 0.0, values)
+    for start in range(0, n - window + 1, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, n - window + 1)
+        prefix = np.concatenate(([0.0], np.cumsum(clean[start:stop + window - 1], dtype=np.float64)))
+        out[start + window - 1:stop + window - 1] = prefix[window:] - prefix[:-window]
+    if nan.any():
+        counts = np.concatenate(([0], np.cumsum(nan)))
+        out[window - 1:][(counts[window:] - counts[:-window]) > 0] = np.nan
+    if how == 'mean':
+        out /= window
+    return out
+
+
+def _column(data, name, dtype):
+    return np.ascontiguousarray(data[name], dtype=dtype)
+
+
+def compute_indicators(data, indicators=INDICATORS, ema_windows=(), price_col='close', rsi_period=14, wilder=False,
+                       macd=(12, 26, 9), atr_window=14, adx_window=14, bb_window=20, bb_std=2, dtype=np.float64,
+                       key=None):
+    # One pass over contiguous arrays: price diff, true range and the DM/TR window sums are computed once and shared.
+    # `data` is a DataFrame or a dict of arrays; returns {column name: ndarray} using the repo's column names.
+    wanted = set(indicators)
+    unknown = wanted - set(INDICATORS)
+    if unknown:
+        raise ValueError(f"Unknown indicators {sorted(unknown)}, expected any of {INDICATORS}")
+    out = {}
+    close = _column(data, price_col, dtype)
+    n = len(close)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if 'rsi' in wanted:
+            # The first (NaN) diff counts as a zero move, as delta.where(...) always did
+            delta = np.empty(n, dtype=dtype)
+            delta[:1] = 0
+            np.subtract(close[1:], close[:-1], out=delta[1:])
+            gain = np.maximum(delta, 0)
+            loss = np.maximum(-delta, 0)
+            if wilder:
+                smooth = dict(alpha=1 / rsi_period, min_periods=rsi_period, adjust=False)
+                avg_gain = pd.Series(gain, copy=False).ewm(**smooth).mean().to_numpy(dtype=dtype)
+                avg_loss = pd.Series(loss, copy=False).ewm(**smooth).mean().to_numpy(dtype=dtype)
+            else:
+                avg_gain = _rolling(gain, rsi_period)
+                avg_loss = _rolling(loss, rsi_period)
+            out['RSI'] = 100 - 100 / (1 + avg_gain / avg_loss)
+
+        if wanted & {'ema', 'macd'}:
+            # EMAs come from the shared memoized bank, keyed once per price series
+            key = key or fingerprint(close.astype(np.float64, copy=False))
+            spans = set(ema_windows) if 'ema' in wanted else set()
+            if 'macd' in wanted:
+                spans |= {macd[0], macd[1]}
+            price = pd.Series(close, copy=False)
+            emas = {span: ema(price, span, key=key).to_numpy(dtype=dtype) for span in sorted(spans)}
+            for span in (ema_windows if 'ema' in wanted else ()):
+                out[f"EMA_{span}"] = emas[span]
+            if 'macd' in wanted:
+                line = emas[macd[0]] - emas[macd[1]]
+                signal = ema(pd.Series(line, copy=False), macd[2], key=key, tag=f"macd_signal:{macd[0]}:{macd[1]}")
+                out['MACD'], out['MACD_signal'] = line, signal.to_numpy(dtype=dtype)
+
+        if 'vwap' in wanted:
+            volume = _column(data, 'volume', dtype)
+            out['VWAP'] = np.cumsum(close * volume) / np.cumsum(volume)
+
+        if wanted & {'atr', 'hl_range', 'adx', 'di'}:
+            high, low = _column(data, 'high', dtype), _column(data, 'low', dtype)
+            hl = high - low
+            if 'hl_range' in wanted:
+                out['HL_Range'] = _rolling(hl, atr_window)
+            if wanted & {'atr', 'adx', 'di'}:
+                # True range; the first bar has no previous close, so it is just high - low
+                tr = hl.copy()
+                np.fmax(tr[1:], np.abs(high[1:] - close[:-1]), out=tr[1:])
+                np.fmax(tr[1:], np.abs(low[1:] - close[:-1]), out=tr[1:])
+                tr_sum = _rolling(tr, adx_window, 'sum') if wanted & {'adx', 'di'} else None
+                if 'atr' in wanted:
+                    # With the usual equal windows ATR is just the ADX's true-range sum over the window
+                    out['ATR'] = tr_sum / atr_window if tr_sum is not None and atr_window == adx_window \
+                        else _rolling(tr, atr_window)
+                if wanted & {'adx', 'di'}:
+                    plus_dm = np.full(n, np.nan, dtype=dtype)
+                    minus_dm = np.full(n, np.nan, dtype=dtype)
+                    np.maximum(high[1:] - high[:-1], 0, out=plus_dm[1:])
+                    np.maximum(low[:-1] - low[1:], 0, out=minus_dm[1:])
+                    plus_di = 100 * _rolling(plus_dm, adx_window, 'sum') / tr_sum
+                    minus_di = 100 * _rolling(minus_dm, adx_window, 'sum') / tr_sum
+                    if 'di' in wanted:
+                        out['PLUS_DI'], out['MINUS_DI'] = plus_di, minus_di
+                    if 'adx' in wanted:
+                        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+                        out['ADX'] = _rolling(dx, adx_window)
+
+        if 'bb_width' in wanted:
+            out['BB_Width'] = 2 * bb_std * _rolling(close, bb_window, 'std')
+    return out
+
+
+def add_indicators(df, indicators=INDICATORS, **kwargs):
+    # compute_indicators() written back as DataFrame columns
+    for name, values in compute_indicators(df, indicators, **kwargs).items():
+        df[name] = values
+    return df
+
+
+def _series(values, like, name=None):
+    return pd.Series(values, index=like.index, name=name)
+
+
+def compute_rsi(series, period=14, wilder=False):
+    return _series(compute_indicators({'close': series}, ['rsi'], rsi_period=period, wilder=wilder)['RSI'], series)
+
+
+def compute_macd(series, fast=12, slow=26, signal=9, key=None):
+    out = compute_indicators({'close': series}, ['macd'], macd=(fast, slow, signal), key=key)
+    return _series(out['MACD'], series), _series(out['MACD_signal'], series)
+
+
+def compute_vwap(df):
+    return _series(compute_indicators(df, ['vwap'])['VWAP'], df)
+
+
+def compute_atr(df, window=14):
+    return _series(compute_indicators(df, ['atr'], atr_window=window)['ATR'], df)
+
+
+def compute_adx(df, window=14):
+    return _series(compute_indicators(df, ['adx'], adx_window=window)['ADX'], df)
+
+
+def compute_bb_width(series, window=20, num_std=2):
+    # Upper minus lower Bollinger band
+    return _series(compute_indicators({'close': series}, ['bb_width'], bb_window=window, bb_std=num_std)['BB_Width'], series)
+
+
+def _pandas_reference(df, rsi_period=14, wilder=False, window=14, bb_window=20):
+    # The pandas code these replace (ema_crossover.compute_rsi/macd/vwap and the regime dashboard's ATR/ADX/DI/BB)
+    close, high, low = df['close'], df['high'], df['low']
+    out = {}
+    delta = close.diff()
+    if wilder:
+        gain = delta.where(delta > 0, 0).ewm(alpha=1 / rsi_period, min_periods=rsi_period, adjust=False).mean()
+        loss = (-delta.where(delta < 0, 0)).ewm(alpha=1 / rsi_period, min_periods=rsi_period, adjust=False).mean()
+    else:
+        gain = delta.where(delta > 0, 0).rolling(window=rsi_period).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
+    out['RSI'] = 100 - (100 / (1 + gain / loss))
+    fast, slow = close.ewm(span=12, adjust=False).mean(), close.ewm(span=26, adjust=False).mean()
+    out['MACD'] = fast - slow
+    out['MACD_signal'] = out['MACD'].ewm(span=9, adjust=False).mean()
+    out['VWAP'] = (close * df['volume']).cumsum() / df['volume'].cumsum()
+    out['HL_Range'] = (high - low).rolling(window=window).mean()
+    prev_close = close.shift()
+    tr = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+    out['ATR'] = tr.rolling(window=window).mean()
+    plus_dm = high.diff().clip(lower=0)
+    minus_dm = low.diff().clip(upper=0).abs()
+    tr_smooth = tr.rolling(window=window).sum()
+    out['PLUS_DI'] = 100 * plus_dm.rolling(window=window).sum() / tr_smooth
+    out['MINUS_DI'] = 100 * minus_dm.rolling(window=window).sum() / tr_smooth
+    dx = 100 * (out['PLUS_DI'] - out['MINUS_DI']).abs() / (out['PLUS_DI'] + out['MINUS_DI'])
+    out['ADX'] = dx.rolling(window=window).mean()
+    out['BB_Width'] = (close.rolling(bb_window).mean() + 2 * close.rolling(bb_window).std()) - \
+                      (close.rolling(bb_window).mean() - 2 * close.rolling(bb_window).std())
+    return out
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from data.fake_exchange import synthetic_candles
+    from strategy.ema_cache import EMA_CACHE
+
+    parser = argparse.ArgumentParser(description='Time the fused indicators against the pandas code they replace.')
+    parser.add_argument('--bars', type=int, nargs='+', default=[100_000, 1_000_000], help='Series lengths to time')
+    parser.add_argument('--repeat', type=int, default=3, help='Best of this many runs')
+    parser.add_argument('--float32', action='store_true', help='Also time the fused path on float32 arrays')
+    args = parser.parse_args()
+
+    def best(fn):
+        times = []
+        for _ in range(args.repeat):
+            EMA_CACHE.clear()   # time real work, not cache hits
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    for bars in args.bars:
+        rows = synthetic_candles('2025-01-01', bars, '1m', seed=11)
+        df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        pandas_time, ref = best(lambda: _pandas_reference(df))
+        fused_time, got = best(lambda: compute_indicators(df))
+        worst = max(np.nanmax(np.abs(got[c] - ref[c].to_numpy()) / np.maximum(np.abs(ref[c].to_numpy()), 1.0))
+                    for c in ref)
+        same_nans = all((np.isnan(got[c]) == ref[c].isna().to_numpy()).all() for c in ref)
+        line = (f"⏱️ {bars:>9} bars | pandas {pandas_time * 1000:7.1f} ms | fused {fused_time * 1000:7.1f} ms "
+                f"({pandas_time / fused_time:.1f}x) | max rel diff {worst:.1e} | same warm-up NaNs: {same_nans}")
+        if args.float32:
+            f32_time, _ = best(lambda: compute_indicators(df, dtype=np.float32))
+            line += f" | float32 {f32_time * 1000:.1f} ms"
+        print(line)
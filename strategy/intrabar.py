@@ -0,0 +1,115 @@
+# File: strategy/intrabar.py (Bar -> 1m sub-bar offset index for intrabar stop-loss / take-profit fills)
+# Usage: python -m strategy.intrabar --bars 20000 --timeframe 1h
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+
+
+class IntrabarIndex(NamedTuple):
+    start: np.ndarray      # int64 per bar: first sub-bar row inside the bar
+    end: np.ndarray        # int64 per bar: one past the last sub-bar row (start == end: no sub-bars, close-only)
+    bar_high: np.ndarray   # float64 per bar: highest sub-bar high (NaN without sub-bars)
+    bar_low: np.ndarray    # float64 per bar: lowest sub-bar low
+    open: np.ndarray       # float64 per sub-bar
+    high: np.ndarray
+    low: np.ndarray
+
+
+def build_intrabar_index(bar_index, sub_df, bar_duration=None):
+    # Sub-bars [bar open, bar open + duration) belong to a bar; two searchsorted calls index every bar at once
+    bar_index = pd.DatetimeIndex(bar_index)
+    if bar_duration is None:
+        bar_duration = pd.Timedelta(int(np.median(np.diff(bar_index.asi8)))) if len(bar_index) > 1 else pd.Timedelta('1h')
+    if not (sub_df.index.is_monotonic_increasing and sub_df.index.is_unique):
+        sub_df = sub_df[~sub_df.index.duplicated(keep='last')].sort_index()   # the store already returns sorted rows
+    sub_times = pd.DatetimeIndex(sub_df.index).as_unit('ns').asi8
+    opens = bar_index.as_unit('ns').asi8
+    start = np.searchsorted(sub_times, opens, side='left')
+    end = np.searchsorted(sub_times, opens + pd.Timedelta(bar_duration).value, side='left')
+    # A following bar may open early (irregular index); never let a window run into it
+    end[:-1] = np.minimum(end[:-1], start[1:])
+    end = np.maximum(end, start)
+
+    sub_open = sub_df['open'].to_numpy(dtype=np.float64)
+    sub_high = sub_df['high'].to_numpy(dtype=np.float64)
+    sub_low = sub_df['low'].to_numpy(dtype=np.float64)
+    bar_high = np.full(len(bar_index), np.nan)
+    bar_low = np.full(len(bar_index), np.nan)
+    covered = end > start
+    if covered.any():
+        bar_high[covered] = _reduce_windows(np.maximum, sub_high, start[covered], end[covered])
+        bar_low[covered] = _reduce_windows(np.minimum, sub_low, start[covered], end[covered])
+    return IntrabarIndex(start, end, bar_high, bar_low, sub_open, sub_high, sub_low)
+
+
+def _reduce_windows(ufunc, values, start, end):
+    # ufunc over values[start:end] for each non-empty, sorted, non-overlapping window in one reduceat call; the
+    # padding row only makes an end equal to len(values) a valid index, its own reduction is dropped
+    edges = np.stack([start, end], axis=1).ravel()
+    return ufunc.reduceat(np.append(values, values[-1:]), edges)[::2]
+
+
+def first_touch(intrabar, j, side, sl_level, tp_level):
+    # Walk bar j's sub-bars in order: returns the fill price of whichever of SL / TP is touched first.
+    # A sub-bar touching both is counted as a stop (its path inside the minute is unknown); a stop that gaps
+    # through fills at the sub-bar open, a take-profit fills at its level.
+    s, e = intrabar.start[j], intrabar.end[j]
+    high, low, opens = intrabar.high[s:e], intrabar.low[s:e], intrabar.open[s:e]
+    if side == 1:
+        stop_hit, take_hit = low <= sl_level, high >= tp_level
+    else:
+        stop_hit, take_hit = high >= sl_level, low <= tp_level
+    stop_at = int(np.argmax(stop_hit)) if stop_hit.any() else e - s
+    take_at = int(np.argmax(take_hit)) if take_hit.any() else e - s
+    if stop_at <= take_at:
+        return min(opens[stop_at], sl_level) if side == 1 else max(opens[stop_at], sl_level)
+    return tp_level
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from data.fake_exchange import synthetic_candles
+
+    parser = argparse.ArgumentParser(description='Compare close-only and intrabar SL/TP backtests on synthetic 1m data.')
+    parser.add_argument('--bars', type=int, default=20_000, help='Higher-timeframe bars')
+    parser.add_argument('--timeframe', type=str, default='1h', help='Higher timeframe to aggregate the 1m candles to')
+    args = parser.parse_args()
+
+    from backtest.backtest_engine import backtest
+
+    per_bar = pd.Timedelta(args.timeframe) // pd.Timedelta('1m')
+    rows = synthetic_candles('2023-01-01', args.bars * per_bar, '1m', seed=5)
+    sub = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    sub['timestamp'] = pd.to_datetime(sub['timestamp'], unit='ms')
+    sub.set_index('timestamp', inplace=True)
+    sub = sub.drop(sub.index[per_bar * 10:per_bar * 12 + 7])   # a hole: two bars without sub-bars, one partial
+    bars = sub.resample(args.timeframe).agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last',
+                                             'volume': 'sum'}).dropna()
+
+    start = time.perf_counter()
+    index = build_intrabar_index(bars.index, sub)
+    index_ms = (time.perf_counter() - start) * 1000
+    # The offsets must select exactly what per-bar timestamp filtering would
+    step = pd.Timedelta(args.timeframe)
+    sample = np.random.default_rng(0).choice(len(bars), 200, replace=False)
+    same = all(np.array_equal(sub['low'].to_numpy()[index.start[j]:index.end[j]],
+                              sub.loc[(sub.index >= bars.index[j]) & (sub.index < bars.index[j] + step), 'low'].to_numpy())
+               for j in sample)
+
+    start = time.perf_counter()
+    _, plain_ret, plain_win, plain_dd = backtest(bars.copy(), stop_loss=0.01, take_profit=0.02)
+    plain_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    _, intra_ret, intra_win, intra_dd, ledger = backtest(bars.copy(), stop_loss=0.01, take_profit=0.02, sub_df=sub,
+                                                          return_trades=True)
+    intra_ms = (time.perf_counter() - start) * 1000
+
+    print(f"⏱️ {len(bars)} {args.timeframe} bars / {len(sub)} 1m rows | index {index_ms:.1f} ms | "
+          f"backtest close-only {plain_ms:.1f} ms, intrabar {intra_ms:.1f} ms (incl. index) | offsets match filtering: {same}")
+    print(f"📉 close-only: ${plain_ret:.2f}, win {plain_win:.2%}, DD {plain_dd:.2%} | "
+          f"intrabar: ${intra_ret:.2f}, win {intra_win:.2%}, DD {intra_dd:.2%} | "
+          f"exits at SL/TP level: {np.isin(ledger.exit_price, np.concatenate([ledger.stop_loss, ledger.take_profit])).mean():.0%}")
@@ -0,0 +1,296 @@
+# File: strategy/regime.py (Trending / Volatile / Choppy market regime classifier, batch and incremental)
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json
+from collections import deque
+import numpy as np
+import pandas as pd
+from strategy.ema_cache import ema
+from strategy.indicator_state import EMAState, check_state_key, new_candles
+from strategy.indicators import compute_adx, compute_indicators
+
+NAN = float('nan')
+TRENDING, VOLATILE, CHOPPY = 'Trending', 'Volatile', 'Choppy'
+REGIMES = (TRENDING, VOLATILE, CHOPPY)
+
+EMA_SHORT = 5
+EMA_LONG = 20
+ADX_WINDOW = 14
+ADX_THRESHOLD = 25
+ATR_WINDOW = 14
+BB_WINDOW = 20
+BB_MEAN_WINDOW = 50
+
+
+def volatile_threshold(bb_width, window=BB_MEAN_WINDOW, mode='global'):
+    # 'global': one level from the whole frame (the dashboard's definition, looks ahead);
+    # 'expanding': only bars seen so far, so it matches RegimeState and is safe for live gating
+    smoothed = bb_width.rolling(window).mean()
+    if mode == 'global':
+        return pd.Series(smoothed.mean(), index=bb_width.index)
+    if mode == 'expanding':
+        return smoothed.expanding().mean()
+    raise ValueError(f"Unknown threshold mode '{mode}', expected 'global' or 'expanding'")
+
+
+def label_regimes(adx, ema_spread, bb_width, threshold, adx_threshold=ADX_THRESHOLD):
+    # Column-wise version of the old per-row label_regime; NaN comparisons are False, so warm-up bars are Choppy
+    adx, spread = np.asarray(adx, dtype=np.float64), np.asarray(ema_spread, dtype=np.float64)
+    width, level = np.asarray(bb_width, dtype=np.float64), np.asarray(threshold, dtype=np.float64)
+    trending = (adx > adx_threshold) & (np.abs(spread) > 0)
+    volatile = width > level
+    return np.select([trending, volatile], [TRENDING, VOLATILE], CHOPPY).astype(object)
+
+
+def classify_regimes(df, short_window=EMA_SHORT, long_window=EMA_LONG, adx_window=ADX_WINDOW,
+                     atr_window=ATR_WINDOW, bb_window=BB_WINDOW, bb_mean_window=BB_MEAN_WINDOW,
+                     adx_threshold=ADX_THRESHOLD, threshold='global'):
+    # One pass over the columns; adds the indicator columns the dashboard shows plus 'Regime'
+    df = df.copy()
+    df['EMA_SHORT'] = ema(df['close'], short_window)
+    df['EMA_LONG'] = ema(df['close'], long_window)
+    df['EMA_Spread'] = df['EMA_SHORT'] - df['EMA_LONG']
+    # The regime chart's ATR is the mean candle range (high - low), as the dashboard has always drawn it
+    out = compute_indicators(df, ['hl_range', 'bb_width', 'rsi', 'adx'], atr_window=atr_window, adx_window=adx_window,
+                             bb_window=bb_window)
+    df['ATR'] = out['HL_Range']
+    df['BB_Width'] = out['BB_Width']
+    df['RSI'] = out['RSI']
+    df['ADX'] = out['ADX']
+    level = volatile_threshold(df['BB_Width'], bb_mean_window, threshold)
+    df['Regime'] = label_regimes(df['ADX'], df['EMA_Spread'], df['BB_Width'], level, adx_threshold)
+    return df
+
+
+class _RollingWindow:
+    # Fixed-size window that reports NaN until it is full of non-NaN values, like pandas rolling(window)
+    def __init__(self, window):
+        self.values = deque(maxlen=window)
+
+    def push(self, x):
+        self.values.append(x)
+        return len(self.values) == self.values.maxlen and not any(v != v for v in self.values)
+
+    def sum(self):
+        return sum(self.values)
+
+    def mean(self):
+        return sum(self.values) / len(self.values)
+
+    def std(self):
+        return float(np.std(self.values, ddof=1))
+
+
+class RegimeState:
+    # O(1)-per-bar regime for the live bots; matches classify_regimes(..., threshold='expanding')
+    WINDOWS = ('plus_dm', 'minus_dm', 'tr', 'dx', 'range', 'closes', 'widths')
+
+    def __init__(self, short_window=EMA_SHORT, long_window=EMA_LONG, adx_window=ADX_WINDOW, atr_window=ATR_WINDOW,
+                 bb_window=BB_WINDOW, bb_mean_window=BB_MEAN_WINDOW, adx_threshold=ADX_THRESHOLD, last_timestamp=None,
+                 symbol=None, timeframe=None):
+        self.params = {"short_window": short_window, "long_window": long_window, "adx_window": adx_window,
+                       "atr_window": atr_window, "bb_window": bb_window, "bb_mean_window": bb_mean_window,
+                       "adx_threshold": adx_threshold}
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.last_timestamp = last_timestamp
+        self.adx_threshold = adx_threshold
+        self.ema_short = EMAState(short_window)
+        self.ema_long = EMAState(long_window)
+        self.plus_dm = _RollingWindow(adx_window)
+        self.minus_dm = _RollingWindow(adx_window)
+        self.tr = _RollingWindow(adx_window)
+        self.dx = _RollingWindow(adx_window)
+        self.range = _RollingWindow(atr_window)
+        self.closes = _RollingWindow(bb_window)
+        self.widths = _RollingWindow(bb_mean_window)
+        self.level_sum = 0.0
+        self.level_count = 0
+        self.prev = None  # (high, low, close) of the previous bar
+        self.regime = CHOPPY
+        self.values = {}
+
+    def update(self, high, low, close):
+        spread = self.ema_short.update(close) - self.ema_long.update(close)
+
+        if self.prev is None:
+            plus_dm = minus_dm = NAN
+            tr = high - low
+        else:
+            p_high, p_low, p_close = self.prev
+            plus_dm = max(high - p_high, 0.0)
+            minus_dm = -min(low - p_low, 0.0)
+            tr = max(high - low, abs(high - p_close), abs(low - p_close))
+        self.prev = (high, low, close)
+
+        full = self.plus_dm.push(plus_dm) & self.minus_dm.push(minus_dm) & self.tr.push(tr)
+        dx = NAN
+        if full:
+            tr_sum = self.tr.sum()
+            plus_di = 100 * self.plus_dm.sum() / tr_sum if tr_sum else NAN
+            minus_di = 100 * self.minus_dm.sum() / tr_sum if tr_sum else NAN
+            total = plus_di + minus_di
+            dx = 100 * abs(plus_di - minus_di) / total if total else NAN
+        adx = self.dx.mean() if self.dx.push(dx) else NAN
+
+        atr = self.range.mean() if self.range.push(high - low) else NAN
+        width = 4 * self.closes.std() if self.closes.push(close) else NAN
+        if self.widths.push(width):
+            self.level_sum += self.widths.mean()
+            self.level_count += 1
+        level = self.level_sum / self.level_count if self.level_count else NAN
+
+        if adx > self.adx_threshold and abs(spread) > 0:
+            self.regime = TRENDING
+        elif width > level:
+            self.regime = VOLATILE
+        else:
+            self.regime = CHOPPY
+        self.values = {"EMA_Spread": spread, "ADX": adx, "ATR": atr, "BB_Width": width, "Regime": self.regime}
+        return self.regime
+
+    def update_from_frame(self, df, timeframe=None):
+        # Feed only candles newer than the last one already folded in, so the label reflects the whole history;
+        # missing bars after the saved state re-seed it from the frame, as in IndicatorState
+        df, gap = new_candles(df, self.last_timestamp, timeframe or self.timeframe)
+        if gap:
+            print(f"⚠️ Candles missing after {self.last_timestamp}, re-seeding regime from {df.index[0]}")
+            self.__init__(**self.params, symbol=self.symbol, timeframe=self.timeframe)
+        for high, low, close in zip(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy()):
+            self.update(float(high), float(low), float(close))
+        if len(df):
+            self.last_timestamp = str(df.index[-1])
+        return self.regime
+
+    def to_dict(self):
+        return {**self.params, "symbol": self.symbol, "timeframe": self.timeframe, "last_timestamp": self.last_timestamp,
+                "ema_short": self.ema_short.to_dict(), "ema_long": self.ema_long.to_dict(),
+                "windows": {name: list(getattr(self, name).values) for name in self.WINDOWS},
+                "level_sum": self.level_sum, "level_count": self.level_count, "prev": self.prev, "regime": self.regime}
+
+    @classmethod
+    def from_dict(cls, d):
+        state = cls(**{k: d[k] for k in ('short_window', 'long_window', 'adx_window', 'atr_window', 'bb_window',
+                                         'bb_mean_window', 'adx_threshold', 'last_timestamp')},
+                    symbol=d.get("symbol"), timeframe=d.get("timeframe"))
+        state.ema_short = EMAState.from_dict(d["ema_short"])
+        state.ema_long = EMAState.from_dict(d["ema_long"])
+        for name, values in d["windows"].items():
+            getattr(state, name).values.extend(values)
+        state.level_sum, state.level_count = d["level_sum"], d["level_count"]
+        state.prev = tuple(d["prev"]) if d["prev"] is not None else None
+        state.regime = d["regime"]
+        return state
+
+
+def load_regime_state(path, symbol=None, timeframe=None, **defaults):
+    # Refuses a file saved for another symbol or timeframe, like load_indicator_state
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return check_state_key(RegimeState.from_dict(json.load(f)), path, symbol, timeframe)
+    return RegimeState(symbol=symbol, timeframe=timeframe, **defaults)
+
+
+def save_regime_state(state, path):
+    # Write-then-rename, like save_indicator_state
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state.to_dict(), f)
+    os.replace(tmp_path, path)
+
+
+def regime_segments(labels, index=None, min_bars=1, min_duration=None):
+    # Run-length encode labels into (start, end, regime, bars) rows; end is the next segment's start (or the last
+    # bar), so segments tile the range. Runs shorter than min_bars / min_duration join the preceding regime.
+    labels = pd.Series(labels, index=index) if index is not None or not isinstance(labels, pd.Series) else labels
+    values = labels.to_numpy(dtype=object)
+    times = labels.index
+    n = len(values)
+    if n == 0:
+        return pd.DataFrame(columns=['start', 'end', 'regime', 'bars'])
+
+    def runs(v):
+        starts = np.flatnonzero(np.concatenate(([True], v[1:] != v[:-1])))
+        lengths = np.diff(np.append(starts, n))
+        return starts, lengths
+
+    starts, lengths = runs(values)
+    if min_bars > 1 or min_duration is not None:
+        short = lengths < min_bars
+        if min_duration is not None:
+            ends = np.append(starts[1:], n - 1)
+            short |= (times[ends] - times[starts]) < pd.Timedelta(min_duration)
+        if short.any() and not short.all():
+            # Short runs take the label of the nearest long run before them (after them, for leading runs)
+            run_labels = pd.Series(np.where(short, None, values[starts]), dtype=object).ffill().bfill().to_numpy()
+            values = np.repeat(run_labels, lengths)
+            starts, lengths = runs(values)
+
+    ends = np.append(starts[1:], n - 1)
+    return pd.DataFrame({'start': times[starts], 'end': times[ends], 'regime': values[starts], 'bars': lengths})
+
+
+def regime_allows(regime, allowed=None):
+    # Entry gate for the bots: None allows every regime
+    return allowed is None or regime in allowed
+
+
+if __name__ == "__main__":
+    import time
+    from data.fake_exchange import synthetic_candles
+
+    rows = synthetic_candles('2025-01-01', 5000, '1m', seed=3)
+    df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df.set_index('timestamp', inplace=True)
+
+    # The dashboard's original row-wise labelling, for reference
+    start = time.perf_counter()
+    ref = df.copy()
+    ref['EMA_Spread'] = ema(ref['close'], EMA_SHORT) - ema(ref['close'], EMA_LONG)
+    ref['BB_Width'] = (ref['close'].rolling(20).mean() + 2 * ref['close'].rolling(20).std()) - \
+                      (ref['close'].rolling(20).mean() - 2 * ref['close'].rolling(20).std())
+    ref['ADX'] = compute_adx(ref)
+
+    def label_regime(row):
+        if row['ADX'] > 25 and abs(row['EMA_Spread']) > 0:
+            return 'Trending'
+        elif row['BB_Width'] > ref['BB_Width'].rolling(50).mean().mean():
+            return 'Volatile'
+        else:
+            return 'Choppy'
+    ref_regime = ref.apply(label_regime, axis=1)
+    apply_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = classify_regimes(df)
+    fast_time = time.perf_counter() - start
+    print(f"⏱️ {len(df)} bars | row-wise apply {apply_time * 1000:.0f} ms | vectorized {fast_time * 1000:.1f} ms "
+          f"({apply_time / fast_time:.0f}x) | same labels: {(fast['Regime'] == ref_regime).all()}")
+
+    causal = classify_regimes(df, threshold='expanding')
+    state = RegimeState()
+    start = time.perf_counter()
+    live = [state.update(h, l, c) for h, l, c in zip(df['high'], df['low'], df['close'])]
+    live_time = time.perf_counter() - start
+    agree = (np.array(live, dtype=object) == causal['Regime'].to_numpy()).mean()
+    # Resuming from JSON halfway through gives the same labels as one uninterrupted pass
+    half = len(df) // 2
+    resumed = RegimeState()
+    resumed.update_from_frame(df.iloc[:half])
+    resumed = RegimeState.from_dict(json.loads(json.dumps(resumed.to_dict())))
+    resumed_labels = [resumed.update(h, l, c) for h, l, c in zip(df['high'][half:], df['low'][half:], df['close'][half:])]
+    assert resumed_labels == live[half:]
+    # A saved state only loads back for the symbol and timeframe it was built from
+    import tempfile
+    saved = os.path.join(tempfile.mkdtemp(), "regime_state_BTCUSDT_1m.json")
+    save_regime_state(RegimeState(symbol="BTC/USDT", timeframe="1m"), saved)
+    assert load_regime_state(saved, "BTC/USDT", "1m").symbol == "BTC/USDT"
+    try:
+        load_regime_state(saved, "ETH/USDT", "1m")
+        raise AssertionError("mismatched regime state loaded")
+    except ValueError:
+        pass
+    print(f"⏱️ incremental {live_time / len(df) * 1e6:.1f} µs/bar | agrees with expanding batch on {agree:.2%} of bars | "
+          f"{pd.Series(live).value_counts().to_dict()}")
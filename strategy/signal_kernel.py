@@ -0,0 +1,225 @@
+# File: strategy/signal_kernel.py (Array-backed EMA crossover signal engine)
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from typing import NamedTuple
+import numpy as np
+from strategy.intrabar import first_touch
+
+
+class KernelResult(NamedTuple):
+    signal: np.ndarray       # int64 per bar: entry side on entry bars, opposite side on exit bars
+    trade_id: np.ndarray     # int64 per bar: id of the trade opened/closed on that bar
+    units: np.ndarray        # float64 per bar: signed lot size held after the bar's close
+    entry_idx: np.ndarray    # int64 per closed trade
+    exit_idx: np.ndarray
+    side: np.ndarray         # int8 per closed trade: 1 = long, -1 = short
+    entry_price: np.ndarray  # float64 per closed trade
+    stop_loss: np.ndarray
+    take_profit: np.ndarray
+    exit_price: np.ndarray
+    lot_size: np.ndarray
+    reward_amount: np.ndarray
+
+
+def crossover_masks(ema_short, ema_long):
+    # Fresh crosses only: bar i crosses relative to bar i-1 (bar 0 never crosses); 2-D input is time x symbol
+    ema_short = np.asarray(ema_short, dtype=np.float64)
+    ema_long = np.asarray(ema_long, dtype=np.float64)
+    bullish = np.zeros(ema_short.shape, dtype=bool)
+    bearish = np.zeros(ema_short.shape, dtype=bool)
+    bullish[1:] = (ema_short[1:] > ema_long[1:]) & (ema_short[:-1] <= ema_long[:-1])
+    bearish[1:] = (ema_short[1:] < ema_long[1:]) & (ema_short[:-1] >= ema_long[:-1])
+    return bullish, bearish
+
+
+def run_signal_kernel(close, ema_short, ema_long, stoploss_threshold=0.02, takeprofit_threshold=0.04, risk_amount=200.0,
+                      use_stoploss=True, use_takeprofit=True, intrabar=None):
+    # intrabar: optional IntrabarIndex (strategy/intrabar.py) to fill SL/TP on the sub-bars instead of the close
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    n = len(close)
+    bullish, bearish = crossover_masks(ema_short, ema_long)
+
+    signal = np.zeros(n, dtype=np.int64)
+    trade_ids = np.zeros(n, dtype=np.int64)
+    units = np.zeros(n, dtype=np.float64)
+
+    # At most one trade per two bars, so n // 2 + 1 slots always suffice
+    cap = n // 2 + 1
+    entry_idx = np.empty(cap, dtype=np.int64)
+    exit_idx = np.empty(cap, dtype=np.int64)
+    side = np.empty(cap, dtype=np.int8)
+    entry_price = np.empty(cap, dtype=np.float64)
+    stop_loss = np.empty(cap, dtype=np.float64)
+    take_profit = np.empty(cap, dtype=np.float64)
+    exit_price = np.empty(cap, dtype=np.float64)
+    lot_size = np.empty(cap, dtype=np.float64)
+    reward_amount = np.empty(cap, dtype=np.float64)
+
+    # While flat only fresh crosses matter, so jump straight between them
+    cross_idx = np.flatnonzero(bullish | bearish)
+    prices = close.tolist()
+    bull = bullish.tolist()
+    bear = bearish.tolist()
+    if intrabar is not None:
+        bar_high = np.nan_to_num(intrabar.bar_high, nan=-np.inf).tolist()   # NaN (no sub-bars) never touches
+        bar_low = np.nan_to_num(intrabar.bar_low, nan=np.inf).tolist()
+        no_sub = (intrabar.end <= intrabar.start).tolist()
+
+    trade_id = 0
+    i = 0
+    k = 0  # cursor into cross_idx
+    while True:
+        while k < len(cross_idx) and cross_idx[k] <= i:
+            k += 1
+        if k == len(cross_idx):
+            break
+        i = int(cross_idx[k])
+
+        # Entry on fresh cross
+        position = 1 if bull[i] else -1
+        entry = prices[i]
+        if position == 1:
+            sl = entry * (1 - stoploss_threshold)
+            tp = entry * (1 + takeprofit_threshold)
+        else:
+            sl = entry * (1 + stoploss_threshold)
+            tp = entry * (1 - takeprofit_threshold)
+        stop_distance = abs(entry - sl)
+        lots = risk_amount / stop_distance if stop_distance != 0 else 0
+        # Disabled exits become levels price can never cross (sizing still uses the nominal stop)
+        sl_level = sl if use_stoploss else -position * np.inf
+        tp_level = tp if use_takeprofit else position * np.inf
+        signal[i] = position
+        trade_ids[i] = trade_id
+        start = i
+
+        # Scan forward for SL, TP or reverse crossover
+        j = i + 1
+        exit_fill = None
+        if intrabar is not None:
+            # A bar whose sub-bar range reaches a level is resolved on its 1m candles (first_touch); only bars
+            # without sub-bars fall back to the close check, so the scan costs two extra compares per bar
+            while j < n:
+                if position == 1:
+                    touched = bar_low[j] <= sl_level or bar_high[j] >= tp_level
+                else:
+                    touched = bar_high[j] >= sl_level or bar_low[j] <= tp_level
+                if touched:
+                    exit_fill = first_touch(intrabar, j, position, sl_level, tp_level)
+                    break
+                p = prices[j]
+                if bear[j] if position == 1 else bull[j]:
+                    break
+                if no_sub[j] and ((p < sl_level or p > tp_level) if position == 1 else (p > sl_level or p < tp_level)):
+                    break
+                j += 1
+        elif position == 1:
+            while j < n:
+                p = prices[j]
+                if p < sl_level or p > tp_level or bear[j]:
+                    break
+                j += 1
+        else:
+            while j < n:
+                p = prices[j]
+                if p > sl_level or p < tp_level or bull[j]:
+                    break
+                j += 1
+        units[start:j] = position * lots
+        if j == n:
+            break  # position still open at the end of the data
+
+        signal[j] = -position
+        trade_ids[j] = trade_id
+        entry_idx[trade_id] = start
+        exit_idx[trade_id] = j
+        side[trade_id] = position
+        entry_price[trade_id] = entry
+        stop_loss[trade_id] = sl
+        take_profit[trade_id] = tp
+        exit_price[trade_id] = prices[j] if exit_fill is None else exit_fill
+        lot_size[trade_id] = lots
+        reward_amount[trade_id] = lots * abs(tp - entry)
+        trade_id += 1
+        i = j
+
+    t = trade_id
+    return KernelResult(signal, trade_ids, units, entry_idx[:t], exit_idx[:t], side[:t], entry_price[:t],
+                        stop_loss[:t], take_profit[:t], exit_price[:t], lot_size[:t], reward_amount[:t])
+
+
+def position_from_signal(signal):
+    # Equivalent of signal.replace(0, method='ffill').fillna(0): carry the last non-zero signal forward
+    signal = np.asarray(signal)
+    idx = np.where(signal != 0, np.arange(len(signal)), -1)
+    np.maximum.accumulate(idx, out=idx)
+    return np.where(idx >= 0, signal[idx], 0)
+
+
+def _reference_loop(close, ema_short, ema_long, stoploss_threshold, takeprofit_threshold, risk_amount):
+    # Original per-bar state machine from ema_crossover_strategy, kept for equivalence checks
+    n = len(close)
+    signal = [0] * n
+    trade_ids = [0] * n
+    trades = []
+    position = 0
+    trade_id = 0
+    for i in range(1, n):
+        price = close[i]
+        bullish_cross = (ema_short[i] > ema_long[i]) and (ema_short[i - 1] <= ema_long[i - 1])
+        bearish_cross = (ema_short[i] < ema_long[i]) and (ema_short[i - 1] >= ema_long[i - 1])
+        if position == 0:
+            if bullish_cross or bearish_cross:
+                position = 1 if bullish_cross else -1
+                entry_price = price
+                stop_loss_price = entry_price * (1 - stoploss_threshold) if position == 1 else entry_price * (1 + stoploss_threshold)
+                take_profit_price = entry_price * (1 + takeprofit_threshold) if position == 1 else entry_price * (1 - takeprofit_threshold)
+                stop_distance = abs(entry_price - stop_loss_price)
+                lot_size = risk_amount / stop_distance if stop_distance != 0 else 0
+                signal[i] = position
+                trade_ids[i] = trade_id
+                start = i
+        elif position == 1:
+            if price < stop_loss_price or price > take_profit_price or bearish_cross:
+                trades.append((start, i, 1, entry_price, price, lot_size))
+                signal[i] = -1
+                trade_ids[i] = trade_id
+                position = 0
+                trade_id += 1
+        elif position == -1:
+            if price > stop_loss_price or price < take_profit_price or bullish_cross:
+                trades.append((start, i, -1, entry_price, price, lot_size))
+                signal[i] = 1
+                trade_ids[i] = trade_id
+                position = 0
+                trade_id += 1
+    return np.array(signal), np.array(trade_ids), trades
+
+
+if __name__ == "__main__":
+    # Equivalence check against the per-bar loop on the bundled datasets
+    import glob
+    import time
+    import pandas as pd
+
+    for path in sorted(glob.glob("data/*.csv")):
+        df = pd.read_csv(path, index_col="timestamp", parse_dates=True)
+        for short, long in [(5, 9), (9, 20), (12, 26), (20, 50)]:
+            close = df['close'].to_numpy(dtype=np.float64)
+            ema_s = df['close'].ewm(span=short, adjust=False).mean().to_numpy()
+            ema_l = df['close'].ewm(span=long, adjust=False).mean().to_numpy()
+            for sl, tp in [(0.02, 0.04), (0.001, 0.002), (0.0, 0.0)]:
+                t0 = time.perf_counter()
+                res = run_signal_kernel(close, ema_s, ema_l, sl, tp, 200.0)
+                t1 = time.perf_counter()
+                ref_signal, ref_ids, ref_trades = _reference_loop(close, ema_s, ema_l, sl, tp, 200.0)
+                t2 = time.perf_counter()
+                got_trades = list(zip(res.entry_idx.tolist(), res.exit_idx.tolist(), res.side.tolist(),
+                                      res.entry_price.tolist(), res.exit_price.tolist(), res.lot_size.tolist()))
+                assert np.array_equal(res.signal, ref_signal), (path, short, long, sl, tp)
+                assert np.array_equal(res.trade_id, ref_ids), (path, short, long, sl, tp)
+                assert got_trades == ref_trades, (path, short, long, sl, tp)
+                expected_pos = pd.Series(ref_signal).replace(0, np.nan).ffill().fillna(0).to_numpy()
+                assert np.array_equal(position_from_signal(res.signal), expected_pos), (path, short, long)
+        print(f"✅ {path}: kernel matches reference ({len(df)} bars, kernel {1e3 * (t1 - t0):.2f}ms vs loop {1e3 * (t2 - t1):.2f}ms)")
@@ -0,0 +1,73 @@
+# File: strategy/trade_ledger.py (Typed struct-of-arrays trade ledger)
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+
+TRADE_LOG_COLUMNS = [
+    'Date', 'Pair', 'Buy/Sell', 'Entry Price', 'Stop Loss', 'Take Profit',
+    'Exit Price', 'Pips Gained/Lost', 'Risk (USD)', 'Reward (USD)', 'R:R Ratio', 'Lot Size', 'Result'
+]
+
+
+class TradeLedger(NamedTuple):
+    symbol: str
+    risk_amount: float
+    entry_time: pd.DatetimeIndex
+    entry_idx: np.ndarray     # int64 bar positions into the strategy frame
+    exit_idx: np.ndarray
+    side: np.ndarray          # int8: 1 = long, -1 = short
+    entry_price: np.ndarray   # float64
+    exit_price: np.ndarray
+    stop_loss: np.ndarray
+    take_profit: np.ndarray
+    lot_size: np.ndarray
+    reward_amount: np.ndarray
+    pnl: np.ndarray
+    units: np.ndarray         # float64 per bar: signed lot size held after each close, open trade included
+
+    @classmethod
+    def from_kernel(cls, result, index, symbol, risk_amount):
+        pnl = (result.exit_price - result.entry_price) * result.lot_size * result.side
+        return cls(symbol, risk_amount, index[result.entry_idx], result.entry_idx, result.exit_idx, result.side,
+                   result.entry_price, result.exit_price, result.stop_loss, result.take_profit,
+                   result.lot_size, result.reward_amount, pnl, result.units)
+
+    def __len__(self):
+        return len(self.side)
+
+    def to_frame(self):
+        # Rows in the logs/trades.csv schema, rounded exactly as the strategy always logged them
+        pair = self.symbol.replace('/', '')
+        dates = self.entry_time.strftime('%Y-%m-%d')
+        risk_amount = self.risk_amount
+        rows = []
+        for t in range(len(self)):
+            entry_price = self.entry_price[t]
+            price = self.exit_price[t]
+            reward_amount = self.reward_amount[t]
+            pips = (price - entry_price) * 100 if self.side[t] == 1 else (entry_price - price) * 100
+            rows.append([
+                dates[t],
+                pair,
+                'Buy' if self.side[t] == 1 else 'Sell',
+                round(entry_price, 2),
+                round(self.stop_loss[t], 2),
+                round(self.take_profit[t], 2),
+                round(price, 2),
+                round(pips, 1),
+                round(risk_amount, 2),
+                round(reward_amount, 2),
+                f"1:{round(reward_amount/risk_amount, 1)}",
+                round(self.lot_size[t], 6),
+                'Win' if self.pnl[t] > 0 else 'Loss'
+            ])
+        return pd.DataFrame(rows, columns=TRADE_LOG_COLUMNS)
+
+    def to_csv(self, path='logs/trades.csv'):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.to_frame().to_csv(path, index=False)